@@ -25,8 +25,12 @@ from ..models.request import ProcessAudioRequest, OrderContext, DetectSpeechRequ
 from ..models.response import AssistantResponse, DetectSpeechResponse # Added DetectSpeechResponse
 # Services & Dependencies
 from ..services.conversation_service import ConversationService
-from ..services.transcription_service import TranscriptionService # Added TranscriptionService import
-from ..api.dependencies import get_conversation_service, get_transcription_service
+from ..services.speech_detection_service import SpeechDetectionService
+from ..services.audio_stream_service import AudioStreamService
+from ..api.dependencies import (
+    get_conversation_service, get_speech_detection_service, get_audio_stream_service, get_session_audio_buffer
+)
+from ..core.session_audio_buffer import SessionAudioBuffer
 # Exceptions
 from ..core.exception import (
     AssistantBaseException, TranscriptionError, NluError, SynthesisError,
@@ -91,22 +95,53 @@ def _parse_order_context(context_str: Optional[str]) -> Optional[OrderContext]:
 )
 async def interact(
     session_id: str = Form(...),
-    audio_data: UploadFile = File(...),
+    audio_data: Optional[UploadFile] = File(None), # Optional when referencing already-sent audio (see below)
     language_code_hint: Optional[str] = Form(None),
     current_location: Optional[str] = Form(None),
     order_context: Optional[str] = Form(None),
-    conversation_service: ConversationService = Depends(get_conversation_service)
+    use_streamed_audio: bool = Form(False), # Use the utterance received on /assistant/stream instead of an upload
+    audio_start_ms: Optional[float] = Form(None), # Use buffered session audio from here (detect-speech buffered_start_ms)
+    audio_end_ms: Optional[float] = Form(None), # ...up to here (default: everything buffered so far)
+    conversation_service: ConversationService = Depends(get_conversation_service),
+    audio_stream_service: AudioStreamService = Depends(get_audio_stream_service),
+    session_audio_buffer: SessionAudioBuffer = Depends(get_session_audio_buffer)
 ) -> AssistantResponse:
     logger.info(f"Received interaction request for session: {session_id}")
     start_time = time.time()  # Start timing
 
     try:
-        # Read audio bytes - UploadFile needs await .read()
-        audio_bytes = await audio_data.read()
-        if not audio_bytes:
-            logger.error("Received empty audio file for /interact.")
-            raise InvalidRequestError("Received empty audio file.")
-        logger.debug(f"Received {len(audio_bytes)} bytes for /interact audio_data.")
+        buffered_range = None
+        streamed_transcript, streamed_language = None, None
+        if use_streamed_audio:
+            # Audio already arrived over the WebSocket stream; no re-upload needed
+            utterance = await audio_stream_service.take_utterance(session_id)
+            if utterance is None:
+                logger.error(f"use_streamed_audio set but no streamed utterance for session {session_id}.")
+                raise InvalidRequestError("No streamed utterance for this session: finish an utterance on /assistant/stream first.")
+            buffered_range = (utterance.start_ms, utterance.end_ms)
+            if utterance.transcript:  # Streaming STT already finished; empty results still go through batch STT + fallback
+                streamed_transcript, streamed_language = utterance.transcript, utterance.language_code
+        elif audio_start_ms is not None:
+            # Audio already sent as /detect-speech chunks
+            buffered_range = (audio_start_ms, audio_end_ms)
+        elif audio_data is None:
+            raise InvalidRequestError("No audio provided: upload audio_data, set audio_start_ms or use_streamed_audio.")
+
+        if buffered_range is not None:
+            # Buffered audio is already decoded and at the STT rate, so decoding/resampling are no-ops
+            samples = session_audio_buffer.read(session_id, *buffered_range)
+            audio_bytes = samples.tobytes()
+            audio_content_type = f"audio/pcm; rate={session_audio_buffer.sample_rate}"
+            logger.debug(f"Using {len(samples) / session_audio_buffer.sample_rate:.2f}s of buffered audio "
+                         f"({buffered_range[0]}-{buffered_range[1]} ms) for /interact.")
+        else:
+            # Read audio bytes - UploadFile needs await .read()
+            audio_bytes = await audio_data.read()
+            audio_content_type = audio_data.content_type
+            if not audio_bytes:
+                logger.error("Received empty audio file for /interact.")
+                raise InvalidRequestError("Received empty audio file.")
+            logger.debug(f"Received {len(audio_bytes)} bytes for /interact audio_data.")
 
         # Parse optional form fields
         parsed_location = _parse_location(current_location)
@@ -124,6 +159,9 @@ async def interact(
         request_model = ProcessAudioRequest(
             session_id=session_id,
             audio_data=audio_bytes, # Pass raw bytes
+            audio_content_type=audio_content_type,
+            transcript=streamed_transcript,
+            transcript_language=streamed_language,
             language_code_hint=language_code_hint,
             current_location=parsed_location,
             order_context=parsed_order_context
@@ -230,14 +268,15 @@ async def get_audio_file(filename: str):
     "/detect-speech",
     response_model=DetectSpeechResponse,
     summary="Detect speech in a short audio chunk",
-    description="Receives a short audio chunk (base64 encoded) and uses STT to detect "
-                "if any human speech is present. Used by the frontend to determine when to stop recording.",
+    description="Receives a short audio chunk (base64 encoded) and uses a local speech-activity detector "
+                "(optionally verified with STT) to detect if any human speech is present. "
+                "Used by the frontend to determine when to stop recording.",
 )
 async def detect_speech(
     # Receive data from request body as JSON
     request_data: DetectSpeechRequest = Body(...),
     # Inject only the needed service
-    transcription_service: TranscriptionService = Depends(get_transcription_service)
+    speech_detection_service: SpeechDetectionService = Depends(get_speech_detection_service)
 ) -> DetectSpeechResponse:
     """
     Endpoint to check for voice activity in small audio segments.
@@ -264,31 +303,21 @@ async def detect_speech(
              logger.debug(f"Decoded audio data is empty after base64 decode (session: {session_id}).")
              return DetectSpeechResponse(speech_detected=False)
 
-        # Call transcription service - we only care if transcript is non-empty
-        # We can pass the raw bytes directly to process_audio
-        # No language hint needed, let STT try its best to detect anything
-        logger.info(f"[VAD] Calling STT service to check for speech (session: {session_id})")
-        transcript, _ = await transcription_service.process_audio(
-            audio_data=audio_bytes,
-            language_code_hint=None, # Explicitly None for broad detection
-             # Optionally pass format/encoding info if known, but transcription service should ideally detect
-             # audio_format=..., audio_encoding=...
-        )
-
-        # Determine if speech was detected based on whether a non-empty transcript was returned
-        # Some STT services might return a non-empty transcript even for noise.
-        # A more advanced VAD might involve checking confidence scores or specific events.
-        # For this implementation, non-empty transcript = speech detected.
-        speech_was_detected = bool(transcript and transcript.strip()) # Check for non-empty, non-whitespace string
-        logger.debug(f"Speech detection result for session {session_id}: {speech_was_detected}. Transcript: '{transcript.strip()[:50]}...'")
+        # Local VAD answers in milliseconds; cloud STT is only used in the opt-in verify mode
+        result = await speech_detection_service.detect(
+            audio_bytes, content_type=request_data.content_type, session_id=request_data.session_id)
 
-        # Enhanced logging with truncated transcript
-        if speech_was_detected:
-            logger.info(f"[VAD] SPEECH DETECTED for session {session_id}. Transcript snippet: '{transcript.strip()[:30]}...'")
+        if result.speech_detected:
+            logger.info(f"[VAD] SPEECH DETECTED for session {session_id} ({result.detector}).")
         else:
-            logger.info(f"[VAD] NO SPEECH DETECTED for session {session_id}. Empty or silent audio.")
+            logger.info(f"[VAD] NO SPEECH DETECTED for session {session_id} ({result.detector}).")
 
-        return DetectSpeechResponse(speech_detected=speech_was_detected)
+        return DetectSpeechResponse(
+            speech_detected=result.speech_detected,
+            detector=result.detector,
+            buffered_start_ms=result.buffered_start_ms,
+            buffered_end_ms=result.buffered_end_ms,
+        )
 
     except InvalidRequestError as e:
         # Errors during decoding or audio processing (e.g., unsupported format by STT)
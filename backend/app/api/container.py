@@ -0,0 +1,182 @@
+# backend/api/container.py
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from ..core.config import Settings
+from ..core.exception import ConfigurationError
+from ..core.model_registry import ModelRegistry
+from ..core import lazy_imports
+from ..core.dsp_pool import DspProcessPool
+from ..core.quality_controller import QualityController
+from ..core.session_audio_buffer import SessionAudioBuffer
+from ..core.noise_profile_store import NoiseProfileStore
+
+# --- Clients ---
+from ..core.clients.google_stt import GoogleSttClient
+from ..core.clients.google_tts import GoogleTtsClient
+from ..core.clients.gemini import GeminiClient
+from ..core.clients.google_translate import GoogleTranslateClient
+from ..core.clients.google_maps import GoogleMapsClient
+from ..core.clients.openai_client import OpenAiClient
+from ..core.clients.twillio_client import TwilioClient
+
+# --- Services ---
+from ..services.transcription_service import TranscriptionService
+from ..services.nlu_service import NluService
+from ..services.synthesis_service import SynthesisService
+from ..services.translation_service import TranslationService
+from ..services.navigation_service import NavigationService
+from ..services.safety_service import SafetyService
+from ..services.conversation_service import ConversationService
+from ..services.speech_detection_service import SpeechDetectionService
+from ..services.audio_stream_service import AudioStreamService
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """
+    Application-scoped object graph: every client and service is built exactly once at startup
+    (from the FastAPI lifespan) and shared by all requests.
+
+    None of the services hold per-request state - request data travels in the request models
+    (e.g. ProcessAudioRequest) and per-session state lives in the session stores - so the only
+    request-scoped objects are those models, built by the route handlers.
+
+    A client that fails to initialise is stored as None (and logged), and so is every service
+    that needs it; the dependency getters turn that into a ConfigurationError at request time.
+    """
+
+    def __init__(self, settings: Settings, model_registry: Optional[ModelRegistry] = None):
+        self.settings = settings
+        self.model_registry = model_registry
+        self.init_times: Dict[str, float] = {}  # Component name -> construction time (seconds)
+        self.warmup_times: Dict[str, float] = {}  # Subsystem / client name -> warm-up time (seconds)
+
+        logger.info("Building application service container...")
+
+        # --- Clients ---
+        self.stt_client: Optional[GoogleSttClient] = self._build("GoogleSttClient", lambda: GoogleSttClient(settings=settings))
+        self.tts_client: Optional[GoogleTtsClient] = self._build("GoogleTtsClient", lambda: GoogleTtsClient(settings=settings))
+        self.gemini_client: Optional[GeminiClient] = self._build("GeminiClient", lambda: GeminiClient(settings=settings))
+        self.translate_client: Optional[GoogleTranslateClient] = self._build("GoogleTranslateClient", lambda: GoogleTranslateClient(settings=settings))
+        self.maps_client: Optional[GoogleMapsClient] = self._build("GoogleMapsClient", lambda: GoogleMapsClient(settings=settings))
+        self.twilio_client: Optional[TwilioClient] = self._build("TwilioClient", lambda: TwilioClient(settings=settings))
+        self.openai_client: Optional[OpenAiClient] = self._build("OpenAiClient", lambda: OpenAiClient(settings=settings))
+        if self.openai_client is not None and not self.openai_client.enabled:
+            logger.warning("OpenAiClient initialized but is DISABLED (check API key).")
+
+        # --- Shared worker pools ---
+        self.dsp_pool = DspProcessPool(settings)  # Worker processes start on first use / warm-up
+        self.quality_controller = QualityController(settings)  # Degrades optional stages under load
+        self.session_audio_buffer = SessionAudioBuffer(settings)  # Audio already received, referenced by /interact
+        self.noise_profiles = NoiseProfileStore(settings)  # Per-session cabin noise for NR and /detect-speech
+
+        # --- Services (wired to the shared clients) ---
+        self.translation_service: Optional[TranslationService] = self._build_service(
+            "TranslationService", [self.translate_client],
+            lambda: TranslationService(translate_client=self.translate_client, settings=settings))
+        self.nlu_service: Optional[NluService] = self._build_service(
+            "NluService", [self.gemini_client],
+            lambda: NluService(gemini_client=self.gemini_client, settings=settings))
+        self.synthesis_service: Optional[SynthesisService] = self._build_service(
+            "SynthesisService", [self.tts_client],
+            lambda: SynthesisService(tts_client=self.tts_client, settings=settings))
+        self.navigation_service: Optional[NavigationService] = self._build_service(
+            "NavigationService", [self.maps_client],
+            lambda: NavigationService(maps_client=self.maps_client, settings=settings))
+        self.safety_service: Optional[SafetyService] = self._build_service(
+            "SafetyService", [],
+            lambda: SafetyService(settings=settings, twilio_client=self.twilio_client, model_registry=model_registry))
+        self.transcription_service: Optional[TranscriptionService] = self._build_service(
+            "TranscriptionService", [self.stt_client, self.translation_service],
+            lambda: TranscriptionService(
+                stt_client=self.stt_client,
+                openai_client=self.openai_client,  # Optional: Whisper fallback is disabled without it
+                translation_service=self.translation_service,
+                settings=settings,
+                dsp_pool=self.dsp_pool,
+                noise_profiles=self.noise_profiles
+            ))
+        self.speech_detection_service: Optional[SpeechDetectionService] = self._build_service(
+            "SpeechDetectionService", [],
+            lambda: SpeechDetectionService(
+                settings=settings,
+                transcription_service=self.transcription_service,  # Only used in verify mode
+                audio_buffer=self.session_audio_buffer,
+                noise_profiles=self.noise_profiles
+            ))
+        self.audio_stream_service: Optional[AudioStreamService] = self._build_service(
+            "AudioStreamService", [],
+            lambda: AudioStreamService(
+                settings=settings,
+                audio_buffer=self.session_audio_buffer,
+                transcription_service=self.transcription_service  # Optional: streaming STT is unavailable without it
+            ))
+        self.conversation_service: Optional[ConversationService] = self._build_service(
+            "ConversationService",
+            [self.transcription_service, self.translation_service, self.nlu_service,
+             self.synthesis_service, self.navigation_service, self.safety_service],
+            lambda: ConversationService(
+                transcription_service=self.transcription_service,
+                translation_service=self.translation_service,
+                nlu_service=self.nlu_service,
+                synthesis_service=self.synthesis_service,
+                navigation_service=self.navigation_service,
+                safety_service=self.safety_service,
+                settings=settings,
+                quality_controller=self.quality_controller
+            ))
+
+        logger.info(f"Service container built in {sum(self.init_times.values()):.3f}s.")
+
+    def _build(self, name: str, factory: Callable[[], Any]) -> Optional[Any]:
+        """Constructs one component, recording its init time. Returns None on failure."""
+        start = time.perf_counter()
+        try:
+            component = factory()
+            logger.info(f"{name} initialized.")
+            return component
+        except ConfigurationError as e:
+            logger.critical(f"FATAL: Failed to initialize {name}: {e}", exc_info=True)
+        except Exception as e:
+            logger.critical(f"FATAL: Unexpected error initializing {name}: {e}", exc_info=True)
+        finally:
+            self.init_times[name] = time.perf_counter() - start
+        return None
+
+    def _build_service(self, name: str, requirements: list, factory: Callable[[], Any]) -> Optional[Any]:
+        """Constructs a service only if every component it requires was built successfully."""
+        if any(requirement is None for requirement in requirements):
+            logger.critical(f"{name} not created: one or more of its dependencies failed to initialize.")
+            return None
+        return self._build(name, factory)
+
+    def warm_up(self) -> Dict[str, float]:
+        """
+        Imports the lazily loaded subsystems and creates the deferred clients so the first request
+        does not pay for them. Blocking; run it in a worker thread after startup.
+        """
+        subsystems: List[str] = [lazy_imports.SUBSYSTEM_DSP, lazy_imports.SUBSYSTEM_NLU,
+                                 lazy_imports.SUBSYSTEM_MAPS_LEGACY, lazy_imports.SUBSYSTEM_OPENAI]
+        if self.settings.DROWSINESS_DETECTION_ENABLED:
+            subsystems.append(lazy_imports.SUBSYSTEM_VISION)
+        self.warmup_times.update(lazy_imports.warm_up(subsystems))
+
+        for name, client in (("GoogleMapsClient", self.maps_client), ("OpenAiClient", self.openai_client),
+                             ("DspProcessPool", self.dsp_pool)):
+            if client is None:
+                continue
+            start = time.perf_counter()
+            try:
+                client.warm_up()
+            except Exception as e:
+                logger.warning(f"Warm-up of {name} failed: {e}")
+            self.warmup_times[name] = time.perf_counter() - start
+        logger.info(f"Background warm-up finished in {sum(self.warmup_times.values()):.3f}s.")
+        return self.warmup_times
+
+    def close(self) -> None:
+        """Releases resources owned by the container (called from the lifespan on shutdown)."""
+        self.dsp_pool.close()
@@ -6,11 +6,10 @@ from ..models.request import CrashDetectionRequest, AnalyzeSleepinessRequest
 from ..models.response import SafetyResponse
 from ..models.internal import CrashReport, SleepinessReport
 # Services & Dependencies
-from ..services import safety_service
 # Import the dependency getter
 from ..api.dependencies import get_safety_service
 # Exceptions
-from ..core.exception import SafetyError, ConfigurationError, CommunicationError, InvalidRequestError
+from ..core.exception import SafetyError, ConfigurationError, CommunicationError, InvalidRequestError, StateError
 from ..services.safety_service import SafetyService
 
 logger = logging.getLogger(__name__)
@@ -30,7 +29,7 @@ router = APIRouter(
 )
 async def crash_detected(
     request_data: CrashDetectionRequest,
-    # safety_service: SafetyService = Depends(get_safety_service)
+    safety_service: SafetyService = Depends(get_safety_service) # Shared instance, cheap to inject
 ) -> SafetyResponse:
     """
     Endpoint to handle crash detection events reported by the client.
@@ -151,6 +150,10 @@ async def analyze_sleepiness(
     except InvalidRequestError as e:
         logger.warning(f"Invalid request for sleepiness analysis: {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except StateError as e:
+        # Models still warming up on this worker - ask the client to retry shortly
+        logger.warning(f"Sleepiness analysis requested before models were warm: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=e.message, headers={"Retry-After": "5"})
     except SafetyError as e:
         logger.error(f"Error during sleepiness analysis: {e}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error during analysis: {e.message}")
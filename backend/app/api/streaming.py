@@ -0,0 +1,107 @@
+# backend/api/streaming.py
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, status
+
+from ..core.audio_decoding import STREAM_ENCODING_PCM16
+from ..core.exception import InvalidRequestError
+from ..models.internal import SttStreamResult
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/assistant",
+    tags=["Assistant Interaction"],
+)
+
+
+@router.websocket("/stream")
+async def stream_audio(
+    websocket: WebSocket,
+    session_id: str = Query(...),
+    encoding: str = Query(STREAM_ENCODING_PCM16, description="'pcm16' (little-endian) or 'opus' (one packet per message)"),
+    sample_rate: int = Query(16000),
+    channels: int = Query(1),
+    transcribe: bool = Query(False, description="Run streaming speech recognition and push transcripts"),
+    language_code_hint: Optional[str] = Query(None),
+):
+    """
+    Continuous audio stream with server-side end-of-speech detection.
+
+    Protocol:
+      - client sends binary messages with audio frames (any size for pcm16),
+      - server pushes {"type": "speech_start", "t_ms": ...} and
+        {"type": "speech_end", "t_ms": ..., "speech_ms": ..., "audio_ready": true},
+      - with transcribe=true, also {"type": "transcript", "transcript": ..., "is_final": ...}
+        (interim results while the driver talks, final ones shortly after speech_end),
+      - client may send {"type": "stop"} (or just close) to end the stream.
+    After speech_end the utterance is kept on the server: call /assistant/interact with
+    use_streamed_audio=true (and no audio file) to process it; its streamed transcript is reused.
+    """
+    await websocket.accept()
+    container = getattr(websocket.app.state, "container", None)
+    stream_service = getattr(container, "audio_stream_service", None)
+    if stream_service is None:
+        await websocket.send_json({"type": "error", "detail": "Audio streaming service is not available."})
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        return
+
+    send_lock = asyncio.Lock()  # Transcripts are sent from the recognition task, events from this loop
+
+    async def send(payload: dict) -> None:
+        async with send_lock:
+            await websocket.send_json(payload)
+
+    async def send_transcript(result: SttStreamResult) -> None:
+        try:
+            await send({"type": "transcript", **result.model_dump(exclude_none=True)})
+        except Exception:  # Client already gone; the transcript is still kept for /interact
+            logger.debug(f"Could not push transcript to closed stream for session {session_id}.")
+
+    # Narrow streaming STT to the languages this session's driver has used so far
+    conversation_service = getattr(container, "conversation_service", None)
+    candidate_languages = conversation_service.language_candidates(session_id, language_code_hint) if conversation_service else None
+
+    try:
+        stream = stream_service.open(session_id, encoding, sample_rate, channels,
+                                     on_transcript=send_transcript if transcribe else None,
+                                     language_code_hint=language_code_hint,
+                                     candidate_languages=candidate_languages)
+    except InvalidRequestError as e:
+        await websocket.send_json({"type": "error", "detail": e.message})
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
+        return
+
+    try:
+        await send({"type": "ready", "session_id": session_id, "sample_rate": stream.decoder.sample_rate, "transcribe": transcribe})
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                for event in await stream_service.feed(stream, message["bytes"]):
+                    await send(event.model_dump(exclude_none=True))
+            elif message.get("text"):
+                try:
+                    command = json.loads(message["text"])
+                except json.JSONDecodeError:
+                    command = {}
+                if command.get("type") == "stop":
+                    for event in stream_service.close(stream):
+                        await send(event.model_dump(exclude_none=True))
+                    await websocket.close()
+                    return
+    except WebSocketDisconnect:
+        pass
+    except InvalidRequestError as e:
+        logger.warning(f"Invalid audio on stream for session {session_id}: {e.message}")
+        await send({"type": "error", "detail": e.message})
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
+    except Exception as e:
+        logger.exception(f"Unexpected error on audio stream for session {session_id}: {e}")
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+    finally:
+        stream_service.close(stream)  # No-op if already closed by 'stop'
@@ -0,0 +1,157 @@
+# backend/core/admission.py
+import asyncio
+import json
+import logging
+import math
+import time
+from typing import Dict, Optional
+
+from .config import Settings
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SHED_QUEUE_FULL = "queue_full"
+SHED_QUEUE_TIMEOUT = "queue_timeout"
+
+
+class RouteLimiter:
+    """
+    Concurrency limit plus a bounded wait queue for one route.
+
+    Up to `concurrency` requests run at once; up to `max_queue` more wait for a slot (at most
+    `queue_timeout_sec`). Anything beyond that is shed immediately instead of timing out later.
+    """
+
+    def __init__(self, route: str, concurrency: int, max_queue: int, queue_timeout_sec: float):
+        self.route = route
+        self.concurrency = max(1, concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout_sec = queue_timeout_sec
+        self._semaphore: Optional[asyncio.Semaphore] = None  # Created inside the running loop
+        self.in_flight = 0
+        self.waiting = 0
+
+    def _publish(self) -> None:
+        metrics.set_gauge("admission_in_flight", self.in_flight, route=self.route)
+        metrics.set_gauge("admission_queue_depth", self.waiting, route=self.route)
+
+    async def acquire(self) -> Optional[str]:
+        """Waits for a slot. Returns None when admitted, otherwise the shed reason."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()  # Free slot (and nobody queued): returns without suspending
+            metrics.observe("admission_queue_wait_seconds", 0.0, route=self.route)
+        elif self.waiting >= self.max_queue:
+            return SHED_QUEUE_FULL
+        else:
+            self.waiting += 1
+            self._publish()
+            queued_at = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout_sec)
+            except asyncio.TimeoutError:
+                return SHED_QUEUE_TIMEOUT
+            finally:
+                self.waiting -= 1
+                self._publish()
+            metrics.observe("admission_queue_wait_seconds", time.perf_counter() - queued_at, route=self.route)
+        self.in_flight += 1
+        self._publish()
+        return None
+
+    def release(self, service_seconds: float) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+        self._publish()
+        metrics.observe("admission_service_seconds", service_seconds, route=self.route)
+
+    def retry_after_seconds(self, default: int) -> int:
+        """Estimates when a slot frees up: queued work / concurrency * median service time."""
+        median = metrics.percentile("admission_service_seconds", 50, route=self.route)
+        if median is None:
+            return default
+        estimate = (self.waiting + self.in_flight) / self.concurrency * median
+        return int(min(60, max(1, math.ceil(estimate))))
+
+    def stats(self) -> Dict[str, int]:
+        return {"concurrency": self.concurrency, "max_queue": self.max_queue,
+                "in_flight": self.in_flight, "queue_depth": self.waiting}
+
+
+class AdmissionControlMiddleware:
+    """
+    Pure ASGI middleware applying per-route admission limits (settings.ADMISSION_LIMITS).
+
+    Requests over the limit get 503 with a Retry-After header instead of piling up until every
+    request times out together. Paths in settings.ADMISSION_RESERVED_PATHS (crash reports) are
+    always admitted on a reserved lane, regardless of load on the other routes.
+    """
+
+    def __init__(self, app, settings: Settings):
+        self.app = app
+        self.settings = settings
+        self.reserved_paths = set(settings.ADMISSION_RESERVED_PATHS)
+        self.limiters: Dict[str, RouteLimiter] = {
+            route: RouteLimiter(
+                route,
+                concurrency=int(limits.get("concurrency", 1)),
+                max_queue=int(limits.get("queue", 0)),
+                queue_timeout_sec=settings.ADMISSION_QUEUE_TIMEOUT_SEC,
+            )
+            for route, limits in settings.ADMISSION_LIMITS.items()
+        }
+        for limiter in self.limiters.values():
+            limiter._publish()
+        logger.info(f"Admission control enabled for: {', '.join(self.limiters) or 'no routes'} "
+                    f"(reserved lane: {', '.join(self.reserved_paths) or 'none'}).")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope.get("path", "")
+        if path in self.reserved_paths:
+            metrics.inc("admission_admitted_total", route=path, lane="reserved")
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters.get(path)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        shed_reason = await limiter.acquire()
+        if shed_reason is not None:
+            metrics.inc("admission_shed_total", route=path, reason=shed_reason)
+            retry_after = limiter.retry_after_seconds(self.settings.ADMISSION_RETRY_AFTER_SEC)
+            logger.warning(f"Shedding request to {path} ({shed_reason}; in flight: {limiter.in_flight}, "
+                           f"queued: {limiter.waiting}). Retry-After: {retry_after}s")
+            await self._send_overloaded(send, retry_after)
+            return
+
+        metrics.inc("admission_admitted_total", route=path, lane="standard")
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - started_at)
+
+    @staticmethod
+    async def _send_overloaded(send, retry_after: int) -> None:
+        body = json.dumps({"detail": "Server is busy, please retry shortly."}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(retry_after).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {route: limiter.stats() for route, limiter in self.limiters.items()}
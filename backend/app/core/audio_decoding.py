@@ -0,0 +1,309 @@
+# backend/core/audio_decoding.py
+import io
+import logging
+import shutil
+import subprocess
+import wave
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .exception import InvalidRequestError
+from .lazy_imports import LazyModule, is_available, SUBSYSTEM_DSP
+
+logger = logging.getLogger(__name__)
+
+# In-process decoders: libsndfile (WAV/FLAC/OGG) and libav via PyAV (AAC/M4A/MP3/WebM).
+# ffmpeg as a subprocess is only used if neither can handle the upload.
+sf = LazyModule("soundfile", SUBSYSTEM_DSP)
+av = LazyModule("av", SUBSYSTEM_DSP)
+SOUNDFILE_AVAILABLE = is_available("soundfile")
+PYAV_AVAILABLE = is_available("av")
+if not SOUNDFILE_AVAILABLE:
+    logger.warning("soundfile library not found. WAV/FLAC uploads will fall back to PyAV/ffmpeg.")
+if not PYAV_AVAILABLE:
+    logger.warning("PyAV (av) library not found. AAC/M4A uploads will fall back to the ffmpeg subprocess.")
+
+# Container formats recognised from the first bytes of the upload
+FORMAT_WAV = "wav"
+FORMAT_FLAC = "flac"
+FORMAT_OGG = "ogg"
+FORMAT_MP4 = "mp4"  # M4A/AAC in an MP4 container (Expo HIGH_QUALITY preset)
+FORMAT_AAC = "aac"  # Raw ADTS AAC
+FORMAT_MP3 = "mp3"
+FORMAT_WEBM = "webm"
+
+SOUNDFILE_FORMATS = {FORMAT_WAV, FORMAT_FLAC, FORMAT_OGG}
+
+# Content types declaring headerless 16-bit PCM. audio/L16 is big-endian (RFC 3551) unless the
+# `endianness=little-endian` parameter says otherwise; audio/pcm is little-endian.
+PCM16_CONTENT_TYPES = {"audio/l16": ">i2", "audio/pcm": "<i2", "audio/x-pcm": "<i2"}
+DEFAULT_PCM16_SAMPLE_RATE = 16000
+
+DECODER_PCM16 = "pcm16"
+DECODER_SOUNDFILE = "soundfile"
+DECODER_PYAV = "pyav"
+DECODER_FFMPEG = "ffmpeg"
+
+
+def sniff_format(data: bytes) -> Optional[str]:
+    """Recognises the container format from its magic bytes. Returns None if unknown."""
+    head = data[:16]
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return FORMAT_WAV
+    if head[:4] == b"fLaC":
+        return FORMAT_FLAC
+    if head[:4] == b"OggS":
+        return FORMAT_OGG
+    if head[4:8] == b"ftyp":
+        return FORMAT_MP4
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return FORMAT_WEBM
+    if head[:3] == b"ID3":
+        return FORMAT_MP3
+    if len(head) >= 2 and head[0] == 0xFF:
+        if head[1] & 0xF6 == 0xF0:  # ADTS sync word, layer 0
+            return FORMAT_AAC
+        if head[1] & 0xE0 == 0xE0:  # MPEG audio frame sync
+            return FORMAT_MP3
+    return None
+
+
+def parse_pcm16_content_type(content_type: Optional[str]) -> Optional[Tuple[str, int, int]]:
+    """
+    Parses e.g. 'audio/L16; rate=16000; channels=1'. Returns (numpy dtype, sample rate, channels)
+    for raw PCM16 content types, None for anything else.
+    """
+    if not content_type:
+        return None
+    parts = [p.strip() for p in content_type.split(";")]
+    dtype = PCM16_CONTENT_TYPES.get(parts[0].lower())
+    if dtype is None:
+        return None
+    params = {}
+    for part in parts[1:]:
+        key, _, value = part.partition("=")
+        params[key.strip().lower()] = value.strip().strip('"').lower()
+    if params.get("endianness") == "little-endian":
+        dtype = "<i2"
+    elif params.get("endianness") == "big-endian":
+        dtype = ">i2"
+    try:
+        sample_rate = int(params.get("rate", DEFAULT_PCM16_SAMPLE_RATE))
+        channels = int(params.get("channels", 1))
+    except ValueError as e:
+        raise InvalidRequestError(f"Invalid PCM16 content type parameters: '{content_type}'", original_exception=e)
+    if sample_rate <= 0 or channels <= 0:
+        raise InvalidRequestError(f"Invalid PCM16 content type parameters: '{content_type}'")
+    return dtype, sample_rate, channels
+
+
+def _to_mono(samples: np.ndarray) -> np.ndarray:
+    """(frames, channels) int16 -> (frames,) int16. Mono input is returned without copying."""
+    if samples.ndim == 1:
+        return samples
+    if samples.shape[1] == 1:
+        return samples[:, 0]
+    return samples.mean(axis=1, dtype=np.float32).astype(np.int16)
+
+
+def _decode_pcm16(data: bytes, dtype: str, channels: int) -> np.ndarray:
+    usable = len(data) - len(data) % (2 * channels)  # Drop a trailing partial frame
+    samples = np.frombuffer(data, dtype=dtype, count=usable // 2)
+    if samples.dtype.byteorder not in ("=", "|"):
+        samples = samples.astype(np.int16)  # Byte-swap big-endian input to native order
+    return _to_mono(samples.reshape(-1, channels))
+
+
+def _decode_soundfile(data: bytes) -> Tuple[np.ndarray, int]:
+    samples, sample_rate = sf.read(io.BytesIO(data), dtype="int16", always_2d=True)
+    return _to_mono(samples), int(sample_rate)
+
+
+def _decode_pyav(data: bytes) -> Tuple[np.ndarray, int]:
+    with av.open(io.BytesIO(data), mode="r") as container:
+        if not container.streams.audio:
+            raise InvalidRequestError("The uploaded file contains no audio stream.")
+        stream = container.streams.audio[0]
+        sample_rate = stream.codec_context.sample_rate or stream.rate
+        # libav converts to packed s16 mono in C; frames are copied straight into NumPy arrays
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=sample_rate)
+        chunks = []
+        for frame in container.decode(stream):
+            for out in resampler.resample(frame):
+                chunks.append(out.to_ndarray().reshape(-1))
+        for out in resampler.resample(None):  # Flush
+            chunks.append(out.to_ndarray().reshape(-1))
+    if not chunks:
+        return np.zeros(0, dtype=np.int16), int(sample_rate)
+    return np.concatenate(chunks).astype(np.int16, copy=False), int(sample_rate)
+
+
+def _decode_ffmpeg(data: bytes, ffmpeg_binary: str) -> Tuple[np.ndarray, int]:
+    executable = shutil.which(ffmpeg_binary)
+    if executable is None:
+        raise InvalidRequestError(f"Unsupported audio format and no ffmpeg executable ('{ffmpeg_binary}') found for fallback decoding.")
+    # ffmpeg writes a WAV stream to stdout, which is then read back through the soundfile path
+    proc = subprocess.run(
+        [executable, "-nostdin", "-loglevel", "error", "-i", "pipe:0", "-ac", "1", "-f", "wav", "-acodec", "pcm_s16le", "pipe:1"],
+        input=data, capture_output=True, check=False,
+    )
+    if proc.returncode != 0 or not proc.stdout:
+        raise InvalidRequestError(f"ffmpeg could not decode the audio: {proc.stderr.decode(errors='replace').strip()[:200]}")
+    if SOUNDFILE_AVAILABLE:
+        return _decode_soundfile(proc.stdout)
+    # Minimal RIFF reader: ffmpeg's piped WAV header is 44 bytes with an unknown data length
+    sample_rate = int.from_bytes(proc.stdout[24:28], "little")
+    return _decode_pcm16(proc.stdout[44:], "<i2", 1), sample_rate
+
+
+def decode_audio(
+    data: bytes, content_type: Optional[str] = None, ffmpeg_binary: str = "ffmpeg"
+) -> Tuple[np.ndarray, int, str]:
+    """
+    Decodes an upload to mono int16 samples without leaving the process where possible.
+
+    Order: raw PCM16 declared by content type (no decoding) -> libsndfile (WAV/FLAC/OGG) ->
+    PyAV (AAC/M4A/MP3/WebM, and anything libsndfile rejected) -> ffmpeg subprocess.
+
+    Returns: (samples, sample rate, name of the decoder used).
+    Raises: InvalidRequestError if the audio cannot be decoded.
+    """
+    if not data:
+        raise InvalidRequestError("Cannot process empty audio data.")
+
+    pcm = parse_pcm16_content_type(content_type)
+    if pcm is not None:
+        dtype, sample_rate, channels = pcm
+        return _decode_pcm16(data, dtype, channels), sample_rate, DECODER_PCM16
+
+    fmt = sniff_format(data)
+    errors = []
+    if SOUNDFILE_AVAILABLE and (fmt in SOUNDFILE_FORMATS or fmt is None):
+        try:
+            samples, sample_rate = _decode_soundfile(data)
+            return samples, sample_rate, DECODER_SOUNDFILE
+        except Exception as e:
+            errors.append(f"soundfile: {e}")
+    if PYAV_AVAILABLE:
+        try:
+            samples, sample_rate = _decode_pyav(data)
+            return samples, sample_rate, DECODER_PYAV
+        except InvalidRequestError:
+            raise
+        except Exception as e:
+            errors.append(f"pyav: {e}")
+
+    logger.warning(f"In-process decoding failed for format '{fmt or 'unknown'}' ({'; '.join(errors) or 'no decoder available'}). "
+                   f"Falling back to the ffmpeg subprocess.")
+    samples, sample_rate = _decode_ffmpeg(data, ffmpeg_binary)
+    return samples, sample_rate, DECODER_FFMPEG
+
+
+STREAM_ENCODING_PCM16 = "pcm16"  # Little-endian interleaved 16-bit PCM
+STREAM_ENCODING_OPUS = "opus"  # One Opus packet per binary WebSocket message
+STREAM_OPUS_SAMPLE_RATE = 16000  # Opus streams are decoded straight to 16 kHz mono
+
+
+class StreamDecoder:
+    """
+    Decodes the frames of a continuous audio stream (WebSocket binary messages) to int16 mono.
+    PCM16 keeps the stream's sample rate; Opus packets are decoded with libopus via PyAV and
+    resampled to STREAM_OPUS_SAMPLE_RATE by a stateful libav resampler.
+    """
+
+    def __init__(self, encoding: str, sample_rate: int, channels: int = 1):
+        if encoding not in (STREAM_ENCODING_PCM16, STREAM_ENCODING_OPUS):
+            raise InvalidRequestError(f"Unsupported stream encoding '{encoding}'. Use 'pcm16' or 'opus'.")
+        if sample_rate <= 0 or channels <= 0:
+            raise InvalidRequestError("Stream sample_rate and channels must be positive.")
+        self.encoding = encoding
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self._carry = b""  # Partial PCM frame left over from the previous message
+        self._codec = None
+        self._resampler = None
+        if encoding == STREAM_ENCODING_OPUS:
+            if not PYAV_AVAILABLE:
+                raise InvalidRequestError("Opus streams need PyAV (av), which is not installed. Stream 'pcm16' instead.")
+            self._codec = av.CodecContext.create("opus", "r")
+            self._codec.sample_rate = sample_rate
+            self._resampler = av.AudioResampler(format="s16", layout="mono", rate=STREAM_OPUS_SAMPLE_RATE)
+            self.sample_rate = STREAM_OPUS_SAMPLE_RATE
+
+    def decode(self, data: bytes) -> np.ndarray:
+        if self.encoding == STREAM_ENCODING_PCM16:
+            data = self._carry + data if self._carry else data
+            frame_bytes = 2 * self.channels
+            usable = len(data) - len(data) % frame_bytes
+            self._carry = data[usable:]
+            return _decode_pcm16(data[:usable], "<i2", self.channels)
+
+        chunks = []
+        for frame in self._codec.decode(av.Packet(data)):
+            for out in self._resampler.resample(frame):
+                chunks.append(out.to_ndarray().reshape(-1))
+        if not chunks:
+            return np.zeros(0, dtype=np.int16)
+        return np.concatenate(chunks).astype(np.int16, copy=False)
+
+
+def encode_wav_pcm16(samples: np.ndarray, sample_rate: int) -> bytes:
+    """Wraps mono int16 samples in a WAV container (for APIs that need a file, e.g. Whisper)."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(memoryview(np.ascontiguousarray(samples, dtype="<i2")).cast("B"))
+    return buffer.getvalue()
+
+
+# Upload encodings for file-based STT APIs (Whisper)
+UPLOAD_FORMAT_WAV = "wav"
+UPLOAD_FORMAT_FLAC = "flac"  # Lossless; smaller than WAV for recorded speech (pauses, band-limited audio)
+UPLOAD_FORMAT_OPUS = "opus"  # Ogg/Opus, ~10x smaller than WAV at speech bitrates (lossy)
+UPLOAD_FILE_EXTENSIONS = {UPLOAD_FORMAT_WAV: "wav", UPLOAD_FORMAT_FLAC: "flac", UPLOAD_FORMAT_OPUS: "ogg"}
+
+
+def _encode_flac(samples: np.ndarray, sample_rate: int) -> bytes:
+    buffer = io.BytesIO()
+    sf.write(buffer, np.ascontiguousarray(samples, dtype=np.int16), sample_rate, format="FLAC", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+def _encode_opus(samples: np.ndarray, sample_rate: int, bitrate: int) -> bytes:
+    # libopus through PyAV: libsndfile's Ogg/Opus writer is ~100x slower (fixed maximum complexity)
+    buffer = io.BytesIO()
+    with av.open(buffer, mode="w", format="ogg") as container:
+        stream = container.add_stream("libopus", rate=sample_rate if sample_rate in (8000, 12000, 16000, 24000, 48000) else 48000)
+        stream.bit_rate = bitrate
+        frame = av.AudioFrame.from_ndarray(np.ascontiguousarray(samples, dtype=np.int16).reshape(1, -1), format="s16", layout="mono")
+        frame.sample_rate = sample_rate
+        for packet in stream.encode(frame):  # PyAV resamples/re-frames to the encoder's frame size
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buffer.getvalue()
+
+
+def encode_for_upload(samples: np.ndarray, sample_rate: int, upload_format: str = UPLOAD_FORMAT_FLAC,
+                      opus_bitrate: int = 32000) -> Tuple[bytes, str]:
+    """
+    Encodes mono int16 samples in-process for a file upload. Returns (file bytes, format actually
+    used): Opus needs PyAV and FLAC needs soundfile; without them (or if encoding fails) the next
+    simpler format is used, ending with WAV, which always works.
+    """
+    if upload_format == UPLOAD_FORMAT_OPUS:
+        if PYAV_AVAILABLE:
+            try:
+                return _encode_opus(samples, sample_rate, opus_bitrate), UPLOAD_FORMAT_OPUS
+            except Exception as e:
+                logger.warning(f"Opus encoding failed ({e}); uploading FLAC instead.")
+        upload_format = UPLOAD_FORMAT_FLAC
+    if upload_format == UPLOAD_FORMAT_FLAC and SOUNDFILE_AVAILABLE:
+        try:
+            return _encode_flac(samples, sample_rate), UPLOAD_FORMAT_FLAC
+        except Exception as e:
+            logger.warning(f"FLAC encoding failed ({e}); uploading WAV instead.")
+    return encode_wav_pcm16(samples, sample_rate), UPLOAD_FORMAT_WAV
@@ -2,30 +2,28 @@
 import numpy as np
 import logging
 import warnings
+from typing import Any, Dict, List, Optional, Tuple
 
-# Import librosa and handle potential errors if not installed
-try:
-    import librosa
-    LIBROSA_AVAILABLE = True
-except ImportError:
-    LIBROSA_AVAILABLE = False
+from ..models.internal import SpeechActivityResult
+
+from .lazy_imports import LazyModule, is_available, SUBSYSTEM_DSP
+
+# librosa, noisereduce and scipy are heavy; they are imported on first use (or by the
+# startup warm-up task) rather than when this module is imported.
+librosa = LazyModule("librosa", SUBSYSTEM_DSP)
+LIBROSA_AVAILABLE = is_available("librosa")
+if not LIBROSA_AVAILABLE:
     # We need librosa for simple_vad, so NR won't work without it
     logging.error("Librosa library not found. Please install it (`pip install librosa`). VAD and noise reduction depend on it.")
 
-# Import noisereduce; handle error if not installed
-try:
-    import noisereduce as nr
-    NOISEREDUCE_AVAILABLE = True
-except ImportError:
-    NOISEREDUCE_AVAILABLE = False
+nr = LazyModule("noisereduce", SUBSYSTEM_DSP)
+NOISEREDUCE_AVAILABLE = is_available("noisereduce")
+if not NOISEREDUCE_AVAILABLE:
     logging.error("noisereduce library not found. Please install it (`pip install noisereduce`). Tunable noise reduction will be skipped.")
 
-# Import scipy.signal and handle potential errors
-try:
-    from scipy import signal
-    SCIPY_AVAILABLE = True
-except ImportError:
-    SCIPY_AVAILABLE = False
+signal = LazyModule("scipy.signal", SUBSYSTEM_DSP)
+SCIPY_AVAILABLE = is_available("scipy")
+if not SCIPY_AVAILABLE:
     logging.error("SciPy library not found. Please install it (`pip install scipy`). Some audio processing features might be limited.")
 
 
@@ -60,28 +58,271 @@ def simple_vad(audio: np.ndarray, sr: int, frame_length=2048, hop_length=512, en
         n_frames = 1 + max(0, len(audio) - frame_length) // hop_length
         return np.zeros(n_frames, dtype=bool)
 
+# --- Silence trimming (before STT) ---
+def speech_bounds(
+    samples: np.ndarray, # int16 mono samples
+    sr: int,
+    padding_ms: float = 300.0,
+    energy_thresh_db: float = -40.0
+    ) -> Tuple[int, int]:
+    """
+    Finds the span from the first to the last speech frame (simple_vad, 25 ms frames / 10 ms hop),
+    widened by `padding_ms` on both sides so word onsets and tails are not clipped.
+
+    Returns: (start, end) sample indices. The full range is returned when VAD finds no speech
+    or is unavailable, so a failed VAD never drops audio.
+    """
+    n = len(samples)
+    if n == 0 or not LIBROSA_AVAILABLE:
+        return 0, n
+
+    frame_length, hop_length = vad_frame_geometry(sr)
+    audio_float = samples.astype(np.float32)  # VAD thresholds are relative to the loudest frame: no scaling needed
+    vad_mask = simple_vad(audio_float, sr, frame_length=frame_length, hop_length=hop_length, energy_thresh_db=energy_thresh_db)
+    speech_frames = np.flatnonzero(vad_mask)
+    if len(speech_frames) == 0:
+        return 0, n
+
+    padding = int(sr * padding_ms / 1000.0)
+    # librosa centres frames: frame i covers samples around i * hop_length
+    start = max(0, int(speech_frames[0]) * hop_length - frame_length // 2 - padding)
+    end = min(n, int(speech_frames[-1]) * hop_length + frame_length // 2 + padding)
+    return start, end
+
+# --- Segmentation of long recordings (parallel STT) ---
+def pause_split_points(
+    samples: np.ndarray, # int16 mono samples
+    sr: int,
+    max_segment_sec: float = 20.0,
+    min_segment_sec: float = 5.0,
+    energy_thresh_db: float = -40.0
+    ) -> List[Tuple[int, int]]:
+    """
+    Splits a long recording into consecutive (start, end) sample ranges of at most `max_segment_sec`,
+    cutting in pauses so no word is split. Each cut is placed in the middle of the longest run of
+    non-speech frames (25 ms / 10 ms hop, energy more than `energy_thresh_db` below the loudest frame)
+    between `min_segment_sec` and `max_segment_sec` after the previous cut; without any pause there
+    the quietest frame is used. The ranges cover the whole input.
+    """
+    n = len(samples)
+    max_len = int(sr * max_segment_sec)
+    if n <= max_len or max_len <= 0:
+        return [(0, n)]
+    frame_length, hop_length = vad_frame_geometry(sr)
+    if n < frame_length:
+        return [(0, n)]
+
+    # Frame energies from a running sum of squares (no frame matrix; numpy only, works without librosa)
+    cumulative = np.concatenate(([0.0], np.cumsum(np.square(samples, dtype=np.float64))))
+    frame_starts = np.arange(0, n - frame_length + 1, hop_length)
+    energy = (cumulative[frame_starts + frame_length] - cumulative[frame_starts]) / frame_length
+    energy_db = 10.0 * np.log10(energy + 1e-10)
+    silent = energy_db < energy_db.max() + energy_thresh_db
+
+    min_len = min(int(sr * min_segment_sec), max_len)
+    segments, start = [], 0
+    while n - start > max_len:
+        lo = (start + min_len) // hop_length
+        hi = min(len(silent), (start + max_len - frame_length) // hop_length + 1)
+        if hi <= lo:
+            cut = start + max_len
+        else:
+            window = silent[lo:hi]
+            edges = np.diff(np.concatenate(([0], window.astype(np.int8), [0])))
+            run_starts, run_ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+            if len(run_starts):
+                longest = int(np.argmax(run_ends - run_starts))
+                frame = lo + (int(run_starts[longest]) + int(run_ends[longest])) // 2
+            else:
+                frame = hi - 1 - int(np.argmin(energy_db[lo:hi][::-1]))  # Latest quietest frame: fewer segments
+            cut = frame * hop_length + frame_length // 2  # Centre of the chosen frame
+        segments.append((start, cut))
+        start = cut
+    segments.append((start, n))
+    return segments
+
+# --- Local speech-activity detection (/assistant/detect-speech, /assistant/stream) ---
+def vad_frame_geometry(sr: int) -> Tuple[int, int]:
+    """(frame_length, hop_length) used by the VADs: ~25 ms frames (power of two) with a 10 ms hop."""
+    return 1 << int(np.ceil(np.log2(max(2, int(sr * 0.025))))), max(1, sr // 100)
+
+
+def vad_frame_features(frames: np.ndarray, sr: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per-frame VAD features for float32 frames of shape (n_frames, frame_length), scaled to [-1, 1].
+    Returns (frame level dBFS, 300-3400 Hz band level dB, band spectral flatness, band energy ratio).
+    """
+    eps = 1e-10
+    frame_length = frames.shape[1]
+    frame_dbfs = 10.0 * np.log10(np.mean(frames * frames, axis=1) + eps)
+    power = np.abs(np.fft.rfft(frames * np.hanning(frame_length).astype(np.float32), axis=1)) ** 2 + eps
+    freqs = np.fft.rfftfreq(frame_length, 1.0 / sr)
+    band = (freqs >= 300.0) & (freqs <= 3400.0)
+    band_power = power[:, band]
+    band_db = 10.0 * np.log10(band_power.sum(axis=1))
+    flatness = np.exp(np.mean(np.log(band_power), axis=1)) / np.mean(band_power, axis=1)
+    band_ratio = band_power.sum(axis=1) / power.sum(axis=1)
+    return frame_dbfs, band_db, flatness, band_ratio
+
+
+def detect_speech_activity(
+    samples: np.ndarray, # int16 mono samples (16 kHz recommended)
+    sr: int,
+    energy_floor_dbfs: float = -50.0,
+    snr_margin_db: float = 6.0,
+    max_flatness: float = 0.5,
+    min_speech_band_ratio: float = 0.2,
+    min_speech_ms: float = 150.0,
+    band_noise_floor_db: Optional[float] = None # Session's band floor (NoiseProfileStore.band_floor_db)
+    ) -> SpeechActivityResult:
+    """
+    CPU-only speech/no-speech decision for a short chunk, without any cloud call.
+
+    A 25 ms frame (10 ms hop) counts as speech when all of these hold:
+      - simple_vad marks it active (energy within 40 dB of the loudest frame),
+      - its absolute level is above `energy_floor_dbfs`,
+      - its 300-3400 Hz band energy is `snr_margin_db` above that band's noise floor (10th
+        percentile over the chunk, or the session's floor if lower - a short chunk that is mostly
+        speech has no noise frames of its own), so engine rumble below 300 Hz does not mask speech,
+      - the band's spectrum is harmonic rather than noise-like (flatness below `max_flatness`), and
+      - at least `min_speech_band_ratio` of its energy is in that band.
+    Speech is detected if at least `min_speech_ms` of consecutive frames qualify.
+    """
+    frame_length, hop_length = vad_frame_geometry(sr)
+    if len(samples) < frame_length:
+        return SpeechActivityResult(speech_detected=False)
+
+    audio = samples.astype(np.float32)
+    audio *= np.float32(1.0 / np.iinfo(np.int16).max)
+
+    # Frames centred like librosa's (simple_vad), so the masks line up frame for frame
+    padded = np.pad(audio, frame_length // 2)
+    frames = np.lib.stride_tricks.sliding_window_view(padded, frame_length)[::hop_length]
+    active = simple_vad(audio, sr, frame_length=frame_length, hop_length=hop_length)
+    n_frames = min(len(frames), len(active))
+    frames, active = frames[:n_frames], active[:n_frames]
+
+    frame_dbfs, band_db, flatness, band_ratio = vad_frame_features(frames, sr)
+
+    chunk_band_floor = float(np.percentile(band_db, 10))
+    noise_floor = chunk_band_floor if band_noise_floor_db is None else min(chunk_band_floor, band_noise_floor_db)
+    speech = (active
+              & (frame_dbfs > energy_floor_dbfs)
+              & (band_db > noise_floor + snr_margin_db)
+              & (flatness < max_flatness)
+              & (band_ratio > min_speech_band_ratio))
+
+    # Longest run of consecutive speech frames
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    run_lengths = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+    longest_ms = float(run_lengths.max()) * 1000.0 * hop_length / sr if len(run_lengths) else 0.0
+
+    return SpeechActivityResult(
+        speech_detected=longest_ms >= min_speech_ms,
+        speech_ratio=float(speech.mean()),
+        longest_speech_ms=longest_ms,
+        noise_floor_dbfs=float(np.percentile(frame_dbfs, 10)),
+        peak_dbfs=float(frame_dbfs.max()),
+        band_noise_floor_db=chunk_band_floor,
+    )
+
+# --- Sample-rate normalisation (before noise reduction and STT) ---
+def resample_pcm16(samples: np.ndarray, sr: int, target_sr: int) -> Tuple[np.ndarray, int]:
+    """
+    Polyphase resampling of int16 mono samples to `target_sr` (scipy.signal.resample_poly).
+    Speech needs no more than 16 kHz; resampling early cuts the STFT work in noise reduction and
+    the STT upload size by the same ratio.
+
+    Returns: (samples, sample rate). The input is returned unchanged if no resampling is needed.
+    """
+    if target_sr <= 0 or target_sr == sr or len(samples) == 0:
+        return samples, sr
+    if not SCIPY_AVAILABLE:
+        logger.warning(f"SciPy not available, cannot resample {sr} Hz -> {target_sr} Hz. Keeping the native rate.")
+        return samples, sr
+
+    g = np.gcd(int(sr), int(target_sr))
+    resampled = signal.resample_poly(samples.astype(np.float32), target_sr // g, sr // g)  # float32 in -> float32 out
+    np.rint(resampled, out=resampled)
+    np.clip(resampled, np.iinfo(np.int16).min, np.iinfo(np.int16).max, out=resampled)
+    return resampled.astype(np.int16), int(target_sr)
+
+class StreamResampler:
+    """
+    Stateful version of resample_pcm16 for audio that arrives in small chunks (WebSocket frames).
+    Resampling each chunk on its own zero-pads every chunk edge, which puts a click on every frame
+    boundary; this keeps the filter history between calls instead (same kaiser FIR as resample_poly,
+    about half a millisecond of delay). Input that does not fill a whole resampling period is
+    carried over to the next call.
+    """
+
+    def __init__(self, sr: int, target_sr: int):
+        self.sr, self.target_sr = int(sr), int(target_sr)
+        g = np.gcd(self.sr, self.target_sr)
+        self.up, self.down = self.target_sr // g, self.sr // g
+        self.passthrough = self.up == self.down
+        if self.passthrough:
+            return
+        if not SCIPY_AVAILABLE:
+            raise RuntimeError(f"SciPy is required to resample a stream from {sr} Hz to {target_sr} Hz.")
+        max_rate = max(self.up, self.down)
+        self.h = signal.firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=("kaiser", 5.0)).astype(np.float32) * self.up
+        # History long enough to cover the filter, in whole periods so output phases line up across calls
+        periods = -(-len(self.h) // (self.up * self.down)) + 1
+        self.history_len = periods * self.down
+        self._history = np.zeros(self.history_len, dtype=np.float32)
+        self._carry = np.zeros(0, dtype=np.float32)
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resamples the next int16 chunk. Returns int16 samples at target_sr (may be empty)."""
+        if self.passthrough:
+            return samples
+        x = np.concatenate((self._carry, samples.astype(np.float32)))
+        usable = len(x) - len(x) % self.down
+        self._carry = x[usable:]
+        if usable == 0:
+            return np.zeros(0, dtype=np.int16)
+        block = np.concatenate((self._history, x[:usable]))
+        self._history = block[-self.history_len:]
+        first = self.history_len * self.up // self.down
+        out = signal.upfirdn(self.h, block, self.up, self.down)[first:first + usable * self.up // self.down]
+        np.rint(out, out=out)
+        np.clip(out, np.iinfo(np.int16).min, np.iinfo(np.int16).max, out=out)
+        return out.astype(np.int16)
+
 # --- Noise Reduction Method: Tunable Noisereduce (Adapted from noise_reduction.py) ---
+NR_N_FFT = 2048  # STFT geometry of the noise reduction (and of the per-session noise profiles)
+NR_HOP_LENGTH = 512
+
+
 def apply_tunable_noise_reduction(
     audio_data: np.ndarray, # Expects float32 numpy array
     sr: int,
     prop_decrease=0.95,
     time_smooth_ms=80,
     freq_smooth_hz=150, # Note: freq_smooth_hz is not used in the original function's nr.reduce_noise call
-    n_passes=1
+    n_passes=1,
+    stationary=False, # True = cheap stationary gating (used by the quality controller under load)
+    shared_stft=True, # True = denoise_shared_stft (SciPy only); False = simple_vad + noisereduce per pass
+    noise_profile: Optional[Tuple[np.ndarray, np.ndarray]] = None, # Session noise (mean_db, std_db); shared STFT only
+    noise_out: Optional[Dict[str, Any]] = None # Receives the clip's noise observation; shared STFT only
     ) -> np.ndarray:
     """
-    Applies noisereduce with tunable parameters directly on a NumPy array.
-    Requires noisereduce and librosa.
+    Applies noisereduce-style spectral gating with tunable parameters directly on a NumPy array.
+    The shared-STFT stage needs SciPy; the noisereduce path needs noisereduce and librosa.
     """
-    if not NOISEREDUCE_AVAILABLE:
+    if shared_stft and not SCIPY_AVAILABLE:
+         logger.error("Cannot apply tunable noise reduction: 'scipy' library not available.")
+         return audio_data
+    if not shared_stft and not NOISEREDUCE_AVAILABLE:
          logger.error("Cannot apply tunable noise reduction: 'noisereduce' library not available.")
          return audio_data
-    if not LIBROSA_AVAILABLE:
+    if not shared_stft and not LIBROSA_AVAILABLE:
          logger.error("Cannot apply tunable noise reduction: 'librosa' library not available (needed for VAD).")
          return audio_data
 
     logger.debug(f"Applying tunable noisereduce...")
-    logger.debug(f"  Parameters: prop_decrease={prop_decrease}, time_smooth_ms={time_smooth_ms}, passes={n_passes}")
+    logger.debug(f"  Parameters: prop_decrease={prop_decrease}, time_smooth_ms={time_smooth_ms}, passes={n_passes}, shared_stft={shared_stft}")
 
     # Ensure input is float32, as expected by noisereduce and VAD helpers
     if not np.issubdtype(audio_data.dtype, np.floating):
@@ -95,71 +336,59 @@ def apply_tunable_noise_reduction(
              audio_data = audio_data.astype(np.float32)
 
 
-    n_fft = 2048
-    hop_length = 512 # Must match VAD hop_length if used for noise estimation
+    n_fft = NR_N_FFT
+    hop_length = NR_HOP_LENGTH # Must match VAD hop_length if used for noise estimation
     if len(audio_data) < n_fft:
          logger.warning("Audio too short for tunable Noisereduce processing.")
          return audio_data
 
-    processed_audio = audio_data.copy() # Work on a copy
+    processed_audio = audio_data # Read-only below; noisereduce returns a new array
 
     try:
-        noise_clip = None
-        # Estimate noise from likely non-speech parts (using VAD) only for first pass
-        if n_passes > 0: # Only estimate if we are actually doing a pass
-            logger.debug("  Estimating noise profile for first pass using VAD...")
-            # Use VAD with the same hop_length as STFT defaults in noisereduce
-            vad_mask_frames = simple_vad(processed_audio, sr, frame_length=n_fft, hop_length=hop_length)
-            noise_frame_indices = np.where(~vad_mask_frames)[0]
-
-            if len(noise_frame_indices) > 1:
-                noise_segments = []
-                for idx in noise_frame_indices:
-                    start_sample = idx * hop_length
-                    end_sample = start_sample + n_fft
-                    # Ensure segment slicing is within bounds
-                    segment = processed_audio[start_sample : min(end_sample, len(processed_audio))]
-                    if len(segment) > 0:
-                         noise_segments.append(segment)
-
-                if noise_segments:
-                    noise_clip_concat = np.concatenate(noise_segments)
-                    # Check if concatenated noise is long enough for FFT analysis
-                    if len(noise_clip_concat) >= n_fft:
-                         noise_clip = noise_clip_concat
-                         logger.debug(f"  VAD-based noise clip created, length: {len(noise_clip)} samples.")
-                    else: logger.warning(f"  Concatenated noise segments too short ({len(noise_clip_concat)} < {n_fft}).")
-                else: logger.warning("  No valid noise segments collected from VAD.")
-            else: logger.warning("  Not enough noise frames identified by VAD (< 2).")
-
-            # Fallback if noise estimation failed
-            if noise_clip is None:
-                 logger.warning("  Using start of audio for noise profile fallback.")
-                 noise_duration_samples = min(len(processed_audio), int(sr * 0.5)) # Use up to first 0.5 seconds
-                 if noise_duration_samples >= n_fft:
-                      noise_clip = processed_audio[:noise_duration_samples]
-                 else:
-                      logger.error("  Fallback noise clip also too short. Cannot perform noise reduction.")
-                      return audio_data # Return original if no noise profile possible
+        if shared_stft:
+            processed_audio = denoise_shared_stft(
+                processed_audio, sr, prop_decrease=prop_decrease, time_smooth_ms=time_smooth_ms,
+                n_passes=n_passes, stationary=stationary, n_fft=n_fft, hop_length=hop_length,
+                noise_profile=noise_profile, noise_out=noise_out)
+            logger.debug("Tunable noise reduction applied (shared STFT).")
+            return processed_audio
 
+        noise_stats = None
+        # Only the stationary gate uses a noise profile: noisereduce's non-stationary gate ignores
+        # y_noise and tracks the noise floor over time itself, so nothing is estimated for it.
+        if stationary and n_passes > 0:
+            logger.debug("  Estimating noise spectrum for first pass using VAD...")
+            # Use VAD with the same frames as the gate's STFT (centred, n_fft / hop_length)
+            noise_frames = ~simple_vad(processed_audio, sr, frame_length=n_fft, hop_length=hop_length)
+            noise_stats = noise_spectrum_stats(processed_audio, noise_frames, n_fft, hop_length)
+            if noise_stats is None:
+                logger.warning(f"  Not enough noise frames identified by VAD ({int(noise_frames.sum())}). "
+                               f"Using start of audio for noise profile fallback.")
+                fallback_frames = np.zeros(1 + len(processed_audio) // hop_length, dtype=bool)
+                fallback_frames[: 1 + int(sr * 0.5) // hop_length] = True  # Up to the first 0.5 seconds
+                noise_stats = noise_spectrum_stats(processed_audio, fallback_frames, n_fft, hop_length)
 
         # Apply reduction potentially multiple times
         for i in range(n_passes):
             logger.debug(f"  Noisereduce Pass {i+1}/{n_passes}...")
+            if i == 0 and noise_stats is not None:
+                # Stationary gate against the VAD noise spectrum (same algorithm as noisereduce's)
+                processed_audio = spectral_gate_stationary(
+                    processed_audio, sr, noise_stats, prop_decrease=prop_decrease,
+                    time_smooth_ms=time_smooth_ms, n_fft=n_fft, hop_length=hop_length)
+                continue
             processed_audio = nr.reduce_noise(
                 y=processed_audio,
                 sr=sr,
-                y_noise=noise_clip if i == 0 and noise_clip is not None else None, # Use estimated noise only on first pass
+                y_noise=None, # Later passes (and the non-stationary gate) estimate noise from the signal itself
                 prop_decrease=prop_decrease,
                 n_fft=n_fft,
                 hop_length=hop_length,
-                stationary=False, # Assume non-stationary noise typical in driving
+                stationary=stationary, # Non-stationary by default: noise typical in driving
                 time_mask_smooth_ms=time_smooth_ms,
                 # freq_mask_smooth_hz parameter doesn't exist in standard noisereduce call, was likely a typo in original script.
                 # If frequency smoothing is desired, explore nr parameters or other libraries.
             )
-            # For subsequent passes, noisereduce uses the previous output's noise profile
-            noise_clip = None # Don't provide explicit noise after first pass
 
         logger.debug("Tunable noisereduce processing applied.")
         return processed_audio
@@ -168,12 +397,521 @@ def apply_tunable_noise_reduction(
         logger.error(f"Error during tunable noisereduce: {e}", exc_info=True)
         return audio_data # Return original audio data on error
 
-# --- Placeholder for Wiener filter if needed later ---
-# def apply_wiener_filter(audio_data: np.ndarray, sr: int) -> np.ndarray:
-#     if not LIBROSA_AVAILABLE or not SCIPY_AVAILABLE:
-#         logger.error("Cannot apply Wiener filter: librosa or scipy not available.")
-#         return audio_data
-#     # ... (Implement Wiener filter logic adapted for numpy array input) ...
-#     logger.debug("Applying Wiener filter...")
-#     # ... implementation ...
-#     return processed_audio
\ No newline at end of file
+# --- Noise spectrum estimation + stationary spectral gate ---
+NR_GATE_N_STD = 1.5  # Stationary gate threshold: noise mean + this many standard deviations (noisereduce default)
+NR_GATE_TOP_DB = 80.0  # Levels more than this below a bin's maximum are clamped (as noisereduce's _amp_to_db)
+NR_GATE_FREQ_SMOOTH_HZ = 500.0  # Mask smoothing across frequency (noisereduce default)
+NOISE_STATS_BATCH_FRAMES = 256  # Frames per FFT batch: bounds the complex temporaries
+NOISE_STATS_MAX_FRAMES = 512  # Long clips: noise frames evenly sampled down to this many
+
+
+def _stft_window(n_fft: int) -> np.ndarray:
+    """Periodic Hann window scaled like scipy.signal.stft(scaling='spectrum')."""
+    window = signal.get_window("hann", n_fft).astype(np.float32)
+    return window / window.sum()
+
+
+def _amp_to_db(magnitude: np.ndarray, axis: int, in_place: bool = False) -> np.ndarray:
+    """20*log10 amplitude, clamped to NR_GATE_TOP_DB below the maximum along `axis` (time)."""
+    db = magnitude if in_place else np.empty_like(magnitude)
+    np.add(magnitude, np.finfo(np.float32).eps, out=db)
+    np.log10(db, out=db)
+    db *= 20.0
+    return np.maximum(db, db.max(axis=axis, keepdims=True) - NR_GATE_TOP_DB, out=db)
+
+
+def noise_spectrum_stats(
+    audio: np.ndarray, # float32 mono samples
+    noise_frames: np.ndarray, # bool per frame (centred frames, i * hop_length), True = noise
+    n_fft: int = 2048,
+    hop_length: int = 512
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Per-frequency mean and standard deviation (dB) of the magnitude spectrum over the noise frames.
+
+    The frames are strided views of the (centre-padded) signal and only the noise frames are
+    transformed, in batches of NOISE_STATS_BATCH_FRAMES, so memory and time scale with the number
+    of noise frames (at most NOISE_STATS_MAX_FRAMES, spread over the clip); no noise waveform is
+    assembled. Returns None with fewer than 2 noise frames.
+    """
+    if not SCIPY_AVAILABLE:
+        return None
+    padded = np.pad(audio, n_fft // 2)
+    frames = np.lib.stride_tricks.sliding_window_view(padded, n_fft)[::hop_length]
+    indices = np.flatnonzero(noise_frames[: len(frames)])
+    if len(indices) < 2:
+        return None
+    if len(indices) > NOISE_STATS_MAX_FRAMES:
+        indices = indices[np.linspace(0, len(indices) - 1, NOISE_STATS_MAX_FRAMES).astype(np.intp)]
+    window = _stft_window(n_fft)
+    noise_db = np.empty((len(indices), n_fft // 2 + 1), dtype=np.float32)
+    for offset in range(0, len(indices), NOISE_STATS_BATCH_FRAMES):
+        batch = indices[offset:offset + NOISE_STATS_BATCH_FRAMES]
+        noise_db[offset:offset + len(batch)] = np.abs(np.fft.rfft(frames[batch] * window, axis=1))
+    return _db_mean_std(noise_db)
+
+
+def _db_mean_std(magnitude: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-frequency dB mean/std of (frames, bins) magnitudes; `magnitude` is overwritten."""
+    noise_db = _amp_to_db(magnitude, axis=0, in_place=True)
+    return noise_db.mean(axis=0), noise_db.std(axis=0)
+
+
+def _mask_smoothing_filter(sr: int, n_fft: int, hop_length: int, time_smooth_ms: float) -> Optional[np.ndarray]:
+    """Triangular 2-D smoothing kernel for the gate mask (as noisereduce's _smoothing_filter)."""
+    n_grad_freq = max(1, int(NR_GATE_FREQ_SMOOTH_HZ / (sr / (n_fft / 2))))
+    n_grad_time = max(1, int(time_smooth_ms / (hop_length / sr * 1000.0))) if time_smooth_ms else 1
+    if n_grad_freq == 1 and n_grad_time == 1:
+        return None
+    ramp = lambda n: np.concatenate([np.linspace(0, 1, n + 1, endpoint=False), np.linspace(1, 0, n + 2)])[1:-1]
+    kernel = np.outer(ramp(n_grad_freq), ramp(n_grad_time))
+    return (kernel / kernel.sum()).astype(np.float32)
+
+
+def spectral_gate_stationary(
+    audio: np.ndarray, # float32 mono samples
+    sr: int,
+    noise_stats: Tuple[np.ndarray, np.ndarray], # From noise_spectrum_stats
+    prop_decrease: float = 0.95,
+    time_smooth_ms: float = 80.0,
+    n_fft: int = 2048,
+    hop_length: int = 512
+    ) -> np.ndarray:
+    """
+    Stationary spectral gating (noisereduce's algorithm) against a precomputed noise spectrum:
+    bins above noise mean + NR_GATE_N_STD * std pass, the rest are attenuated by `prop_decrease`,
+    with the mask smoothed over time/frequency. Returns a new float32 array of the input length.
+    """
+    spectrum = _stft(audio, n_fft, hop_length)
+    kernel = _mask_smoothing_filter(sr, n_fft, hop_length, time_smooth_ms)
+    spectrum *= _stationary_gate_mask(np.abs(spectrum), noise_stats, prop_decrease, kernel)
+    return _istft(spectrum, len(audio), n_fft, hop_length)
+
+
+def _stft(audio: np.ndarray, n_fft: int, hop_length: int) -> np.ndarray:
+    """(bins, frames) STFT with centred frames i * hop_length (the framing noisereduce and simple_vad use)."""
+    _, _, spectrum = signal.stft(audio, window=signal.get_window("hann", n_fft), nperseg=n_fft,
+                                 noverlap=n_fft - hop_length, padded=False)
+    return spectrum
+
+
+def _istft(spectrum: np.ndarray, length: int, n_fft: int, hop_length: int) -> np.ndarray:
+    """Inverse of _stft, trimmed / zero-padded to `length` float32 samples."""
+    _, audio = signal.istft(spectrum, window=signal.get_window("hann", n_fft), nperseg=n_fft,
+                            noverlap=n_fft - hop_length)
+    out = np.zeros(length, dtype=np.float32)
+    out[: min(length, len(audio))] = audio[:length]
+    return out
+
+
+def _smooth_and_scale_mask(mask: np.ndarray, prop_decrease: float, kernel: Optional[np.ndarray]) -> np.ndarray:
+    """Mask in [0, 1] -> gain in [1 - prop_decrease, 1], smoothed over time/frequency."""
+    mask *= prop_decrease
+    mask += 1.0 - prop_decrease
+    if kernel is not None:
+        mask = signal.fftconvolve(mask, kernel, mode="same").astype(np.float32, copy=False)
+    return mask
+
+
+def _stationary_gate_mask(
+    magnitude: np.ndarray, noise_stats: Tuple[np.ndarray, np.ndarray], prop_decrease: float, kernel: Optional[np.ndarray]
+    ) -> np.ndarray:
+    """Gain per (bin, frame): bins above noise mean + NR_GATE_N_STD * std pass."""
+    mean_db, std_db = noise_stats
+    threshold = (mean_db + NR_GATE_N_STD * std_db)[:, np.newaxis]
+    mask = (_amp_to_db(magnitude, axis=1) > threshold).astype(np.float32)
+    return _smooth_and_scale_mask(mask, prop_decrease, kernel)
+
+# --- Shared-STFT analysis stage (VAD, noise estimate and gating from one STFT) ---
+NR_NONSTATIONARY_TIME_CONSTANT_S = 2.0  # Noise floor tracking for the non-stationary gate (noisereduce default)
+NR_NONSTATIONARY_THRESH_MULT = 2.0  # Bins this many times above the tracked floor pass (noisereduce default)
+NR_NONSTATIONARY_SIGMOID_SLOPE = 10.0  # Softness of the non-stationary mask (noisereduce default)
+# Noise observations (session profile updates) also count a clip's quietest frames as noise: in a
+# running car the noise is often within 40 dB of the speech, so simple_vad finds no noise frames
+NOISE_OBSERVATION_PERCENTILE = 20.0
+NOISE_OBSERVATION_MARGIN_DB = 3.0
+
+
+def _frame_energy_db(magnitude: np.ndarray) -> np.ndarray:
+    """(Hann-windowed) energy per frame of a (bins, frames) STFT magnitude, in dB below the loudest frame."""
+    energy = np.einsum("ij,ij->j", magnitude, magnitude)
+    peak = energy.max() if energy.size else 0.0
+    if peak < 1e-20:
+        return np.full(magnitude.shape[1], -np.inf) # All silent
+    return 10.0 * np.log10(np.maximum(energy, 1e-30) / peak)
+
+
+def _observation_frames(energy_db: np.ndarray, noise_frames: np.ndarray) -> np.ndarray:
+    """Frames counted as noise for an observation: the VAD's non-speech frames plus the quietest frames."""
+    quiet = np.isfinite(energy_db)
+    if quiet.any():
+        quiet &= energy_db <= np.percentile(energy_db[quiet], NOISE_OBSERVATION_PERCENTILE) + NOISE_OBSERVATION_MARGIN_DB
+    return noise_frames | quiet
+
+
+def spectral_vad(magnitude: np.ndarray, energy_thresh_db: float = -40) -> np.ndarray:
+    """
+    simple_vad on an existing (bins, frames) STFT magnitude: frames whose (Hann-windowed) energy is
+    within `energy_thresh_db` of the loudest frame are speech. Returns a bool mask per frame.
+    """
+    return _frame_energy_db(magnitude) > energy_thresh_db
+
+
+def _noise_columns(magnitude: np.ndarray, noise_frames: np.ndarray) -> np.ndarray:
+    """(frames, bins) copy of the noise frames of a (bins, frames) magnitude, at most NOISE_STATS_MAX_FRAMES."""
+    indices = np.flatnonzero(noise_frames[: magnitude.shape[1]])
+    if len(indices) > NOISE_STATS_MAX_FRAMES:
+        indices = indices[np.linspace(0, len(indices) - 1, NOISE_STATS_MAX_FRAMES).astype(np.intp)]
+    return magnitude[:, indices].T
+
+
+def noise_observation(
+    audio: np.ndarray, # float32 mono samples
+    sr: int,
+    noise_frames: np.ndarray, # bool per centred NR frame (i * hop_length), True = noise
+    n_fft: int = NR_N_FFT,
+    hop_length: int = NR_HOP_LENGTH
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, float]]:
+    """(mean_db, var_db, noise_seconds) of a clip's noise frames, as denoise_shared_stft reports it."""
+    stats = noise_spectrum_stats(audio, noise_frames, n_fft, hop_length)
+    if stats is None:
+        return None
+    n_noise = min(int(noise_frames.sum()), 1 + len(audio) // hop_length)
+    return stats[0], stats[1] ** 2, n_noise * hop_length / sr
+
+
+def observe_clip_noise(
+    audio: np.ndarray, # float32 mono samples
+    sr: int,
+    n_fft: int = NR_N_FFT,
+    hop_length: int = NR_HOP_LENGTH,
+    energy_thresh_db: float = -40
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, float]]:
+    """
+    The clip's noise observation (mean_db, var_db, noise_seconds) without any noise reduction, from
+    the same frames denoise_shared_stft / apply_wiener_filter observe. Used when NR is skipped (SNR
+    bypass) so clean clips still update the session profile. None for clips shorter than n_fft or
+    with fewer than 2 noise frames.
+    """
+    if len(audio) < n_fft:
+        return None
+    magnitude = np.abs(_stft(audio, n_fft, hop_length))
+    energy_db = _frame_energy_db(magnitude)
+    observed = _observation_frames(energy_db, energy_db <= energy_thresh_db)
+    n_observed = int(observed.sum())
+    if n_observed < 2:
+        return None
+    mean_db, std_db = _db_mean_std(_noise_columns(magnitude, observed))
+    return mean_db, std_db ** 2, n_observed * hop_length / sr
+
+
+def _nonstationary_gate_mask(
+    magnitude: np.ndarray, sr: int, hop_length: int, prop_decrease: float, kernel: Optional[np.ndarray]
+    ) -> np.ndarray:
+    """Gain per (bin, frame) against a noise floor tracked over time (noisereduce's non-stationary gate)."""
+    t_frames = NR_NONSTATIONARY_TIME_CONSTANT_S * sr / float(hop_length)
+    b = (np.sqrt(1 + 4 * t_frames ** 2) - 1) / (2 * t_frames ** 2)
+    floor = signal.filtfilt([b], [1, b - 1], magnitude, axis=-1, padtype=None).astype(np.float32)
+    np.maximum(floor, np.finfo(np.float32).tiny, out=floor)
+    # sigmoid(((|X| - floor) / floor - thresh) * slope), computed in the floor buffer
+    np.divide(magnitude, floor, out=floor)
+    floor -= 1.0 + NR_NONSTATIONARY_THRESH_MULT
+    floor *= -NR_NONSTATIONARY_SIGMOID_SLOPE
+    np.clip(floor, -80.0, 80.0, out=floor) # exp() range for float32
+    np.exp(floor, out=floor)
+    floor += 1.0
+    mask = np.reciprocal(floor, out=floor)
+    return _smooth_and_scale_mask(mask, prop_decrease, kernel)
+
+
+def denoise_shared_stft(
+    audio: np.ndarray, # float32 mono samples
+    sr: int,
+    prop_decrease: float = 0.95,
+    time_smooth_ms: float = 80.0,
+    n_passes: int = 1,
+    stationary: bool = False,
+    n_fft: int = NR_N_FFT,
+    hop_length: int = NR_HOP_LENGTH,
+    energy_thresh_db: float = -40,
+    noise_profile: Optional[Tuple[np.ndarray, np.ndarray]] = None, # (mean_db, std_db), e.g. NoiseProfileStore.profile()
+    noise_out: Optional[Dict[str, Any]] = None
+    ) -> np.ndarray:
+    """
+    Tunable noise reduction as one analysis stage: a single STFT of the utterance, from which the
+    VAD mask (stationary mode), the noise spectrum estimate and the gate of every pass are derived,
+    and a single inverse STFT at the end.
+
+    Each pass gates the magnitude left by the previous one instead of resynthesising the audio and
+    taking a new STFT (as noisereduce does per call); the pass gains are multiplied and applied to
+    the complex spectrum once. Returns a new float32 array of the input length.
+
+    With `noise_profile` (a session's cabin noise) the first pass is a stationary gate against it
+    and nothing is estimated from the clip for gating. With `noise_out`, the clip's own noise
+    statistics are stored under "observation" as (mean_db, var_db, noise_seconds), or None with
+    fewer than 2 noise frames, for updating the session profile; besides the VAD's non-speech
+    frames these include the clip's quietest frames (see NOISE_OBSERVATION_PERCENTILE).
+    """
+    spectrum = _stft(audio, n_fft, hop_length)
+    magnitude = np.abs(spectrum)
+    kernel = _mask_smoothing_filter(sr, n_fft, hop_length, time_smooth_ms)
+
+    # Non-speech frames (VAD on the same STFT): the stationary noise estimate and/or the observation
+    clip_stats = None
+    if noise_out is not None or (stationary and noise_profile is None and n_passes > 0):
+        energy_db = _frame_energy_db(magnitude)
+        noise_frames = energy_db <= energy_thresh_db
+        if noise_frames.sum() >= 2:
+            clip_stats = _db_mean_std(_noise_columns(magnitude, noise_frames))
+        if noise_out is not None:
+            observed = _observation_frames(energy_db, noise_frames)
+            n_observed = int(observed.sum())
+            stats = (None if n_observed < 2 else clip_stats if np.array_equal(observed, noise_frames)
+                     else _db_mean_std(_noise_columns(magnitude, observed)))
+            noise_out["observation"] = None if stats is None else (stats[0], stats[1] ** 2, n_observed * hop_length / sr)
+
+    gain = None
+    for i in range(n_passes):
+        if i == 0 and noise_profile is not None:
+            mask = _stationary_gate_mask(magnitude, noise_profile, prop_decrease, kernel)
+        elif stationary:
+            if i == 0:
+                if clip_stats is None:
+                    logger.warning("  Not enough noise frames identified by VAD. Using start of audio for noise profile fallback.")
+                    fallback_frames = np.zeros(magnitude.shape[1], dtype=bool)
+                    fallback_frames[: 1 + int(sr * 0.5) // hop_length] = True # Up to the first 0.5 seconds
+                    clip_stats = _db_mean_std(_noise_columns(magnitude, fallback_frames))
+                stats = clip_stats
+            else:
+                stats = _db_mean_std(magnitude.T.copy()) # Later passes: noise estimated from the whole signal
+            mask = _stationary_gate_mask(magnitude, stats, prop_decrease, kernel)
+        else:
+            mask = _nonstationary_gate_mask(magnitude, sr, hop_length, prop_decrease, kernel)
+        gain = mask if gain is None else np.multiply(gain, mask, out=gain)
+        if i + 1 < n_passes:
+            magnitude *= mask
+    if gain is not None:
+        spectrum *= gain
+    return _istft(spectrum, len(audio), n_fft, hop_length)
+
+# --- Input SNR estimate (NR bypass and strength) ---
+SNR_NOISE_PERCENTILE = 10.0  # Noise level: this percentile of the frame powers
+SNR_SPEECH_MARGIN_DB = 6.0  # Frames this far above the noise level count as speech
+SNR_MAX_DB = 60.0  # Reported for digital silence between the words (nothing to remove)
+NR_DECISION_BYPASS = "bypass"  # Clean input: NR skipped
+NR_DECISION_SCALED = "scaled"  # NR with strength/passes scaled down to the measured noise
+NR_DECISION_FULL = "full"  # NR at the configured strength (noisy input, or no estimate)
+
+
+def estimate_snr_db(audio: np.ndarray, frame_length: int = NR_HOP_LENGTH) -> Optional[float]:
+    """
+    Cheap SNR estimate (dB) from the powers of non-overlapping frames (no STFT): the noise level is
+    their SNR_NOISE_PERCENTILE-th percentile, the signal is the mean excess power of the frames at
+    least SNR_SPEECH_MARGIN_DB above it. A clip without such frames is treated as all noise (0 dB).
+    Returns None for clips shorter than two frames.
+    """
+    n_frames = len(audio) // frame_length
+    if n_frames < 2:
+        return None
+    frames = audio[: n_frames * frame_length].reshape(n_frames, frame_length)
+    power = np.einsum("ij,ij->i", frames, frames, dtype=np.float64) / frame_length
+    noise = float(np.percentile(power, SNR_NOISE_PERCENTILE))
+    if noise < 1e-12:
+        return SNR_MAX_DB
+    speech = power[power > noise * 10.0 ** (SNR_SPEECH_MARGIN_DB / 10.0)]
+    if len(speech) == 0:
+        return 0.0
+    return float(min(SNR_MAX_DB, 10.0 * np.log10(max(speech.mean() - noise, 1e-12) / noise)))
+
+
+def nr_strength_for_snr(
+    snr_db: Optional[float],
+    prop_decrease: float,
+    n_passes: int,
+    bypass_db: float = 25.0,
+    full_strength_db: float = 5.0,
+    min_prop_decrease: float = 0.5
+    ) -> Tuple[str, float, int]:
+    """
+    (decision, prop_decrease, passes) for a clip's estimated SNR: no NR at or above `bypass_db`,
+    the configured strength at or below `full_strength_db`, and in between prop_decrease and the
+    number of passes scaled linearly from `min_prop_decrease` / 1 pass up to the configured values.
+    """
+    if snr_db is None or snr_db <= full_strength_db:
+        return NR_DECISION_FULL, prop_decrease, n_passes
+    if snr_db >= bypass_db:
+        return NR_DECISION_BYPASS, 0.0, 0
+    noise = (bypass_db - snr_db) / max(bypass_db - full_strength_db, 1e-6)  # 0 at the bypass threshold .. 1 at full strength
+    scaled_prop = min(prop_decrease, min_prop_decrease) + (prop_decrease - min(prop_decrease, min_prop_decrease)) * noise
+    return NR_DECISION_SCALED, scaled_prop, max(1, int(round(1 + (n_passes - 1) * noise)))
+
+# --- DSP stage (pure function; runs inside the DSP worker processes, see core/dsp_pool.py) ---
+def process_pcm16_in_place(
+    samples: np.ndarray, # int16 mono samples; overwritten with the processed audio
+    sr: int,
+    noise_reduction: bool = True,
+    prop_decrease: float = 0.9,
+    time_smooth_ms: float = 150.0,
+    n_passes: int = 1,
+    stationary: bool = False,
+    shared_stft: bool = True,
+    method: str = "tunable_nr",
+    snr_gating: bool = False,
+    snr_bypass_db: float = 25.0,
+    snr_full_strength_db: float = 5.0,
+    min_prop_decrease: float = 0.5,
+    noise_profile: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    noise_out: Optional[Dict[str, Any]] = None,
+    details: Optional[Dict[str, Any]] = None
+    ) -> bool:
+    """
+    Runs the CPU-bound part of the transcription pipeline on an int16 buffer:
+    int16 -> float32, noise reduction (`method`: NR_METHOD_TUNABLE or NR_METHOD_WIENER),
+    float32 -> int16 (written back into `samples`).
+    Has no side effects besides `samples`, so it can run in any process or thread.
+
+    One float32 working buffer is allocated per call; the int16/float32 conversions, scaling and
+    clipping all happen in place in that buffer.
+
+    With `snr_gating`, the input SNR is estimated first (estimate_snr_db) and NR is skipped or its
+    strength/passes scaled down for clean input (nr_strength_for_snr). `details`, if given,
+    receives "snr_db", "decision", "prop_decrease" and "n_passes". A bypassed clip still gets its
+    noise observation (observe_clip_noise) when `noise_out` is given.
+
+    `noise_profile` / `noise_out` are passed to the noise reduction (session noise profile in, the
+    clip's noise observation out; see denoise_shared_stft).
+
+    Returns: True if noise reduction was applied.
+    """
+    if not noise_reduction or len(samples) == 0:
+        return False
+
+    max_val = np.iinfo(np.int16).max
+    samples_float = np.empty(len(samples), dtype=np.float32)
+    np.multiply(samples, np.float32(1.0 / max_val), out=samples_float, casting="unsafe")
+    if snr_gating:
+        snr_db = estimate_snr_db(samples_float)
+        decision, prop_decrease, n_passes = nr_strength_for_snr(
+            snr_db, prop_decrease, n_passes, snr_bypass_db, snr_full_strength_db, min_prop_decrease)
+    else:
+        snr_db, decision = None, NR_DECISION_FULL
+    if details is not None:
+        details.update(snr_db=snr_db, decision=decision, prop_decrease=prop_decrease, n_passes=n_passes)
+    if decision == NR_DECISION_BYPASS:
+        if noise_out is not None:
+            # Clean clips still feed the session profile, or it would only learn from noisy audio
+            noise_out["observation"] = observe_clip_noise(samples_float, sr)
+        return False # Clean input; `samples` is left as it is
+    try:
+        if method == NR_METHOD_WIENER:
+            reduced_samples_float = apply_wiener_filter(
+                samples_float, sr, prop_decrease=prop_decrease, noise_profile=noise_profile, noise_out=noise_out)
+        else:
+            reduced_samples_float = apply_tunable_noise_reduction(
+                audio_data=samples_float,
+                sr=sr,
+                prop_decrease=prop_decrease,
+                time_smooth_ms=time_smooth_ms,
+                n_passes=n_passes,
+                stationary=stationary,
+                shared_stft=shared_stft,
+                noise_profile=noise_profile,
+                noise_out=noise_out
+            )
+    except Exception as e:
+        logger.error(f"Error during {method} noise reduction call: {e}", exc_info=True)
+        logger.warning("Falling back to audio without noise reduction due to error.")
+        return False
+    if reduced_samples_float is samples_float:
+        return False # NR was skipped (missing libraries, audio too short, or an error inside NR)
+
+    # Reuse the working buffer (the input is no longer needed) for scaling/clipping the NR output
+    np.multiply(reduced_samples_float[: len(samples_float)], max_val, out=samples_float, casting="unsafe")
+    np.clip(samples_float, -max_val, max_val, out=samples_float)
+    np.copyto(samples, samples_float, casting="unsafe")
+    return True
+
+# --- Noise Reduction Method: Wiener filter (decision-directed a priori SNR) ---
+NR_METHOD_TUNABLE = "tunable_nr"  # Values of NOISE_REDUCTION_METHOD / AudioProcessingOptions.method
+NR_METHOD_WIENER = "wiener"
+NR_METHOD_NONE = "none"
+WIENER_DD_ALPHA = 0.98  # Decision-directed smoothing of the a priori SNR (Ephraim-Malah)
+WIENER_XI_MIN_DB = -25.0  # Floor of the a priori SNR (limits musical noise)
+
+
+def _noise_psd_from_profile(noise_profile: Tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    """Mean noise power per bin from a (mean_db, std_db) magnitude profile (dB values taken as normal)."""
+    mean_db, std_db = noise_profile
+    sigma = std_db.astype(np.float64) * (np.log(10.0) / 10.0)
+    return (10.0 ** (mean_db.astype(np.float64) / 10.0) * np.exp(0.5 * sigma ** 2)).astype(np.float32)
+
+
+def apply_wiener_filter(
+    audio_data: np.ndarray, # float32 mono samples
+    sr: int,
+    prop_decrease: float = 0.9,
+    n_fft: int = NR_N_FFT,
+    hop_length: int = NR_HOP_LENGTH,
+    energy_thresh_db: float = -40,
+    noise_profile: Optional[Tuple[np.ndarray, np.ndarray]] = None, # Session noise (mean_db, std_db)
+    noise_out: Optional[Dict[str, Any]] = None # Receives the clip's noise observation (as denoise_shared_stft)
+    ) -> np.ndarray:
+    """
+    Wiener filter with a decision-directed a priori SNR estimate, on the same STFT geometry as the
+    tunable NR (so session noise profiles are shared). Requires SciPy.
+
+    The noise power per bin comes from the session profile, or else from the clip's non-speech and
+    quietest frames. The gain G = xi / (1 + xi) is floored at 1 - prop_decrease. Everything is
+    vectorised over frequency; only the decision-directed recursion steps over frames.
+    Returns a new float32 array of the input length (the input itself when it cannot be filtered).
+    """
+    if not SCIPY_AVAILABLE:
+        logger.error("Cannot apply Wiener filter: 'scipy' library not available.")
+        return audio_data
+    if len(audio_data) < n_fft:
+        logger.warning("Audio too short for Wiener filtering.")
+        return audio_data
+
+    try:
+        spectrum = _stft(audio_data, n_fft, hop_length)
+        magnitude = np.abs(spectrum)
+        clip_observed = None
+        if noise_profile is None or noise_out is not None:
+            energy_db = _frame_energy_db(magnitude)
+            clip_observed = _observation_frames(energy_db, energy_db <= energy_thresh_db)
+            if noise_out is not None:
+                n_observed = int(clip_observed.sum())
+                stats = _db_mean_std(_noise_columns(magnitude, clip_observed)) if n_observed >= 2 else None
+                noise_out["observation"] = None if stats is None else (stats[0], stats[1] ** 2, n_observed * hop_length / sr)
+
+        if noise_profile is not None:
+            noise_psd = _noise_psd_from_profile(noise_profile)
+        elif clip_observed.sum() >= 2:
+            columns = _noise_columns(magnitude, clip_observed)
+            noise_psd = np.einsum("ij,ij->j", columns, columns) / len(columns)
+        else:
+            logger.warning("No noise frames for the Wiener filter (silent clip). Returning input unchanged.")
+            return audio_data
+        noise_psd = np.maximum(noise_psd, np.finfo(np.float32).tiny)[:, np.newaxis]
+
+        # A posteriori SNR gamma = |Y|^2 / noise; gain is computed in place over it, frame by frame
+        gamma = np.square(magnitude, out=magnitude)
+        gamma /= noise_psd
+        xi_min = 10.0 ** (WIENER_XI_MIN_DB / 10.0)
+        gain_floor = 1.0 - prop_decrease
+        previous = None # |S_hat(t-1)|^2 / noise = G(t-1)^2 * gamma(t-1)
+        for t in range(gamma.shape[1]):
+            frame_gamma = gamma[:, t]
+            xi = np.maximum(frame_gamma - 1.0, 0.0)
+            if previous is not None:
+                xi *= 1.0 - WIENER_DD_ALPHA
+                xi += WIENER_DD_ALPHA * previous
+            np.maximum(xi, xi_min, out=xi)
+            gain = xi / (1.0 + xi)
+            previous = gain * gain * frame_gamma
+            gamma[:, t] = np.maximum(gain, gain_floor)
+        spectrum *= gamma
+        return _istft(spectrum, len(audio_data), n_fft, hop_length)
+    except Exception as e:
+        logger.error(f"Error during Wiener filtering: {e}", exc_info=True)
+        return audio_data
@@ -3,11 +3,11 @@ import logging
 import google.generativeai as genai
 import json
 from typing import List, Optional, Dict
-import asyncio
 import functools
 
 from ..config import Settings
 from ..exception import NluError, ConfigurationError
+from ..executors import run_blocking, POOL_VOICE_IO
 from ...models.internal import ChatMessage # Use internal ChatMessage
 
 logger = logging.getLogger(__name__)
@@ -64,8 +64,7 @@ class GeminiClient:
                 max_output_tokens=1024,  # Set a reasonable limit
             )
 
-            # API calls are often synchronous, run in executor
-            loop = asyncio.get_running_loop()
+            # API calls are often synchronous, run in the voice executor pool
             send_message_with_args = functools.partial(
                 self.model.generate_content,
                 generation_config=generation_config,
@@ -73,8 +72,8 @@ class GeminiClient:
                 # safety_settings=DEFAULT_SAFETY_SETTINGS, # Pass if not set globally
             )
 
-            response = await loop.run_in_executor(
-                None,
+            response = await run_blocking(
+                POOL_VOICE_IO,
                 send_message_with_args,
                 prompt  # Pass positional content
             )
@@ -167,7 +166,6 @@ class GeminiClient:
                 # response_mime_type="application/json" # EXPERIMENTAL: Use if supported by your model version
             )
 
-            loop = asyncio.get_running_loop()
             send_message_with_args = functools.partial(
                 chat.send_message, # Use chat instance
                 generation_config=generation_config,
@@ -175,8 +173,8 @@ class GeminiClient:
                 # stream=False # Ensure streaming is off for single JSON blob
             )
 
-            response = await loop.run_in_executor(
-                None,
+            response = await run_blocking(
+                POOL_VOICE_IO,
                 send_message_with_args,
                 prompt_parts # Send the prepared prompts/queries
             )
@@ -1,18 +1,21 @@
 # backend/core/clients/google_maps.py
 import logging
-import googlemaps # Keep for Places/Geocoding
 from google.maps import routing_v2 # Use the new Routes API library
 from google.type import latlng_pb2 # Import the LatLng structure
 from datetime import datetime, timedelta
 from typing import Optional, Tuple, List, Dict, Any
-import asyncio
 import os
 from google.api_core.exceptions import GoogleAPIError, InvalidArgument
 import functools
+import threading
 
 from ..config import Settings
 from ..exception import NavigationError, ConfigurationError, InvalidRequestError
 from ...models.internal import RouteInfo, RouteWarning, RouteLocalizedValues
+from ..lazy_imports import LazyModule, SUBSYSTEM_MAPS_LEGACY
+from ..executors import run_blocking, POOL_BLOCKING_IO
+
+googlemaps = LazyModule("googlemaps", SUBSYSTEM_MAPS_LEGACY) # Keep for Places/Geocoding; imported on first use
 
 logger = logging.getLogger(__name__)
 
@@ -45,14 +48,27 @@ class GoogleMapsClient:
             logger.error(f"Failed to initialize Google Maps Routes client: {e}", exc_info=True)
             raise ConfigurationError(f"Google Maps Routes client initialization failed: {e}", original_exception=e)
 
-        try:
-             # Initialize legacy client for Geocoding/Places
-             self.legacy_client = googlemaps.Client(key=settings.GOOGLE_MAPS_API_KEY)
-             logger.info("Google Maps legacy client (for Geocode/Places) initialized.")
-        except Exception as e:
-             logger.error(f"Failed to initialize Google Maps legacy client: {e}", exc_info=True)
-             # Allow proceeding if only routing is essential? Or fail hard? Let's fail hard.
-             raise ConfigurationError(f"Google Maps legacy client initialization failed: {e}", original_exception=e)
+        # Legacy client for Geocoding/Places is created on first use (or by the startup warm-up)
+        self._legacy_client = None
+        self._legacy_client_lock = threading.Lock()
+
+    @property
+    def legacy_client(self):
+        """The googlemaps.Client used for Geocode/Places. Raises ConfigurationError if it cannot be created."""
+        if self._legacy_client is None:
+            with self._legacy_client_lock:
+                if self._legacy_client is None:
+                    try:
+                        self._legacy_client = googlemaps.Client(key=self.settings.GOOGLE_MAPS_API_KEY)
+                        logger.info("Google Maps legacy client (for Geocode/Places) initialized.")
+                    except Exception as e:
+                        logger.error(f"Failed to initialize Google Maps legacy client: {e}", exc_info=True)
+                        raise ConfigurationError(f"Google Maps legacy client initialization failed: {e}", original_exception=e)
+        return self._legacy_client
+
+    def warm_up(self) -> None:
+        """Creates the legacy client ahead of the first Geocode/Places call. Blocking."""
+        _ = self.legacy_client
 
 
     def _make_waypoint(self, location: Tuple[float, float] | str) -> routing_v2.Waypoint:
@@ -283,14 +299,13 @@ class GoogleMapsClient:
             raise InvalidRequestError("Address string is required for geocoding.")
         logger.info(f"Geocoding address using legacy client: '{address}'")
         try:
-            loop = asyncio.get_running_loop()
             geocode_func_with_kwargs = functools.partial(
                 self.legacy_client.geocode,
                 region=self.settings.MAPS_DEFAULT_REGION
             )
 
-            geocode_result = await loop.run_in_executor(
-                None,
+            geocode_result = await run_blocking(
+                POOL_BLOCKING_IO,
                 geocode_func_with_kwargs,
                 address
             )
@@ -328,9 +343,8 @@ class GoogleMapsClient:
         lat, lon = location
         logger.info(f"Reverse geocoding location using legacy client: Lat={lat}, Lon={lon}")
         try:
-            loop = asyncio.get_running_loop()
-            reverse_geocode_result = await loop.run_in_executor(
-                None,
+            reverse_geocode_result = await run_blocking(
+                POOL_BLOCKING_IO,
                 self.legacy_client.reverse_geocode,
                 (lat, lon),
                 # You can add result_type or location_type filters if needed
@@ -387,9 +401,8 @@ class GoogleMapsClient:
 
         logger.info(f"Getting Place Details using legacy client for Place ID: '{place_id}', Fields: {final_fields_list}")
         try:
-            loop = asyncio.get_running_loop()
-            place_result = await loop.run_in_executor(
-                None,
+            place_result = await run_blocking(
+                POOL_BLOCKING_IO,
                 self.legacy_client.place,
                 place_id=place_id,
                 fields=final_fields_list,
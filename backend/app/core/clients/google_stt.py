@@ -1,14 +1,25 @@
 import logging
-from typing import Tuple, Optional
+import time
+from typing import AsyncIterator, List, Tuple, Optional
 from google.cloud import speech
 from google.api_core.exceptions import GoogleAPIError, InvalidArgument
 import asyncio
 
 from ..config import Settings, settings as global_settings
 from ..exception import TranscriptionError, InvalidRequestError, ConfigurationError
+from ..metrics import metrics
+from ...models.internal import SttStreamResult
 
 logger = logging.getLogger(__name__)
 
+# streaming_recognize rejects audio_content messages larger than this
+MAX_STREAMING_CHUNK_BYTES = 25 * 1024
+
+# Endpoints as used by the STT_MODEL_ROUTES rules
+STT_ENDPOINT_INTERACT = "interact"  # Batch recognize of an uploaded / buffered utterance
+STT_ENDPOINT_STREAM = "stream"  # streaming_recognize on /assistant/stream
+STT_ENDPOINT_PROBE = "probe"  # /assistant/detect-speech verification (DETECT_SPEECH_VERIFY_WITH_STT)
+
 # Mock implementation for structure - Replace with your actual GoogleSttClient
 class GoogleSttClient:
     """Client for Google Cloud Speech-to-Text API."""
@@ -22,41 +33,28 @@ class GoogleSttClient:
             logger.error(f"Failed to initialize Google STT client: {e}", exc_info=True)
             raise ConfigurationError(f"Google STT client initialization failed: {e}", original_exception=e)
 
-    async def transcribe(
+    def _recognition_config(
         self,
-        audio_data: bytes,
         sample_rate_hertz: int,
         input_encoding: speech.RecognitionConfig.AudioEncoding,
-        language_code_hint: Optional[str] = None # Optional BCP-47 hint
-    ) -> Tuple[str, Optional[str]]:
+        language_code_hint: Optional[str] = None,
+        candidate_languages: Optional[List[str]] = None,
+        model: Optional[str] = None,
+        punctuation: Optional[bool] = None
+    ) -> speech.RecognitionConfig:
         """
-        Transcribes audio data using Google STT with auto language detection.
-
-        Args:
-            audio_data: Raw audio bytes (ensure LINEAR16 or compatible).
-            sample_rate_hertz: Sample rate of the audio.
-            input_encoding: Encoding of the audio (e.g., LINEAR16).
-            language_code_hint: Optional preferred language code (BCP-47).
-
-        Returns:
-            A tuple containing:
-                - The transcribed text (str).
-                - The detected language code (BCP-47 str) or None if detection failed.
-
-        Raises:
-            TranscriptionError: If the API call fails.
-            InvalidRequestError: If input parameters are invalid.
+        RecognitionConfig shared by the batch and streaming calls: default language + supported
+        alternatives, or only `candidate_languages` (first = primary) when the caller narrowed them.
+        `model`/`punctuation` come from select_model (default: STT_MODEL and the punctuation setting).
         """
-        if not audio_data:
-            logger.warning("Transcribe called with empty audio data.")
-            return "", None
         if not sample_rate_hertz or sample_rate_hertz <= 0:
              raise InvalidRequestError("Valid sample_rate_hertz is required for transcription.")
 
-        recognition_audio = speech.RecognitionAudio(content=audio_data)
-
-        default_lang = self.settings.DEFAULT_LANGUAGE_CODE
-        supported_langs = self.settings.SUPPORTED_LANGUAGES or []  # Handle empty list
+        if candidate_languages:
+            default_lang, supported_langs = candidate_languages[0], candidate_languages[1:]
+        else:
+            default_lang = self.settings.DEFAULT_LANGUAGE_CODE
+            supported_langs = self.settings.SUPPORTED_LANGUAGES or []  # Handle empty list
 
         # Create the list of alternatives (all supported except the default one)
         # Compare using lowercase to avoid case sensitivity issues, but use original case for API
@@ -65,26 +63,104 @@ class GoogleSttClient:
             lang for lang in supported_langs if lang.lower() != normalized_default_lang
         ]
         # --------------------------------------------------------------------
+        model = model or self.settings.STT_MODEL
+        if punctuation is None:
+            punctuation = self.settings.STT_ENABLE_AUTOMATIC_PUNCTUATION
 
-        logger.debug(f"STT Config - Model: {self.settings.STT_MODEL}, "
-                     f"Punctuation: {self.settings.STT_ENABLE_AUTOMATIC_PUNCTUATION}, "
+        logger.debug(f"STT Config - Model: {model}, "
+                     f"Punctuation: {punctuation}, "
                      f"Encoding: {input_encoding.name}, Rate: {sample_rate_hertz}, "
                      f"Primary Lang: {default_lang}, "
                      f"Alternative Langs ({len(alternative_langs_for_api)}): {alternative_langs_for_api[:5]}..., "  # Log first few alternatives
                      f"Hint provided: {language_code_hint or 'None'}")
 
-        config = speech.RecognitionConfig(
+        return speech.RecognitionConfig(
             encoding=input_encoding,
             sample_rate_hertz=sample_rate_hertz,
             language_code=default_lang,  # Use the fixed default language
             alternative_language_codes=alternative_langs_for_api,  # Use other supported languages as alternatives
-            enable_automatic_punctuation=self.settings.STT_ENABLE_AUTOMATIC_PUNCTUATION,
-            use_enhanced=True if self.settings.STT_MODEL else False,
-            model=self.settings.STT_MODEL if self.settings.STT_MODEL else None,
+            enable_automatic_punctuation=punctuation,
+            use_enhanced=True if model else False,
+            model=model if model else None,
             # adaptation=... # Add if needed
         )
 
-        recognition_audio = speech.RecognitionAudio(content=audio_data)
+    def select_model(self, endpoint: str, duration_seconds: Optional[float] = None) -> Tuple[Optional[str], Optional[bool]]:
+        """
+        (model, punctuation override) of the first STT_MODEL_ROUTES rule matching the request;
+        STT_MODEL if none does. A "max_seconds" rule never matches when the duration is unknown.
+        """
+        for rule in self.settings.STT_MODEL_ROUTES:
+            if "endpoint" in rule and rule["endpoint"] != endpoint:
+                continue
+            if "max_seconds" in rule and (duration_seconds is None or duration_seconds > rule["max_seconds"]):
+                continue
+            return rule.get("model") or self.settings.STT_MODEL, rule.get("punctuation")
+        return self.settings.STT_MODEL, None
+
+    async def transcribe(
+        self,
+        audio_data: bytes | memoryview,
+        sample_rate_hertz: int,
+        input_encoding: speech.RecognitionConfig.AudioEncoding,
+        language_code_hint: Optional[str] = None # Optional BCP-47 hint
+    ) -> Tuple[str, Optional[str]]:
+        """Transcribes audio data using Google STT with auto language detection. See transcribe_with_confidence."""
+        transcript, detected_language_bcp47, _ = await self.transcribe_with_confidence(
+            audio_data, sample_rate_hertz, input_encoding, language_code_hint)
+        return transcript, detected_language_bcp47
+
+    async def transcribe_with_confidence(
+        self,
+        audio_data: bytes | memoryview,
+        sample_rate_hertz: int,
+        input_encoding: speech.RecognitionConfig.AudioEncoding,
+        language_code_hint: Optional[str] = None, # Optional BCP-47 hint
+        candidate_languages: Optional[List[str]] = None, # Only detect among these (default: all supported)
+        model: Optional[str] = None, # Force a model instead of STT_MODEL_ROUTES (benchmarks)
+        endpoint: str = STT_ENDPOINT_INTERACT # STT_MODEL_ROUTES endpoint: 'interact' or 'probe'
+    ) -> Tuple[str, Optional[str], Optional[float]]:
+        """
+        Transcribes audio data using Google STT with auto language detection.
+
+        Args:
+            audio_data: Raw audio bytes or a memoryview over them (ensure LINEAR16 or compatible).
+            sample_rate_hertz: Sample rate of the audio.
+            input_encoding: Encoding of the audio (e.g., LINEAR16).
+            language_code_hint: Optional preferred language code (BCP-47).
+            candidate_languages: Optional BCP-47 codes to detect among, most likely first.
+            model: Optional Google STT model; by default it is routed by the audio duration.
+            endpoint: Endpoint the STT_MODEL_ROUTES rules are matched against.
+
+        Returns:
+            A tuple containing:
+                - The transcribed text (str).
+                - The detected language code (BCP-47 str) or None if detection failed.
+                - The confidence of the selected alternative, or None if there was none.
+
+        Raises:
+            TranscriptionError: If the API call fails.
+            InvalidRequestError: If input parameters are invalid.
+        """
+        if not audio_data:
+            logger.warning("Transcribe called with empty audio data.")
+            return "", None, None
+        default_lang = self.settings.DEFAULT_LANGUAGE_CODE
+        supported_langs = self.settings.SUPPORTED_LANGUAGES or []  # Handle empty list
+        # Route by duration (LINEAR16: 2 bytes per sample; unknown for compressed encodings)
+        nbytes = audio_data.nbytes if isinstance(audio_data, memoryview) else len(audio_data)
+        duration_seconds = (nbytes / 2 / sample_rate_hertz
+                            if input_encoding == speech.RecognitionConfig.AudioEncoding.LINEAR16 and sample_rate_hertz else None)
+        punctuation = None
+        if model is None:
+            model, punctuation = self.select_model(endpoint, duration_seconds)
+        config = self._recognition_config(sample_rate_hertz, input_encoding, language_code_hint, candidate_languages,
+                                          model=model, punctuation=punctuation)
+
+        # Protobuf bytes fields only accept `bytes`: this is the single copy of the samples on the way
+        # to the API (the request serialisation needs its own buffer anyway)
+        content = audio_data if isinstance(audio_data, bytes) else audio_data.tobytes()
+        recognition_audio = speech.RecognitionAudio(content=content)
         request = speech.RecognizeRequest(config=config, audio=recognition_audio)
 
         try:
@@ -95,8 +171,12 @@ class GoogleSttClient:
             # except Exception:
             #      logger.debug(f"Sending RecognitionConfig to Google STT API (raw): {config}")
 
-            logger.info("Sending request to Google STT API...")
+            logger.info(f"Sending request to Google STT API (model: {model}, audio: "
+                        f"{f'{duration_seconds:.1f}s' if duration_seconds is not None else 'unknown length'})...")
+            request_start = time.perf_counter()
             response = await self.client.recognize(request=request)
+            metrics.observe("stt_model_seconds", time.perf_counter() - request_start, model=model or "default",
+                            endpoint=endpoint)
             # Log the raw response object - helpful for debugging empty transcripts/detection issues
             logger.debug(f"Raw Google STT API response object: {response}")
             logger.info("Received response from Google STT API.")
@@ -159,7 +239,7 @@ class GoogleSttClient:
                         f"Detected language '{detected_language_bcp47}' is not in the configured SUPPORTED_LANGUAGES list nor is it the DEFAULT_LANGUAGE_CODE. Proceeding anyway.")
 
             # Return the transcript and the detected language code (original case)
-            return transcript.strip(), detected_language_bcp47
+            return transcript.strip(), detected_language_bcp47, (highest_confidence if highest_confidence >= 0 else None)
 
         except InvalidArgument as e:
             logger.error(
@@ -172,4 +252,69 @@ class GoogleSttClient:
             raise TranscriptionError(f"STT API request failed: {e}", original_exception=e)
         except Exception as e:
             logger.error(f"Unexpected error during STT transcription: {e}", exc_info=True)
-            raise TranscriptionError(f"An unexpected error occurred during transcription: {e}", original_exception=e)
\ No newline at end of file
+            raise TranscriptionError(f"An unexpected error occurred during transcription: {e}", original_exception=e)
+
+    async def streaming_transcribe(
+        self,
+        audio_chunks: AsyncIterator[bytes],
+        sample_rate_hertz: int,
+        input_encoding: speech.RecognitionConfig.AudioEncoding,
+        language_code_hint: Optional[str] = None,
+        interim_results: bool = True,
+        candidate_languages: Optional[List[str]] = None
+    ) -> AsyncIterator[SttStreamResult]:
+        """
+        Transcribes audio as it arrives using streaming_recognize.
+
+        Args:
+            audio_chunks: Async iterator of raw audio chunks (e.g. LINEAR16 from a WebSocket or a
+                chunked upload). The recognition input is closed when it is exhausted.
+            sample_rate_hertz, input_encoding, language_code_hint, candidate_languages: As for
+                transcribe_with_confidence().
+            interim_results: Also yield non-final hypotheses while the driver is still talking.
+
+        Yields:
+            SttStreamResult for every interim/final result, in order. `input_closed_ms` is set on
+            results received after the last chunk was sent.
+
+        Raises:
+            TranscriptionError: If the API call fails.
+            InvalidRequestError: If input parameters are invalid.
+        """
+        model, punctuation = self.select_model(STT_ENDPOINT_STREAM)
+        config = self._recognition_config(sample_rate_hertz, input_encoding, language_code_hint, candidate_languages,
+                                          model=model, punctuation=punctuation)
+        streaming_config = speech.StreamingRecognitionConfig(config=config, interim_results=interim_results)
+        input_closed_at: Optional[float] = None
+
+        async def requests():
+            nonlocal input_closed_at
+            yield speech.StreamingRecognizeRequest(streaming_config=streaming_config)
+            async for chunk in audio_chunks:
+                for offset in range(0, len(chunk), MAX_STREAMING_CHUNK_BYTES):
+                    yield speech.StreamingRecognizeRequest(audio_content=bytes(chunk[offset:offset + MAX_STREAMING_CHUNK_BYTES]))
+            input_closed_at = time.perf_counter()
+
+        try:
+            logger.info(f"Opening Google STT streaming_recognize call (model: {model})...")
+            responses = await self.client.streaming_recognize(requests=requests())
+            async for response in responses:
+                for result in response.results:
+                    if not result.alternatives:
+                        continue
+                    best = result.alternatives[0]
+                    yield SttStreamResult(
+                        transcript=best.transcript,
+                        is_final=result.is_final,
+                        language_code=result.language_code or None,
+                        stability=result.stability,
+                        confidence=best.confidence if result.is_final else None,
+                        input_closed_ms=(time.perf_counter() - input_closed_at) * 1000.0 if input_closed_at else None,
+                    )
+            logger.info("Google STT streaming_recognize call finished.")
+        except InvalidArgument as e:
+            logger.error(f"Invalid argument for streaming STT. Rate={sample_rate_hertz}Hz, Encoding={input_encoding.name}. Error: {e}", exc_info=True)
+            raise InvalidRequestError(f"Invalid configuration or data for streaming STT request: {e}", original_exception=e)
+        except GoogleAPIError as e:
+            logger.error(f"Google streaming STT API error: {e}", exc_info=True)
+            raise TranscriptionError(f"Streaming STT request failed: {e}", original_exception=e)
@@ -3,11 +3,11 @@ from typing import Dict, Optional, List
 from google.cloud import translate_v2 as translate # v2 is simpler for basic use
 # from google.cloud import translate # v3beta is more complex but offers more features
 from google.api_core.exceptions import GoogleAPIError
-import asyncio
 import functools
 
 from ..config import Settings, settings as global_settings
 from ..exception import TranslationError, ConfigurationError, InvalidRequestError
+from ..executors import run_blocking, POOL_VOICE_IO
 
 logger = logging.getLogger(__name__)
 
@@ -63,9 +63,8 @@ class GoogleTranslateClient:
              raise InvalidRequestError("target_language is required for translation.")
 
         try:
-             # The v2 client library methods are synchronous, so run them in an executor
+             # The v2 client library methods are synchronous, so run them in the voice executor pool
              # to avoid blocking the FastAPI event loop.
-             loop = asyncio.get_running_loop()
              logger.info(f"Requesting translation to '{target_language}' (Source: '{source_language or 'auto'}'). Running in executor.")
 
              translate_with_args = functools.partial(
@@ -76,8 +75,8 @@ class GoogleTranslateClient:
              )
 
              # Run the partial function, passing the 'text' argument positionally
-             result = await loop.run_in_executor(
-                 None,
+             result = await run_blocking(
+                 POOL_VOICE_IO,
                  translate_with_args,  # Run the partial function
                  text  # Pass the main positional argument
              )
@@ -102,11 +101,10 @@ class GoogleTranslateClient:
                 return {'language': 'und', 'confidence': 0.0, 'input': text}
 
         try:
-            loop = asyncio.get_running_loop()
             logger.debug("Requesting language detection from Google Translate API.")
             # Use the detect_language method of the v2 client
             detect_func = functools.partial(self.client.detect_language)
-            result = await loop.run_in_executor(None, detect_func, text)
+            result = await run_blocking(POOL_VOICE_IO, detect_func, text)
             logger.info(
                 f"Language detection successful. Detected: '{result.get('language') if isinstance(result, dict) else [r.get('language') for r in result]}'")
             return result  # Returns dict or list of dicts with 'language', 'confidence', 'input'
@@ -29,7 +29,8 @@ class GoogleTtsClient:
         language_code: str, # BCP-47 code (e.g., "en-US")
         voice_name: Optional[str] = None, # Specific voice name (e.g., "en-US-Standard-C")
         speaking_rate: Optional[float] = None,
-        audio_encoding: Optional[str] = None # e.g., "MP3", "LINEAR16"
+        audio_encoding: Optional[str] = None, # e.g., "MP3", "LINEAR16"
+        sample_rate_hertz: Optional[int] = None # Optional output sample rate; None = voice's natural rate
     ) -> bytes:
         """
         Synthesizes speech from text.
@@ -40,6 +41,7 @@ class GoogleTtsClient:
             voice_name: Optional specific voice name. If None, API chooses default.
             speaking_rate: Optional speaking rate (default defined in settings).
             audio_encoding: Optional audio encoding (default defined in settings).
+            sample_rate_hertz: Optional output sample rate (the API resamples if it differs from the voice's).
 
         Returns:
             The synthesized audio as bytes.
@@ -79,6 +81,8 @@ class GoogleTtsClient:
             speaking_rate=effective_speaking_rate,
             # Add pitch, volume etc. if needed
         )
+        if sample_rate_hertz:
+            audio_config.sample_rate_hertz = sample_rate_hertz
 
         request = texttospeech.SynthesizeSpeechRequest(
             input=synthesis_input,
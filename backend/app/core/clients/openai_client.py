@@ -1,34 +1,40 @@
 import logging
 import io
-from typing import Optional
+from typing import Optional, Tuple
 import asyncio
-
-try:
-    from openai import AsyncOpenAI, APIError, OpenAIError
-except ImportError:
-    AsyncOpenAI = None
-    APIError = None
-    OpenAIError = None
-    logging.critical("OpenAI library not found. Please install it (`pip install openai`). OpenAI features will be disabled.")
-
+import threading
 
 from ..config import Settings
 from ..exception import TranscriptionError, ConfigurationError, InvalidRequestError
+from ..lazy_imports import LazyModule, is_available, SUBSYSTEM_OPENAI
+
+# The openai package (and its httpx/pydantic model tree) is imported on first use
+OPENAI_AVAILABLE = is_available("openai")
+if not OPENAI_AVAILABLE:
+    logging.critical("OpenAI library not found. Please install it (`pip install openai`). OpenAI features will be disabled.")
+openai = LazyModule("openai", SUBSYSTEM_OPENAI)
 
 logger = logging.getLogger(__name__)
 
 # Recommended model for transcription
 DEFAULT_WHISPER_MODEL = "whisper-1"
 
+# Whisper's verbose_json reports the detected language by name; ISO 639-1 codes for the ones we support
+WHISPER_LANGUAGE_CODES = {
+    "english": "en", "malay": "ms", "indonesian": "id", "tagalog": "tl", "filipino": "tl",
+    "thai": "th", "vietnamese": "vi", "khmer": "km", "chinese": "zh", "tamil": "ta",
+}
+
 class OpenAiClient:
     """Client for interacting with OpenAI APIs (specifically Whisper for now)."""
 
     def __init__(self, settings: Settings):
         self.settings = settings
-        self.client = None
+        self.client = None # AsyncOpenAI, created on first use (or by warm_up)
         self.enabled = False
+        self._client_lock = threading.Lock()
 
-        if AsyncOpenAI is None:
+        if not OPENAI_AVAILABLE:
             logger.error("OpenAI client cannot be initialized because the 'openai' library is missing.")
             return # Remain disabled
 
@@ -36,19 +42,27 @@ class OpenAiClient:
             logger.warning("OPENAI_API_KEY is not configured. OpenAI client will be disabled.")
             return # Remain disabled
 
-        try:
-            self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-            self.enabled = True
-            logger.info(f"OpenAI AsyncClient initialized successfully (for Whisper model: {DEFAULT_WHISPER_MODEL}).")
-            # Potential test call (optional, adds startup time/cost):
-            # asyncio.run(self.client.models.list())
-        except OpenAIError as e:
-            logger.error(f"Failed to initialize OpenAI client: {e}", exc_info=True)
-            raise ConfigurationError(f"OpenAI client configuration failed: {e}", original_exception=e)
-        except Exception as e:
-             logger.error(f"Unexpected error initializing OpenAI client: {e}", exc_info=True)
-             # Fallback to disabled state
-             self.enabled = False
+        self.enabled = True
+        logger.info(f"OpenAI client enabled (Whisper model: {DEFAULT_WHISPER_MODEL}); AsyncClient is created on first use.")
+
+    def _get_client(self):
+        """Returns the AsyncOpenAI client, creating it on first use."""
+        if self.client is None:
+            with self._client_lock:
+                if self.client is None:
+                    try:
+                        self.client = openai.AsyncOpenAI(api_key=self.settings.OPENAI_API_KEY)
+                        logger.info(f"OpenAI AsyncClient initialized successfully (for Whisper model: {DEFAULT_WHISPER_MODEL}).")
+                    except Exception as e:
+                        logger.error(f"Failed to initialize OpenAI client: {e}", exc_info=True)
+                        self.enabled = False
+                        raise ConfigurationError(f"OpenAI client configuration failed: {e}", original_exception=e)
+        return self.client
+
+    def warm_up(self) -> None:
+        """Imports openai and creates the AsyncClient ahead of the first Whisper fallback. Blocking."""
+        if self.enabled:
+            self._get_client()
 
 
     def _get_iso_639_1_code(self, bcp47_code: Optional[str]) -> Optional[str]:
@@ -68,7 +82,21 @@ class OpenAiClient:
         language_code_hint: Optional[str] = None # Optional BCP-47 hint
     ) -> Optional[str]:
         """
-        Transcribes audio data using OpenAI Whisper API.
+        Transcribes audio data using OpenAI Whisper API. Returns the transcript or None;
+        see transcribe_with_language for arguments and errors.
+        """
+        transcript, _ = await self.transcribe_with_language(audio_data, filename, language_code_hint)
+        return transcript
+
+    async def transcribe_with_language(
+        self,
+        audio_data: bytes,
+        filename: str, # Must include extension (e.g., "audio.wav")
+        language_code_hint: Optional[str] = None # Optional BCP-47 hint
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Transcribes audio data using OpenAI Whisper API and reports the language Whisper detected,
+        so callers do not need a separate language-detection request.
 
         Args:
             audio_data: Raw audio bytes.
@@ -77,18 +105,21 @@ class OpenAiClient:
             language_code_hint: Optional BCP-47 language hint (will be converted to ISO 639-1).
 
         Returns:
-            The transcribed text (str) or None if transcription fails or returns empty.
+            A tuple containing:
+                - The transcribed text (str) or None if transcription returns empty.
+                - The detected language as ISO 639-1 (e.g. 'ms'), or None if Whisper did not
+                  report one we know.
 
         Raises:
             TranscriptionError: If the API call fails.
             InvalidRequestError: If input parameters are invalid.
             ConfigurationError: If the client is not enabled/configured.
         """
-        if not self.enabled or self.client is None:
+        if not self.enabled:
             raise ConfigurationError("OpenAI client is not enabled or configured.")
         if not audio_data:
             logger.warning("OpenAI transcribe called with empty audio data.")
-            return None
+            return None, None
         if not filename or '.' not in filename:
             raise InvalidRequestError("A valid filename with an extension is required for OpenAI transcription.")
 
@@ -101,28 +132,31 @@ class OpenAiClient:
 
             logger.info(f"Sending request to OpenAI Whisper API ({DEFAULT_WHISPER_MODEL}). File: {filename}, Lang hint: {iso_language_hint or 'None'}")
 
-            response = await self.client.audio.transcriptions.create(
+            response = await self._get_client().audio.transcriptions.create(
                 model=DEFAULT_WHISPER_MODEL,
                 file=audio_file_tuple,
                 language=iso_language_hint, # Pass ISO code or None
-                # response_format="text" # Simpler, but "json" (default) might be safer if API changes
+                response_format="verbose_json" # Adds the detected 'language' to the default 'text'
             )
 
-            # Default response format is JSON with a 'text' field
             transcript = response.text if hasattr(response, 'text') else None
+            language_name = (getattr(response, 'language', None) or "").lower()
+            detected_iso = WHISPER_LANGUAGE_CODES.get(language_name) or (language_name if len(language_name) == 2 else None)
 
             if transcript:
-                logger.info(f"OpenAI Whisper transcription successful. Transcript: '{transcript[:50]}...'")
-                return transcript.strip()
+                logger.info(f"OpenAI Whisper transcription successful (language: {language_name or 'unknown'}). Transcript: '{transcript[:50]}...'")
+                return transcript.strip(), detected_iso
             else:
                 logger.warning("OpenAI Whisper API returned no transcript text.")
-                return None
+                return None, detected_iso
 
-        except APIError as e:
+        except ConfigurationError:
+            raise
+        except openai.APIError as e:
             # Handle API errors (e.g., authentication, rate limits)
             logger.error(f"OpenAI API error during transcription: {e}", exc_info=True)
             raise TranscriptionError(f"OpenAI API request failed: {e.status_code} - {e.message}", original_exception=e)
-        except OpenAIError as e:
+        except openai.OpenAIError as e:
             # Handle other library errors
             logger.error(f"OpenAI library error during transcription: {e}", exc_info=True)
             raise TranscriptionError(f"OpenAI client library error: {e}", original_exception=e)
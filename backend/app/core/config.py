@@ -1,6 +1,6 @@
 # backend/core/config.py
 import os
-from typing import List, Optional, Dict, Tuple
+from typing import Any, List, Optional, Dict, Tuple
 from pydantic_settings import BaseSettings, SettingsConfigDict
 import logging
 
@@ -13,6 +13,34 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8', extra='ignore')
 
     LOG_LEVEL: str = "INFO"
+    STARTUP_BACKGROUND_WARMUP: bool = True  # Import heavy subsystems in a background task after startup (otherwise on first use)
+
+    # --- Executor Pools (see core/executors.py) ---
+    EXECUTOR_POOL_SIZES: Dict[str, int] = {  # Pool name : worker threads
+        "voice_io": 16,     # Gemini / Translate calls on the voice path (latency critical)
+        "blocking_io": 8,   # googlemaps legacy client, flood site scraping
+        "vision": 3,        # Frame decode, FaceMesh, YOLO (one call per model at a time anyway)
+        "dsp": 2,           # Audio decode / noise reduction
+    }
+
+    # --- Adaptive Quality (see core/quality_controller.py) ---
+    QUALITY_CONTROLLER_ENABLED: bool = True
+    QUALITY_TARGET_P95_SEC: float = 6.0  # End-to-end /interact p95 target
+    QUALITY_RECOVERY_RATIO: float = 0.7  # Step back up once p95 < target * ratio
+    QUALITY_WINDOW: int = 50  # Requests in the rolling latency window
+    QUALITY_MIN_SAMPLES: int = 10  # Requests needed before the tier can change
+    QUALITY_COOLDOWN_SEC: float = 30.0  # Minimum time between tier changes
+    QUALITY_LOW_TTS_SAMPLE_RATE_HERTZ: int = 16000  # TTS sample rate at the lowest tier
+
+    # --- Admission Control (see core/admission.py) ---
+    ADMISSION_LIMITS: Dict[str, Dict[str, int]] = {  # Path : concurrent requests + bounded wait queue
+        "/assistant/interact": {"concurrency": 4, "queue": 8},
+        "/assistant/detect-speech": {"concurrency": 8, "queue": 16},
+        "/safety/analyze-sleepiness": {"concurrency": 2, "queue": 4},
+    }
+    ADMISSION_QUEUE_TIMEOUT_SEC: float = 10.0  # Max time a request waits for a slot before 503
+    ADMISSION_RETRY_AFTER_SEC: int = 2  # Retry-After used until service times have been observed
+    ADMISSION_RESERVED_PATHS: List[str] = ["/safety/crash-detected"]  # Always admitted (reserved lane)
 
     # --- API Keys & Credentials ---
     # GOOGLE_APPLICATION_CREDENTIALS: Optional[str] = None # Recommended: Set this env var externally for ADC
@@ -81,15 +109,94 @@ Output ONLY a JSON object with the following structure:
 """
 
     # --- STT Settings ---
-    STT_MODEL: Optional[str] = "latest_long"
+    STT_MODEL: Optional[str] = "latest_long"  # Used when no STT_MODEL_ROUTES rule matches
+    # Per-request model routing (GoogleSttClient.select_model). The first rule whose conditions all
+    # hold wins: "endpoint" ('interact' = batch upload, 'stream' = WebSocket streaming recognition,
+    # 'probe' = /assistant/detect-speech verification with DETECT_SPEECH_VERIFY_WITH_STT)
+    # and "max_seconds" (audio duration; unknown for streams). "model" is the Google STT model,
+    # optional "punctuation" overrides STT_ENABLE_AUTOMATIC_PUNCTUATION for that rule.
+    STT_MODEL_ROUTES: List[Dict[str, Any]] = [
+        {"endpoint": "probe", "model": "latest_short", "punctuation": False},  # Speech probes: only "any words?"
+        {"endpoint": "stream", "model": "latest_short"},  # Streamed utterances are voice commands
+        {"max_seconds": 5.0, "model": "latest_short"},  # Short commands
+        {"model": "latest_long"},  # Dictation / long messages
+    ]
     STT_ENABLE_AUTOMATIC_PUNCTUATION: bool = True
+    # Sample rate each STT provider receives. Uploads are resampled (polyphase) and downmixed to the
+    # 'google' rate before noise reduction; Whisper reuses that buffer unless its rate differs. 0 = native rate.
+    STT_SAMPLE_RATE_HERTZ: Dict[str, int] = {"google": 16000, "whisper": 16000}
+    # Whisper upload encoding: 'flac' (lossless), 'opus' (Ogg/Opus via PyAV, smallest) or 'wav'
+    WHISPER_UPLOAD_FORMAT: str = "flac"
+    WHISPER_OPUS_BITRATE: int = 32000  # bits/s, for 'opus'
+    # Leading/trailing non-speech is cut (after noise reduction) before audio is sent to STT
+    STT_TRIM_SILENCE: bool = True
+    STT_TRIM_PADDING_MS: float = 300.0  # Kept on both sides of the detected speech
+    STT_TRIM_THRESHOLD_DB: float = -40.0  # VAD energy threshold, relative to the loudest frame
+    # Streaming recognition (/assistant/stream with transcribe=true): transcript is ready right after speech_end
+    STT_STREAMING_INTERIM_RESULTS: bool = True  # Push interim hypotheses to the client while the driver talks
+    STT_STREAMING_PREROLL_MS: float = 300.0  # Buffered audio sent from before the detected speech start
+    STT_STREAMING_FINAL_TIMEOUT_SEC: float = 5.0  # How long /interact waits for a pending final transcript
+    # Hedged recognition (batch): Whisper is started while Google STT is still running and the first
+    # acceptable result wins. Disabled = Whisper only after Google fails (sequential fallback).
+    STT_HEDGING_ENABLED: bool = True
+    STT_HEDGE_QUANTILE: float = 0.9  # Whisper starts once Google is slower than this quantile of its latency
+    STT_HEDGE_MIN_DELAY_SEC: float = 0.5
+    STT_HEDGE_MAX_DELAY_SEC: float = 4.0
+    STT_HEDGE_DEFAULT_DELAY_SEC: float = 2.0  # Until Google latencies have been observed
+    STT_HEDGE_WITHOUT_HINT: bool = True  # No language hint: language detection often fails, start both at once
+    # Per-session language profile (core/language_profile.py): once a session's languages are known,
+    # Google STT only gets those instead of the whole SUPPORTED_LANGUAGES list
+    STT_LANGUAGE_PROFILE_ENABLED: bool = True
+    STT_LANGUAGE_PROFILE_MIN_OBSERVATIONS: int = 2  # Detections before the list is narrowed
+    STT_LANGUAGE_PROFILE_MAX_LANGUAGES: int = 2
+    STT_LANGUAGE_PROFILE_MIN_SHARE: float = 0.2  # Languages below this share of the profile are left out
+    STT_LANGUAGE_PROFILE_DECAY: float = 0.8  # Weight kept by earlier detections per new one
+    # Narrowed results below this confidence (or without transcript/language) are retried with all languages
+    STT_LANGUAGE_NARROW_MIN_CONFIDENCE: float = 0.6
+    # Long recordings (dictated messages): split at pauses and recognised in parallel; batch
+    # recognize only accepts about a minute of audio per request
+    STT_SEGMENTATION_ENABLED: bool = True
+    STT_SEGMENT_MAX_SEC: float = 20.0  # Longer (silence-trimmed) audio is split into segments of at most this
+    STT_SEGMENT_MIN_SEC: float = 5.0  # No cut closer than this to the previous one
+    STT_SEGMENT_FANOUT: int = 4  # Segments recognised concurrently per recording
+
+    # --- Speech Detection (/assistant/detect-speech) ---
+    # Local detector thresholds (core/audio_enhancement.detect_speech_activity)
+    VAD_ENERGY_FLOOR_DBFS: float = -50.0  # Frames quieter than this are never speech
+    VAD_SNR_MARGIN_DB: float = 6.0  # Required speech-band level above the chunk's noise floor
+    VAD_MAX_SPECTRAL_FLATNESS: float = 0.5  # Noise-like (flat) spectra are rejected
+    VAD_MIN_SPEECH_BAND_RATIO: float = 0.2  # Share of frame energy in 300-3400 Hz
+    VAD_MIN_SPEECH_MS: float = 150.0  # Consecutive speech needed to report "speech"
+    DETECT_SPEECH_VERIFY_WITH_STT: bool = False  # Opt-in: confirm local "speech" results with cloud STT
+    # Streaming end-of-speech detection (/assistant/stream WebSocket)
+    VAD_HANGOVER_MS: float = 700.0  # Silence needed after speech before 'speech_end' is sent
+    # Per-session buffer of audio already received (detect-speech chunks, stream frames), referenced by /interact
+    SESSION_AUDIO_BUFFER_SECONDS: float = 60.0  # Max ring size per session (older audio is overwritten); grows as audio arrives
+    SESSION_AUDIO_TTL_SEC: float = 120.0  # Sessions idle this long are dropped
+    SESSION_AUDIO_MAX_MB: float = 256.0  # Total cap across sessions; least recently used are evicted first
+    SESSION_AUDIO_MAX_TOMBSTONES: int = 100000  # Dropped sessions whose timeline end is kept, so a returning session continues it
 
     # --- Noise Reduction Settings (NEW) ---
-    NOISE_REDUCTION_METHOD: str = "tunable_nr"  # Options: 'tunable_nr', 'wiener' (if implemented), 'none'
+    FFMPEG_BINARY: str = "ffmpeg"  # Last-resort decoder for formats libsndfile/PyAV cannot read (looked up on PATH)
+    NOISE_REDUCTION_METHOD: str = "tunable_nr"  # Options: 'tunable_nr', 'wiener', 'none'
+    NOISE_REDUCTION_CHEAP_METHOD: str = "tunable_nr"  # Method at the cheap-NR quality tier ('tunable_nr' = one stationary pass)
     # Parameters for 'tunable_nr' method (from noise_reduction.py defaults/example)
     NR_PROP_DECREASE: float = 0.9  # NR strength (0.0-1.0). Controls how much noise is subtracted.
     NR_TIME_SMOOTH_MS: float = 150.0  # Temporal smoothing (ms). Higher = less aggressive gating.
     NR_PASSES: int = 1
+    NR_SHARED_STFT: bool = True  # VAD, noise estimate and every pass from one STFT (False = simple_vad + noisereduce per pass)
+    # SNR-gated NR: clean recordings skip NR, moderately noisy ones get a scaled-down strength
+    NR_SNR_GATING_ENABLED: bool = True
+    NR_SNR_BYPASS_DB: float = 25.0  # Estimated input SNR at or above which NR is skipped
+    NR_SNR_FULL_STRENGTH_DB: float = 5.0  # At or below: NR_PROP_DECREASE and NR_PASSES; in between: scaled linearly
+    NR_MIN_PROP_DECREASE: float = 0.5  # Strength just below NR_SNR_BYPASS_DB
+    # Per-session cabin-noise profile (core/noise_profile_store.py; shared-STFT NR and /detect-speech)
+    NOISE_PROFILE_ENABLED: bool = True  # Gate against the session's noise (stationary) instead of estimating it per clip
+    NOISE_PROFILE_EMA_ALPHA: float = 0.3  # EMA weight of one second of new non-speech audio
+    NOISE_PROFILE_MIN_SECONDS: float = 0.5  # Noise seen before a session's profile is used
+    NOISE_PROFILE_TTL_SEC: float = 1800.0  # Profiles idle this long are dropped (a new trip starts over)
+    NOISE_PROFILE_MAX_SESSIONS: int = 1000  # Least recently used profiles are evicted beyond this (~8 KB each)
+    DSP_PROCESS_WORKERS: int = 2  # Worker processes for the DSP stage (core/dsp_pool.py); 0 = use the 'dsp' thread pool
 
     # --- TTS Settings ---
     DEFAULT_TTS_SPEAKING_RATE: float = 1.0
@@ -160,6 +267,7 @@ Output ONLY a JSON object with the following structure:
     DROWSINESS_YOLO_CONF_THRESHOLD: float = 0.5  # Confidence threshold for YOLO detections
     DROWSINESS_MEDIAPIPE_MIN_DET_CONF: float = 0.5
     DROWSINESS_MEDIAPIPE_MIN_TRACK_CONF: float = 0.5
+    DROWSINESS_MODEL_WARMUP_ENABLED: bool = True  # Run one dummy inference per model before reporting ready
 
 try:
     settings = Settings()
@@ -0,0 +1,211 @@
+# backend/core/dsp_pool.py
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .config import Settings
+from .executors import run_blocking, POOL_DSP
+from .metrics import metrics
+from ..models.internal import AudioProcessingOptions, AudioProcessingReport
+
+logger = logging.getLogger(__name__)
+
+
+# --- Worker side (runs in the child processes) ---
+
+def _init_worker() -> None:
+    """Imports librosa/noisereduce and runs one dummy pass per worker so the first upload does not pay for it."""
+    from . import lazy_imports
+    from .audio_enhancement import process_pcm16_in_place
+    lazy_imports.warm_up([lazy_imports.SUBSYSTEM_DSP])
+    # First calls into librosa/noisereduce compile and cache internal kernels
+    dummy = (np.random.default_rng(0).normal(0, 1000, 16000)).astype(np.int16)
+    process_pcm16_in_place(dummy, 16000)
+
+
+def _ping() -> bool:
+    return True
+
+
+def _process_shared_buffer(shm_name: str, num_samples: int, sample_rate: int, options: Dict[str, Any],
+                           noise_profile: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                           observe_noise: bool = False) -> Dict[str, Any]:
+    """Runs the DSP stage on an int16 buffer living in shared memory, in place. Returns the report."""
+    from .audio_enhancement import process_pcm16_in_place
+
+    start = time.perf_counter()
+    # Workers are started by multiprocessing and share the parent's resource tracker, so attaching
+    # does not add a second registration; the parent closes and unlinks the block.
+    shm = shared_memory.SharedMemory(name=shm_name)
+    samples = None
+    noise_out: Optional[Dict[str, Any]] = {} if observe_noise else None
+    details: Dict[str, Any] = {}
+    try:
+        samples = np.ndarray((num_samples,), dtype=np.int16, buffer=shm.buf)
+        applied = process_pcm16_in_place(samples, sample_rate, noise_profile=noise_profile, noise_out=noise_out,
+                                         details=details, **options)
+    finally:
+        samples = None  # Release the buffer export before closing the mapping
+        shm.close()
+    return {"noise_reduction_applied": applied, "dsp_seconds": time.perf_counter() - start,
+            "noise_observation": noise_out.get("observation") if noise_out else None, "details": details}
+
+
+# --- Parent side ---
+
+class DspProcessPool:
+    """
+    Process pool for the CPU-bound audio DSP stage (int16/float32 conversion + noise reduction).
+
+    The GIL-holding parts of librosa/noisereduce would otherwise serialise every upload in the
+    worker. Sample buffers are handed over through multiprocessing.shared_memory - only the block
+    name and a few scalars are pickled - and processed in place.
+
+    With DSP_PROCESS_WORKERS = 0, or if the pool breaks, the same stage runs in the 'dsp' thread pool.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.max_workers = max(0, int(settings.DSP_PROCESS_WORKERS))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._broken = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0 and not self._broken
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # 'spawn' avoids forking a process that already runs threads (executor pools, gRPC)
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                    )
+                    logger.info(f"DSP process pool created with {self.max_workers} workers.")
+        return self._executor
+
+    def warm_up(self) -> None:
+        """Starts every worker process (and its DSP imports) ahead of the first upload. Blocking."""
+        if not self.enabled:
+            return
+        executor = self._get_executor()
+        for future in [executor.submit(_ping) for _ in range(self.max_workers)]:
+            future.result()
+
+    def _track(self, delta: int) -> None:
+        with self._lock:
+            self._in_flight += delta
+            metrics.set_gauge("dsp_pool_in_flight", self._in_flight)
+
+    async def process(
+        self, samples: np.ndarray, sample_rate: int, options: AudioProcessingOptions,
+        noise_profile: Optional[Tuple[np.ndarray, np.ndarray]] = None, observe_noise: bool = False
+    ) -> AudioProcessingReport:
+        """
+        Runs the DSP stage on int16 mono samples, in place (`samples` must be a writable,
+        C-contiguous int16 array). Returns the report.
+        `noise_profile` is the session's noise spectrum (NoiseProfileStore.profile), if any; with
+        `observe_noise` the report carries the clip's noise observation for updating it.
+        """
+        if samples.dtype != np.int16 or not samples.flags.c_contiguous or not samples.flags.writeable:
+            raise ValueError("DSP buffers must be writable, C-contiguous int16 arrays.")
+        report = AudioProcessingReport(num_samples=len(samples), sample_rate=sample_rate)
+        if len(samples) == 0 or not options.noise_reduction:
+            return report
+
+        start = time.perf_counter()
+        self._track(1)
+        try:
+            if self.enabled:
+                try:
+                    result = await self._process_in_worker(samples, sample_rate, options, noise_profile, observe_noise)
+                    report.executed_in = "process_pool"
+                except BrokenProcessPool as e:
+                    logger.error(f"DSP process pool is broken ({e}); falling back to the 'dsp' thread pool.")
+                    self._broken = True
+                    result = None
+            else:
+                result = None
+
+            if result is None:
+                result = await run_blocking(
+                    POOL_DSP, _process_local, samples, sample_rate, options.model_dump(), noise_profile, observe_noise)
+                report.executed_in = "thread_pool"
+        finally:
+            self._track(-1)
+
+        worker_report = result
+        report.noise_reduction_applied = worker_report["noise_reduction_applied"]
+        report.dsp_seconds = worker_report["dsp_seconds"]
+        report.noise_observation = worker_report.get("noise_observation")
+        report.noise_profile_used = noise_profile is not None and report.noise_reduction_applied
+        apply_nr_details(report, worker_report.get("details"))
+        metrics.observe("dsp_stage_seconds", time.perf_counter() - start, executed_in=report.executed_in)
+        return report
+
+    async def _process_in_worker(
+        self, samples: np.ndarray, sample_rate: int, options: AudioProcessingOptions,
+        noise_profile: Optional[Tuple[np.ndarray, np.ndarray]] = None, observe_noise: bool = False
+    ) -> Dict[str, Any]:
+        shm = shared_memory.SharedMemory(create=True, size=max(1, samples.nbytes))
+        shared = None
+        try:
+            shared = np.ndarray(samples.shape, dtype=np.int16, buffer=shm.buf)
+            shared[:] = samples
+            loop = asyncio.get_running_loop()
+            worker_report = await loop.run_in_executor(
+                self._get_executor(), _process_shared_buffer,
+                shm.name, len(samples), sample_rate, options.model_dump(), noise_profile, observe_noise)
+            samples[:] = shared  # Copy the result back into the caller's buffer (no new allocation)
+            return worker_report
+        finally:
+            shared = None  # Release the buffer export before closing the mapping
+            shm.close()
+            shm.unlink()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"max_workers": self.max_workers, "enabled": self.enabled, "in_flight": self._in_flight}
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            logger.info("DSP process pool shut down.")
+
+
+def apply_nr_details(report: AudioProcessingReport, details: Optional[Dict[str, Any]]) -> None:
+    """Copies the SNR estimate / NR decision of process_pcm16_in_place's `details` into the report."""
+    if not details:
+        return
+    report.input_snr_db = details.get("snr_db")
+    report.nr_decision = details.get("decision")
+    report.nr_prop_decrease = details.get("prop_decrease")
+    report.nr_passes = details.get("n_passes")
+
+
+def _process_local(samples: np.ndarray, sample_rate: int, options: Dict[str, Any],
+                   noise_profile: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                   observe_noise: bool = False) -> Dict[str, Any]:
+    """Thread-pool variant of the DSP stage (no process pool). Returns the same report dict as the workers."""
+    from .audio_enhancement import process_pcm16_in_place
+
+    start = time.perf_counter()
+    noise_out: Optional[Dict[str, Any]] = {} if observe_noise else None
+    details: Dict[str, Any] = {}
+    applied = process_pcm16_in_place(samples, sample_rate, noise_profile=noise_profile, noise_out=noise_out,
+                                     details=details, **options)
+    return {"noise_reduction_applied": applied, "dsp_seconds": time.perf_counter() - start,
+            "noise_observation": noise_out.get("observation") if noise_out else None, "details": details}
@@ -0,0 +1,142 @@
+# backend/core/executors.py
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from .config import Settings, settings as global_settings
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Named thread pools, one per workload class, so a burst in one class cannot starve another.
+# Latency-critical voice stages get their own pool and are never queued behind vision inference.
+POOL_VOICE_IO = "voice_io"        # Gemini generate_content/send_message, Translate translate/detect
+POOL_BLOCKING_IO = "blocking_io"  # googlemaps legacy client, flood site requests.get
+POOL_VISION = "vision"            # cv2 decode, MediaPipe FaceMesh, YOLO predict
+POOL_DSP = "dsp"                  # Audio decode / noise reduction
+
+
+class NamedExecutor:
+    """
+    A bounded ThreadPoolExecutor that tracks queue depth, active workers, queue wait time and
+    run time (published as executor_* metrics labelled with the pool name).
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._publish()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def _publish(self) -> None:
+        metrics.set_gauge("executor_queue_depth", self._queued, pool=self.name)
+        metrics.set_gauge("executor_active", self._active, pool=self.name)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Runs `fn(*args, **kwargs)` in this pool and awaits the result."""
+        loop = asyncio.get_running_loop()
+        submitted_at = time.perf_counter()
+        state = {"started": False, "abandoned": False}
+
+        def _task():
+            with self._lock:
+                if state["abandoned"]:
+                    return None
+                state["started"] = True
+                self._queued -= 1
+                self._active += 1
+                self._publish()
+            started_at = time.perf_counter()
+            metrics.observe("executor_wait_seconds", started_at - submitted_at, pool=self.name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                metrics.observe("executor_run_seconds", time.perf_counter() - started_at, pool=self.name)
+                with self._lock:
+                    self._active -= 1
+                    self._publish()
+
+        with self._lock:
+            self._queued += 1
+            self._publish()
+        try:
+            return await loop.run_in_executor(self._executor, _task)
+        except asyncio.CancelledError:
+            # A task cancelled before a worker picked it up never runs; take it off the queue count
+            with self._lock:
+                if not state["started"]:
+                    state["abandoned"] = True
+                    self._queued -= 1
+                    self._publish()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "queue_depth": self._queued,
+            "active": self._active,
+            "wait_p95_sec": metrics.percentile("executor_wait_seconds", 95, pool=self.name),
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_executors: Dict[str, NamedExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def configure_executors(settings: Settings) -> Dict[str, NamedExecutor]:
+    """Creates every pool listed in settings.EXECUTOR_POOL_SIZES. Called once from the lifespan."""
+    with _executors_lock:
+        for name, size in settings.EXECUTOR_POOL_SIZES.items():
+            if name not in _executors:
+                _executors[name] = NamedExecutor(name, max(1, int(size)))
+                logger.info(f"Executor pool '{name}' created with {_executors[name].max_workers} workers.")
+    return dict(_executors)
+
+
+def get_executor(name: str) -> NamedExecutor:
+    """Returns the named pool, creating it from the global settings if the lifespan has not run (e.g. scripts)."""
+    executor = _executors.get(name)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(name)
+            if executor is None:
+                size = global_settings.EXECUTOR_POOL_SIZES.get(name)
+                if size is None:
+                    raise ValueError(f"Unknown executor pool '{name}'. Add it to EXECUTOR_POOL_SIZES.")
+                executor = _executors[name] = NamedExecutor(name, max(1, int(size)))
+    return executor
+
+
+async def run_blocking(pool: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Runs a blocking callable in the named pool. Use instead of loop.run_in_executor(None, ...)."""
+    return await get_executor(pool).run(fn, *args, **kwargs)
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: executor.stats() for name, executor in _executors.items()}
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Shuts every pool down. Called from the lifespan on application shutdown."""
+    with _executors_lock:
+        for name, executor in _executors.items():
+            executor.shutdown(wait=wait)
+            logger.info(f"Executor pool '{name}' shut down.")
+        _executors.clear()
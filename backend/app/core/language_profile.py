@@ -0,0 +1,55 @@
+# backend/core/language_profile.py
+import logging
+from typing import List, Optional
+
+from .config import Settings
+from ..models.internal import LanguageProfile
+
+logger = logging.getLogger(__name__)
+
+
+def _supported(settings: Settings) -> List[str]:
+    """DEFAULT_LANGUAGE_CODE followed by SUPPORTED_LANGUAGES, without duplicates (case-insensitive)."""
+    seen, languages = set(), []
+    for lang in [settings.DEFAULT_LANGUAGE_CODE] + list(settings.SUPPORTED_LANGUAGES or []):
+        if lang.lower() not in seen:
+            seen.add(lang.lower())
+            languages.append(lang)
+    return languages
+
+
+def _canonical(language: str, settings: Settings) -> Optional[str]:
+    """The configured spelling of `language` (STT returns e.g. 'ms-my'), or None if it is not supported."""
+    return next((lang for lang in _supported(settings) if lang.lower() == language.lower()), None)
+
+
+def record_language(profile: LanguageProfile, language: Optional[str], settings: Settings) -> None:
+    """Adds one detection to the profile; older detections decay by STT_LANGUAGE_PROFILE_DECAY."""
+    language = _canonical(language, settings) if language else None
+    if language is None:
+        return
+    decay = settings.STT_LANGUAGE_PROFILE_DECAY
+    profile.weights = {lang: w * decay for lang, w in profile.weights.items() if w * decay >= 0.01}
+    profile.weights[language] = profile.weights.get(language, 0.0) + 1.0
+    profile.observations += 1
+
+
+def likely_languages(profile: LanguageProfile, settings: Settings, language_code_hint: Optional[str] = None) -> Optional[List[str]]:
+    """
+    The languages to send to STT for this session, most likely first, or None for the full
+    supported list (profile disabled or too few detections yet). A language is kept while its share
+    of the profile is at least STT_LANGUAGE_PROFILE_MIN_SHARE, up to STT_LANGUAGE_PROFILE_MAX_LANGUAGES;
+    a supported hint is always included.
+    """
+    if not settings.STT_LANGUAGE_PROFILE_ENABLED or profile.observations < settings.STT_LANGUAGE_PROFILE_MIN_OBSERVATIONS:
+        return None
+    total = sum(profile.weights.values())
+    if total <= 0:
+        return None
+    ranked = sorted(profile.weights.items(), key=lambda item: item[1], reverse=True)
+    languages = [lang for lang, w in ranked if w / total >= settings.STT_LANGUAGE_PROFILE_MIN_SHARE]
+    languages = languages[:settings.STT_LANGUAGE_PROFILE_MAX_LANGUAGES]
+    hint = _canonical(language_code_hint, settings) if language_code_hint else None
+    if hint is not None and hint not in languages:
+        languages.insert(0, hint)
+    return languages or None
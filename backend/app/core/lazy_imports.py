@@ -0,0 +1,111 @@
+# backend/core/lazy_imports.py
+import importlib
+import importlib.util
+import logging
+import threading
+import time
+from types import ModuleType
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Heavy third-party packages are imported on first use (or by the background warm-up task)
+# instead of at `import app.main`. Each is registered under a subsystem name so startup
+# profiling and warm-up can be done per subsystem.
+SUBSYSTEM_VISION = "vision"  # cv2, mediapipe, ultralytics/torch
+SUBSYSTEM_DSP = "dsp"  # librosa, noisereduce, scipy, soundfile, av
+SUBSYSTEM_MAPS_LEGACY = "maps_legacy"  # googlemaps (Geocoding/Places)
+SUBSYSTEM_OPENAI = "openai"  # openai (Whisper fallback)
+SUBSYSTEM_NLU = "nlu"  # pycountry
+
+_import_lock = threading.RLock()
+_import_times: Dict[str, Dict[str, float | str]] = {}  # module name -> {"subsystem", "seconds"}
+_warmup_hooks: Dict[str, List[Callable[[], object]]] = {}
+_availability_cache: Dict[str, bool] = {}
+
+
+def is_available(module_name: str) -> bool:
+    """Checks whether a top-level package is installed without importing it."""
+    if module_name not in _availability_cache:
+        try:
+            _availability_cache[module_name] = importlib.util.find_spec(module_name) is not None
+        except (ImportError, ValueError):
+            _availability_cache[module_name] = False
+    return _availability_cache[module_name]
+
+
+def load_module(module_name: str, subsystem: str) -> ModuleType:
+    """Imports a module, recording how long the first import took."""
+    with _import_lock:
+        already_loaded = module_name in _import_times
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        if not already_loaded:
+            elapsed = time.perf_counter() - start
+            _import_times[module_name] = {"subsystem": subsystem, "seconds": elapsed}
+            logger.info(f"Lazily imported '{module_name}' ({subsystem}) in {elapsed:.3f}s.")
+        return module
+
+
+def register_warmup(subsystem: str, hook: Callable[[], object]) -> None:
+    """Registers a callable that the background warm-up runs for the given subsystem."""
+    _warmup_hooks.setdefault(subsystem, []).append(hook)
+
+
+class LazyModule:
+    """
+    Stand-in for a module that performs the real import on first attribute access.
+
+    Usage: `librosa = LazyModule("librosa", SUBSYSTEM_DSP)` at module level, then use
+    `librosa.feature.rms(...)` as usual. Works in `except module.SomeError:` clauses too.
+    """
+
+    def __init__(self, module_name: str, subsystem: str):
+        self._module_name = module_name
+        self._subsystem = subsystem
+        self._module: Optional[ModuleType] = None
+        register_warmup(subsystem, self._load)
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            self._module = load_module(self._module_name, self._subsystem)
+        return self._module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule '{self._module_name}' ({self._subsystem}, {state})>"
+
+
+def warm_up(subsystems: Optional[List[str]] = None) -> Dict[str, float]:
+    """
+    Runs the registered warm-up hooks (imports and client initialisers). Blocking; meant to be
+    run in a worker thread after startup. Failures are logged and do not stop other subsystems.
+
+    Returns: subsystem name -> seconds spent warming it up.
+    """
+    timings: Dict[str, float] = {}
+    for subsystem, hooks in list(_warmup_hooks.items()):
+        if subsystems is not None and subsystem not in subsystems:
+            continue
+        start = time.perf_counter()
+        for hook in hooks:
+            try:
+                hook()
+            except Exception as e:
+                logger.warning(f"Warm-up of subsystem '{subsystem}' failed: {e}")
+        timings[subsystem] = time.perf_counter() - start
+        logger.info(f"Subsystem '{subsystem}' warmed up in {timings[subsystem]:.3f}s.")
+    return timings
+
+
+def import_times() -> Dict[str, Dict[str, float | str]]:
+    """Returns the recorded first-import times of lazily loaded modules."""
+    with _import_lock:
+        return dict(_import_times)
@@ -0,0 +1,94 @@
+# backend/core/metrics.py
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import numpy as np
+
+# In-process metrics (counters, gauges, rolling histograms), exposed as JSON on GET /metrics.
+# Each worker process keeps its own values; the load balancer / scraper aggregates across workers.
+
+DEFAULT_HISTOGRAM_WINDOW = 1024  # Most recent observations kept per histogram (for percentiles)
+
+
+def _key(name: str, labels: Dict[str, Any]) -> str:
+    """Builds a Prometheus-style series key, e.g. `executor_queue_depth{pool=vision}`."""
+    if not labels:
+        return name
+    label_str = ",".join(f"{k}={labels[k]}" for k in sorted(labels))
+    return f"{name}{{{label_str}}}"
+
+
+class Histogram:
+    """Count/sum over the process lifetime plus percentiles over a rolling window of observations."""
+
+    def __init__(self, window: int = DEFAULT_HISTOGRAM_WINDOW):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self._recent.append(value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._recent:
+            return None
+        return float(np.percentile(np.fromiter(self._recent, dtype=np.float64), q))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 6) if self.count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max if self.count else None,
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe store for counters, gauges and histograms (updated from executor threads too)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._histograms: Dict[str, Histogram] = {}
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def percentile(self, name: str, q: float, **labels) -> Optional[float]:
+        with self._lock:
+            histogram = self._histograms.get(_key(name, labels))
+            return histogram.percentile(q) if histogram else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "histograms": {key: h.snapshot() for key, h in self._histograms.items()},
+            }
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
@@ -0,0 +1,196 @@
+# backend/core/model_registry.py
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from .config import Settings
+from .exception import StateError
+from .executors import run_blocking, POOL_VISION
+from .lazy_imports import load_module, SUBSYSTEM_VISION
+
+logger = logging.getLogger(__name__)
+
+# Registry lifecycle states (exposed on the readiness endpoint)
+STATUS_DISABLED = "disabled"  # Drowsiness detection switched off in settings
+STATUS_COLD = "cold"          # Nothing loaded yet
+STATUS_LOADING = "loading"    # Deserialising weights / running warm-up
+STATUS_WARM = "warm"          # Every model loaded and warmed up
+STATUS_FAILED = "failed"      # Loading failed, feature unavailable
+
+# Names under which handles are registered
+FACE_MESH_MODEL = "face_mesh"
+YAWN_MODEL = "yawn"
+EYE_MODEL = "eye"
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """Returns the resident set size of this process, or None if it cannot be read (non-Linux)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _torch_parameter_bytes(model: Any) -> Optional[int]:
+    """Sums the size of a YOLO model's weights. Returns None for non-torch models."""
+    try:
+        return int(sum(p.numel() * p.element_size() for p in model.model.parameters()))
+    except Exception:
+        return None
+
+
+class ModelHandle:
+    """
+    Shared handle to a loaded vision model.
+
+    YOLO predictors and MediaPipe graphs keep mutable state between calls and are not
+    safe to call from several executor threads at once, so every call goes through a lock.
+    """
+
+    def __init__(self, name: str, model: Any, method_name: str):
+        self.name = name
+        self.model = model
+        self._method = getattr(model, method_name)
+        self._lock = threading.Lock()
+        self.load_time_sec: float = 0.0
+        self.warmup_time_sec: Optional[float] = None
+        self.parameter_bytes: Optional[int] = None
+        self.rss_delta_bytes: Optional[int] = None
+
+    def __call__(self, *args, **kwargs) -> Any:
+        with self._lock:
+            return self._method(*args, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "load_time_sec": round(self.load_time_sec, 4),
+            "warmup_time_sec": round(self.warmup_time_sec, 4) if self.warmup_time_sec is not None else None,
+            "parameter_bytes": self.parameter_bytes,
+            "rss_delta_bytes": self.rss_delta_bytes,
+        }
+
+
+class ModelRegistry:
+    """
+    Process-wide owner of the drowsiness detection models (MediaPipe FaceMesh + YOLO yawn/eye).
+
+    Created once by the FastAPI lifespan. Models are deserialised exactly once, warmed up with a
+    dummy inference, and then handed out as shared ModelHandle objects to SafetyService.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.status = STATUS_COLD if settings.DROWSINESS_DETECTION_ENABLED else STATUS_DISABLED
+        self.error: Optional[str] = None
+        self._handles: Dict[str, ModelHandle] = {}
+        self._load_lock = threading.Lock()
+
+    @property
+    def is_warm(self) -> bool:
+        return self.status == STATUS_WARM
+
+    @property
+    def is_ready(self) -> bool:
+        """True when the worker can serve traffic: models warm, or the feature is disabled."""
+        return self.status in (STATUS_WARM, STATUS_DISABLED)
+
+    def _load_model(self, name: str, factory: Callable[[], Any], method_name: str) -> ModelHandle:
+        rss_before = _current_rss_bytes()
+        load_start = time.perf_counter()
+        model = factory()
+        handle = ModelHandle(name, model, method_name)
+        handle.load_time_sec = time.perf_counter() - load_start
+        rss_after = _current_rss_bytes()
+        if rss_before is not None and rss_after is not None:
+            handle.rss_delta_bytes = rss_after - rss_before
+        handle.parameter_bytes = _torch_parameter_bytes(model)
+        logger.info(f"Model '{name}' loaded in {handle.load_time_sec:.3f}s "
+                    f"(params: {handle.parameter_bytes or 'n/a'} bytes, RSS delta: {handle.rss_delta_bytes or 'n/a'} bytes).")
+        return handle
+
+    def _warm_up(self) -> None:
+        """Runs one dummy inference per model so the first real request does not pay for lazy init."""
+        dummy_bgr = np.zeros((64, 64, 3), dtype=np.uint8)
+        dummy_rgb = np.zeros((128, 128, 3), dtype=np.uint8)
+        for name, handle in self._handles.items():
+            warmup_start = time.perf_counter()
+            if name == FACE_MESH_MODEL:
+                handle(dummy_rgb)
+            else:
+                handle(dummy_bgr, verbose=False)
+            handle.warmup_time_sec = time.perf_counter() - warmup_start
+            logger.info(f"Model '{name}' warmed up in {handle.warmup_time_sec:.3f}s.")
+
+    def load(self) -> None:
+        """
+        Loads and warms up every model. Blocking; call from a worker thread.
+        Safe to call more than once - subsequent calls are no-ops once the registry is warm.
+        """
+        with self._load_lock:
+            if self.status in (STATUS_WARM, STATUS_DISABLED):
+                return
+            self.status = STATUS_LOADING
+            logger.info("Loading drowsiness detection models into the model registry...")
+            try:
+                mp = load_module("mediapipe", SUBSYSTEM_VISION)
+                YOLO = load_module("ultralytics", SUBSYSTEM_VISION).YOLO
+
+                settings = self.settings
+                self._handles[FACE_MESH_MODEL] = self._load_model(
+                    FACE_MESH_MODEL,
+                    lambda: mp.solutions.face_mesh.FaceMesh(
+                        static_image_mode=True,  # Process images independently
+                        max_num_faces=1,  # Assume driver is the only relevant face
+                        refine_landmarks=True,  # Get more detailed landmarks (eyes, lips)
+                        min_detection_confidence=settings.DROWSINESS_MEDIAPIPE_MIN_DET_CONF,
+                        min_tracking_confidence=settings.DROWSINESS_MEDIAPIPE_MIN_TRACK_CONF
+                    ),
+                    "process",
+                )
+                self._handles[YAWN_MODEL] = self._load_model(YAWN_MODEL, lambda: YOLO(settings.YAWN_MODEL_PATH), "predict")
+                self._handles[EYE_MODEL] = self._load_model(EYE_MODEL, lambda: YOLO(settings.EYE_MODEL_PATH), "predict")
+
+                if settings.DROWSINESS_MODEL_WARMUP_ENABLED:
+                    self._warm_up()
+                self.status = STATUS_WARM
+                logger.info("Model registry is warm.")
+            except Exception as e:
+                self.status = STATUS_FAILED
+                self.error = str(e)
+                self._handles.clear()
+                logger.error(f"FATAL: Failed to load drowsiness detection models: {e}", exc_info=True)
+
+    async def load_async(self) -> None:
+        """Runs load() in the vision pool so startup does not block the event loop."""
+        await run_blocking(POOL_VISION, self.load)
+
+    def get(self, name: str) -> ModelHandle:
+        """Returns the shared handle for a model. Raises StateError until the registry is warm."""
+        if not self.is_warm:
+            raise StateError(f"Vision model '{name}' is not available (model registry status: {self.status}).")
+        return self._handles[name]
+
+    def close(self) -> None:
+        """Releases native resources held by the models."""
+        face_mesh = self._handles.get(FACE_MESH_MODEL)
+        if face_mesh is not None:
+            try:
+                face_mesh.model.close()
+            except Exception as e:
+                logger.warning(f"Error closing MediaPipe FaceMesh: {e}")
+        self._handles.clear()
+        if self.status == STATUS_WARM:
+            self.status = STATUS_COLD
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "error": self.error,
+            "models": {name: handle.stats() for name, handle in self._handles.items()},
+        }
@@ -0,0 +1,141 @@
+# backend/core/noise_profile_store.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .config import Settings
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# (mean_db, var_db, noise_seconds): per-bin dB statistics of the non-speech frames of one clip
+NoiseObservation = Tuple[np.ndarray, np.ndarray, float]
+
+
+class _SessionNoise:
+    """Exponential moving averages of one session's cabin noise."""
+
+    def __init__(self, sample_rate: int, mean_db: np.ndarray, var_db: np.ndarray, seconds: float):
+        self.sample_rate = sample_rate
+        self.mean_db = mean_db.astype(np.float32)
+        self.var_db = var_db.astype(np.float32)
+        self.seconds = seconds  # Noise audio folded in so far
+        self.band_floor_db: Optional[float] = None  # Speech-band floor of the local speech detector
+        self.last_used = time.monotonic()
+
+
+class NoiseProfileStore:
+    """
+    Per-session cabin-noise profiles (engine, AC and road noise are fairly stable within a trip).
+
+    A profile is seeded from the first clip of a session and then updated with an exponential
+    moving average from the non-speech frames of every later clip - /assistant/interact uploads
+    (noise reduction, including clean clips for which the SNR gate skips it) and
+    /assistant/detect-speech chunks. It holds:
+      - the per-bin dB mean / variance of the noise spectrum at the NR STFT geometry, used as the
+        stationary gate's noise profile instead of estimating one from each (possibly short) clip;
+      - the 300-3400 Hz band noise floor of the local speech detector.
+
+    The EMA weight is time based: NOISE_PROFILE_EMA_ALPHA is the weight of one second of new noise,
+    so frequent short chunks move the profile as much as one long clip. A profile is used once it
+    has seen NOISE_PROFILE_MIN_SECONDS of noise. Sessions idle for NOISE_PROFILE_TTL_SEC are dropped;
+    beyond NOISE_PROFILE_MAX_SESSIONS the least recently used are evicted.
+    """
+
+    def __init__(self, settings: Settings):
+        self.enabled = settings.NOISE_PROFILE_ENABLED
+        self.alpha = min(1.0, max(0.0, settings.NOISE_PROFILE_EMA_ALPHA))
+        self.min_seconds = settings.NOISE_PROFILE_MIN_SECONDS
+        self.ttl_sec = settings.NOISE_PROFILE_TTL_SEC
+        self.max_sessions = max(1, settings.NOISE_PROFILE_MAX_SESSIONS)
+        self._sessions: "OrderedDict[str, _SessionNoise]" = OrderedDict()  # Least recently used first
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        while self._sessions:
+            session_id, entry = next(iter(self._sessions.items()))
+            if now - entry.last_used <= self.ttl_sec:
+                break
+            del self._sessions[session_id]
+            metrics.inc("noise_profile_evictions_total", reason="ttl")
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            metrics.inc("noise_profile_evictions_total", reason="capacity")
+
+    def _get(self, session_id: Optional[str]) -> Optional[_SessionNoise]:
+        if not self.enabled or not session_id:
+            return None
+        self._expire(time.monotonic())
+        return self._sessions.get(session_id)
+
+    def _weight(self, seconds: float) -> float:
+        """EMA weight of `seconds` of new noise: 1 - (1 - alpha) ** seconds."""
+        return 1.0 - (1.0 - self.alpha) ** max(0.0, seconds)
+
+    def profile(self, session_id: Optional[str], sample_rate: int, n_fft: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """(mean_db, std_db) of the session's noise spectrum for the stationary gate, or None if not established."""
+        with self._lock:
+            entry = self._get(session_id)
+            if (entry is None or entry.seconds < self.min_seconds or entry.sample_rate != sample_rate
+                    or len(entry.mean_db) != n_fft // 2 + 1):
+                return None
+            entry.last_used = time.monotonic()
+            return entry.mean_db.copy(), np.sqrt(entry.var_db)
+
+    def band_floor_db(self, session_id: Optional[str]) -> Optional[float]:
+        """The session's speech-band noise floor for the local speech detector, or None if not established."""
+        with self._lock:
+            entry = self._get(session_id)
+            if entry is None or entry.band_floor_db is None or entry.seconds < self.min_seconds:
+                return None
+            return entry.band_floor_db
+
+    def update(self, session_id: Optional[str], sample_rate: int, observation: Optional[NoiseObservation] = None,
+               band_floor_db: Optional[float] = None) -> None:
+        """Folds one clip's noise statistics (and/or the detector's band floor) into the session profile."""
+        if not self.enabled or not session_id or (observation is None and band_floor_db is None):
+            return
+        with self._lock:
+            entry = self._get(session_id)
+            if observation is not None:
+                mean_db, var_db, seconds = observation
+                if entry is None or entry.sample_rate != sample_rate or len(entry.mean_db) != len(mean_db):
+                    # First clip of the session (or another NR geometry): seed the profile
+                    band_floor = entry.band_floor_db if entry is not None else None
+                    entry = self._sessions[session_id] = _SessionNoise(sample_rate, mean_db, var_db, seconds)
+                    entry.band_floor_db = band_floor
+                    metrics.inc("noise_profile_updates_total", kind="seed")
+                else:
+                    # Mean and variance are blended through the second moment, so the variance
+                    # includes the spread between the old and new means
+                    w = self._weight(seconds)
+                    second_moment = (1.0 - w) * (entry.var_db + entry.mean_db ** 2) + w * (var_db + mean_db ** 2)
+                    entry.mean_db = ((1.0 - w) * entry.mean_db + w * mean_db).astype(np.float32)
+                    entry.var_db = np.maximum(second_moment - entry.mean_db ** 2, 0.0).astype(np.float32)
+                    entry.seconds += seconds
+                    metrics.inc("noise_profile_updates_total", kind="ema")
+            if band_floor_db is not None and entry is not None:
+                w = self._weight(observation[2] if observation is not None else 1.0)
+                entry.band_floor_db = (band_floor_db if entry.band_floor_db is None
+                                       else (1.0 - w) * entry.band_floor_db + w * band_floor_db)
+            if entry is not None:
+                entry.last_used = time.monotonic()
+                self._sessions.move_to_end(session_id)
+            metrics.set_gauge("noise_profile_sessions", len(self._sessions))
+
+    def drop(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            metrics.set_gauge("noise_profile_sessions", len(self._sessions))
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "sessions": len(self._sessions),
+                "established": sum(1 for entry in self._sessions.values() if entry.seconds >= self.min_seconds),
+            }
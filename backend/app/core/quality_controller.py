@@ -0,0 +1,132 @@
+# backend/core/quality_controller.py
+import logging
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+import numpy as np
+
+from .config import Settings
+from .metrics import metrics
+from ..models.internal import QualityProfile
+
+logger = logging.getLogger(__name__)
+
+# Quality tiers, from full quality down. Each tier keeps the degradations of the tiers above it.
+TIER_FULL = 0                # Everything on
+TIER_SKIP_REFINEMENT = 1     # Skip the Gemini transcription refinement call
+TIER_CHEAP_NR = 2            # + cheap noise reduction (NOISE_REDUCTION_CHEAP_METHOD; tunable: stationary, single pass)
+TIER_LOW_BITRATE_TTS = 3     # + lower TTS sample rate (smaller, faster audio)
+MAX_TIER = TIER_LOW_BITRATE_TTS
+
+TIER_NAMES = {
+    TIER_FULL: "full",
+    TIER_SKIP_REFINEMENT: "skip_refinement",
+    TIER_CHEAP_NR: "cheap_noise_reduction",
+    TIER_LOW_BITRATE_TTS: "low_bitrate_tts",
+}
+
+# Pipeline stage names recorded by ConversationService
+STAGE_STT = "stt"
+STAGE_REFINE = "refine"
+STAGE_TRANSLATE_IN = "translate_in"
+STAGE_NLU = "nlu"
+STAGE_DISPATCH = "dispatch"
+STAGE_TRANSLATE_OUT = "translate_out"
+STAGE_TTS = "tts"
+STAGE_TOTAL = "total"
+
+
+class QualityController:
+    """
+    Tracks rolling p95 latency per /interact pipeline stage and steps the quality tier down when the
+    end-to-end p95 exceeds QUALITY_TARGET_P95_SEC, and back up once it falls below
+    QUALITY_TARGET_P95_SEC * QUALITY_RECOVERY_RATIO.
+
+    One tier change per QUALITY_COOLDOWN_SEC at most; after a change the end-to-end window is reset
+    so the next decision is based only on requests served at the new tier.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.enabled = settings.QUALITY_CONTROLLER_ENABLED
+        self.target_p95_sec = settings.QUALITY_TARGET_P95_SEC
+        self.recovery_ratio = settings.QUALITY_RECOVERY_RATIO
+        self.min_samples = settings.QUALITY_MIN_SAMPLES
+        self.cooldown_sec = settings.QUALITY_COOLDOWN_SEC
+        self._window = settings.QUALITY_WINDOW
+        self._stages: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._tier = TIER_FULL
+        self._last_change = 0.0
+        metrics.set_gauge("quality_tier", self._tier)
+
+    @property
+    def tier(self) -> int:
+        return self._tier
+
+    def profile(self) -> QualityProfile:
+        """Returns what the current tier means for one request. Read once at the start of a request."""
+        tier = self._tier
+        return QualityProfile(
+            tier=tier,
+            tier_name=TIER_NAMES[tier],
+            skip_refinement=tier >= TIER_SKIP_REFINEMENT,
+            noise_reduction_mode="cheap" if tier >= TIER_CHEAP_NR else "full",
+            tts_sample_rate_hertz=self.settings.QUALITY_LOW_TTS_SAMPLE_RATE_HERTZ if tier >= TIER_LOW_BITRATE_TTS else None,
+        )
+
+    def _p95(self, samples: Deque[float]) -> Optional[float]:
+        if not samples:
+            return None
+        return float(np.percentile(np.fromiter(samples, dtype=np.float64), 95))
+
+    def record_stage(self, stage: str, seconds: float) -> None:
+        metrics.observe("pipeline_stage_seconds", seconds, stage=stage)
+        with self._lock:
+            window = self._stages.get(stage)
+            if window is None:
+                window = self._stages[stage] = deque(maxlen=self._window)
+            window.append(seconds)
+
+    def record_request(self, total_seconds: float, tier: int) -> None:
+        """Records one finished /interact request and re-evaluates the tier."""
+        self.record_stage(STAGE_TOTAL, total_seconds)
+        metrics.inc("interactions_total", tier=TIER_NAMES.get(tier, str(tier)))
+        if self.enabled:
+            self._evaluate()
+
+    def _evaluate(self) -> None:
+        with self._lock:
+            totals = self._stages.get(STAGE_TOTAL)
+            if totals is None or len(totals) < self.min_samples:
+                return
+            now = time.monotonic()
+            if now - self._last_change < self.cooldown_sec:
+                return
+            p95 = self._p95(totals)
+            new_tier = self._tier
+            if p95 > self.target_p95_sec and self._tier < MAX_TIER:
+                new_tier = self._tier + 1
+            elif p95 < self.target_p95_sec * self.recovery_ratio and self._tier > TIER_FULL:
+                new_tier = self._tier - 1
+            if new_tier == self._tier:
+                return
+            direction = "down" if new_tier > self._tier else "up"
+            logger.warning(f"Quality tier {TIER_NAMES[self._tier]} -> {TIER_NAMES[new_tier]} "
+                           f"(end-to-end p95 {p95:.2f}s, target {self.target_p95_sec:.2f}s).")
+            self._tier = new_tier
+            self._last_change = now
+            totals.clear()
+        metrics.set_gauge("quality_tier", new_tier)
+        metrics.inc("quality_tier_changes_total", direction=direction)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "tier": self._tier,
+                "tier_name": TIER_NAMES[self._tier],
+                "target_p95_sec": self.target_p95_sec,
+                "stage_p95_sec": {stage: self._p95(window) for stage, window in self._stages.items()},
+            }
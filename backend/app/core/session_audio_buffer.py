@@ -0,0 +1,248 @@
+# backend/core/session_audio_buffer.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .config import Settings
+from .exception import InvalidRequestError
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+BUFFER_SAMPLE_RATE = 16000  # Stored audio is already at the STT rate (see STT_SAMPLE_RATE_HERTZ)
+RING_INITIAL_SECONDS = 0.5  # A session's ring starts this large and doubles up to SESSION_AUDIO_BUFFER_SECONDS
+
+
+class _SessionRing:
+    """
+    Growable ring of int16 samples. Positions are absolute sample counts on the session timeline;
+    `start` is where this ring joined the timeline (0, or where a dropped session's timeline ended).
+    """
+
+    def __init__(self, initial_size: int, max_capacity: int, start: int = 0):
+        self.samples = np.zeros(min(initial_size, max_capacity), dtype=np.int16)
+        self.max_capacity = max_capacity
+        self.start = start
+        self.written = start  # End of the session timeline
+        self.last_used = time.monotonic()
+
+    @property
+    def capacity(self) -> int:
+        return len(self.samples)
+
+    @property
+    def nbytes(self) -> int:
+        return self.samples.nbytes
+
+    @property
+    def oldest(self) -> int:
+        return max(self.start, self.written - self.capacity)
+
+    def size_for(self, extra: int) -> int:
+        """Ring size needed to also hold `extra` more samples (doubling, capped at max_capacity)."""
+        needed = min(self.written - self.oldest + extra, self.max_capacity)
+        size = self.capacity
+        while size < needed:
+            size *= 2
+        return min(size, self.max_capacity)
+
+    def _write(self, position: int, samples: np.ndarray) -> None:
+        pos = position % self.capacity
+        first = min(len(samples), self.capacity - pos)
+        self.samples[pos:pos + first] = samples[:first]
+        self.samples[:len(samples) - first] = samples[first:]
+
+    def grow(self, size: int) -> None:
+        """Reallocates the ring at `size` samples, keeping the audio held so far at its positions."""
+        if size <= self.capacity:
+            return
+        oldest, held = self.oldest, self.read(self.oldest, self.written)
+        self.samples = np.zeros(size, dtype=np.int16)
+        self._write(oldest, held)
+
+    def append(self, samples: np.ndarray) -> None:
+        if len(samples) >= self.capacity:  # Only the newest `capacity` samples can survive
+            self.written += len(samples) - self.capacity
+            samples = samples[-self.capacity:]
+        self._write(self.written, samples)
+        self.written += len(samples)
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Copies absolute positions [start, end) out of the ring (caller checks the range is still held)."""
+        out = np.empty(end - start, dtype=np.int16)
+        pos = start % self.capacity
+        first = min(len(out), self.capacity - pos)
+        out[:first] = self.samples[pos:pos + first]
+        out[first:] = self.samples[:len(out) - first]
+        return out
+
+
+class SessionAudioBuffer:
+    """
+    Per-session ring buffers of decoded audio (16 kHz mono int16), so audio the client has already
+    sent - /assistant/detect-speech chunks, /assistant/stream frames - can be referenced by
+    /assistant/interact instead of being uploaded again.
+
+    Each session has its own timeline in milliseconds: 0 is the first sample received for the
+    session and every chunk is appended right after the previous one. A session keeps its last
+    SESSION_AUDIO_BUFFER_SECONDS; sessions idle for SESSION_AUDIO_TTL_SEC are dropped, and when
+    the buffers together would exceed SESSION_AUDIO_MAX_MB the least recently used sessions are
+    evicted first. Rings start at RING_INITIAL_SECONDS and grow as audio arrives; memory is the
+    bytes actually allocated.
+
+    A dropped session's timeline end is remembered (up to SESSION_AUDIO_MAX_TOMBSTONES sessions):
+    if the session sends audio again its timeline continues from there, so ranges handed out
+    before the drop are reported as no longer held instead of pointing at newer audio. Sessions
+    pinned by a live /assistant/stream are never dropped (the memory cap is exceeded instead).
+    """
+
+    def __init__(self, settings: Settings):
+        self.sample_rate = BUFFER_SAMPLE_RATE
+        self.capacity = max(1, int(settings.SESSION_AUDIO_BUFFER_SECONDS * self.sample_rate))
+        self.initial_size = max(1, int(RING_INITIAL_SECONDS * self.sample_rate))
+        self.ttl_sec = settings.SESSION_AUDIO_TTL_SEC
+        self.max_bytes = int(settings.SESSION_AUDIO_MAX_MB * 1024 * 1024)
+        self.max_tombstones = max(0, settings.SESSION_AUDIO_MAX_TOMBSTONES)
+        self._sessions: "OrderedDict[str, _SessionRing]" = OrderedDict()  # Least recently used first
+        self._tombstones: "OrderedDict[str, int]" = OrderedDict()  # Dropped session -> timeline end (samples)
+        self._pins: Dict[str, int] = {}  # Session -> live streams writing to it
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _to_ms(self, position: int) -> float:
+        return 1000.0 * position / self.sample_rate
+
+    def _to_position(self, t_ms: float) -> int:
+        return int(round(t_ms * self.sample_rate / 1000.0))
+
+    def _remove(self, session_id: str) -> None:
+        ring = self._sessions.pop(session_id)
+        self._bytes -= ring.nbytes
+        if self.max_tombstones:
+            self._tombstones[session_id] = ring.written
+            self._tombstones.move_to_end(session_id)
+            while len(self._tombstones) > self.max_tombstones:
+                self._tombstones.popitem(last=False)
+
+    def _expire(self, now: float) -> None:
+        for session_id, ring in list(self._sessions.items()):
+            if now - ring.last_used <= self.ttl_sec:
+                break
+            if session_id in self._pins:
+                continue
+            self._remove(session_id)
+            metrics.inc("session_audio_evictions_total", reason="ttl")
+
+    def _make_room(self, needed: int, keep: str) -> None:
+        """Evicts least recently used sessions (not `keep`, not pinned) until `needed` more bytes fit."""
+        for session_id in list(self._sessions):
+            if self._bytes + needed <= self.max_bytes:
+                return
+            if session_id == keep or session_id in self._pins:
+                continue
+            self._remove(session_id)
+            metrics.inc("session_audio_evictions_total", reason="memory")
+            logger.warning(f"Session audio buffer full ({self.max_bytes} bytes): evicted session {session_id}.")
+
+    def _update_gauges(self) -> None:
+        metrics.set_gauge("session_audio_sessions", len(self._sessions))
+        metrics.set_gauge("session_audio_bytes", self._bytes)
+
+    def _timeline_end(self, session_id: str) -> int:
+        ring = self._sessions.get(session_id)
+        return ring.written if ring is not None else self._tombstones.get(session_id, 0)
+
+    def append(self, session_id: str, samples: np.ndarray, sample_rate: int) -> Tuple[float, float]:
+        """Appends int16 samples at BUFFER_SAMPLE_RATE. Returns the (start_ms, end_ms) they occupy on the session timeline."""
+        if sample_rate != self.sample_rate:
+            raise ValueError(f"SessionAudioBuffer stores {self.sample_rate} Hz audio, got {sample_rate} Hz.")
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            ring = self._sessions.get(session_id)
+            if ring is None:
+                self._make_room(min(self.initial_size, self.capacity) * 2, keep=session_id)
+                ring = self._sessions[session_id] = _SessionRing(
+                    self.initial_size, self.capacity, start=self._tombstones.pop(session_id, 0))
+                self._bytes += ring.nbytes
+            else:
+                self._sessions.move_to_end(session_id)
+            size = ring.size_for(len(samples))
+            if size > ring.capacity:
+                self._make_room((size - ring.capacity) * 2, keep=session_id)
+                self._bytes -= ring.nbytes
+                ring.grow(size)
+                self._bytes += ring.nbytes
+            start = ring.written
+            ring.append(samples)
+            ring.last_used = now
+            self._update_gauges()
+            return self._to_ms(start), self._to_ms(ring.written)
+
+    def end_ms(self, session_id: str) -> float:
+        """Current end of the session timeline (where its next audio will start; 0 for a new session)."""
+        with self._lock:
+            return self._to_ms(self._timeline_end(session_id))
+
+    def holds(self, session_id: str) -> bool:
+        """Whether the session currently has buffered audio."""
+        with self._lock:
+            return session_id in self._sessions
+
+    def pin(self, session_id: str) -> None:
+        """Keeps the session from being dropped (TTL or memory) while a live stream writes to it; see unpin."""
+        with self._lock:
+            self._pins[session_id] = self._pins.get(session_id, 0) + 1
+
+    def unpin(self, session_id: str) -> None:
+        with self._lock:
+            count = self._pins.get(session_id, 0) - 1
+            if count > 0:
+                self._pins[session_id] = count
+            else:
+                self._pins.pop(session_id, None)
+
+    def read(self, session_id: str, start_ms: float, end_ms: Optional[float] = None) -> np.ndarray:
+        """
+        Returns a copy of [start_ms, end_ms) of the session's audio (end_ms None = up to the latest sample).
+        Raises InvalidRequestError if the session is unknown/expired or the range is no longer held.
+        """
+        with self._lock:
+            self._expire(time.monotonic())
+            ring = self._sessions.get(session_id)
+            if ring is None:
+                raise InvalidRequestError(f"No buffered audio for session {session_id} (never sent or expired).")
+            start = self._to_position(start_ms)
+            end = ring.written if end_ms is None else min(self._to_position(end_ms), ring.written)
+            if start < 0 or start >= end:
+                raise InvalidRequestError(
+                    f"Invalid buffered audio range {start_ms}-{end_ms} ms; session {session_id} holds "
+                    f"{self._to_ms(ring.oldest):.0f}-{self._to_ms(ring.written):.0f} ms.")
+            if start < ring.oldest:
+                raise InvalidRequestError(
+                    f"Buffered audio from {start_ms} ms is no longer held for session {session_id} "
+                    f"(oldest is {self._to_ms(ring.oldest):.0f} ms); upload the audio instead.")
+            ring.last_used = time.monotonic()
+            self._sessions.move_to_end(session_id)
+            return ring.read(start, end)
+
+    def drop(self, session_id: str) -> None:
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+            self._update_gauges()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "seconds_per_session": self.capacity / self.sample_rate,
+                "pinned_sessions": len(self._pins),
+                "tombstones": len(self._tombstones),
+            }
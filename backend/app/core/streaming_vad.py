@@ -0,0 +1,129 @@
+# backend/core/streaming_vad.py
+import logging
+from typing import List, Optional
+
+import numpy as np
+
+from .audio_enhancement import vad_frame_features, vad_frame_geometry
+from ..models.internal import VadEvent
+
+logger = logging.getLogger(__name__)
+
+EVENT_SPEECH_START = "speech_start"
+EVENT_SPEECH_END = "speech_end"
+
+# Noise-floor tracker: falls quickly towards quieter frames, rises slowly (dB per second) so a
+# louder cabin (window opened, higher speed) is followed without speech pulling the floor up.
+NOISE_FLOOR_FALL = 0.2
+NOISE_FLOOR_RISE_DB_PER_SEC = 0.5
+
+
+class StreamingVad:
+    """
+    Incremental version of detect_speech_activity for a continuous int16 stream.
+
+    Frames use the same features as the chunk detector, but the noise floor is tracked over time
+    instead of taken from a chunk percentile, and decisions have hysteresis:
+      - `speech_start` after `onset_ms` of consecutive speech frames (timestamped at the first one),
+      - `speech_end` after `hangover_ms` of consecutive non-speech frames (timestamped at the last
+        speech frame), so short pauses between words do not end the utterance.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        energy_floor_dbfs: float = -50.0,
+        snr_margin_db: float = 6.0,
+        max_flatness: float = 0.5,
+        min_speech_band_ratio: float = 0.2,
+        onset_ms: float = 150.0,
+        hangover_ms: float = 700.0,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_length, self.hop_length = vad_frame_geometry(sample_rate)
+        self.energy_floor_dbfs = energy_floor_dbfs
+        self.snr_margin_db = snr_margin_db
+        self.max_flatness = max_flatness
+        self.min_speech_band_ratio = min_speech_band_ratio
+        self.frame_ms = 1000.0 * self.hop_length / sample_rate
+        self.onset_frames = max(1, int(round(onset_ms / self.frame_ms)))
+        self.hangover_frames = max(1, int(round(hangover_ms / self.frame_ms)))
+        self._rise_per_frame = NOISE_FLOOR_RISE_DB_PER_SEC * self.frame_ms / 1000.0
+
+        self._pending = np.zeros(self.frame_length // 2, dtype=np.float32)  # Centre the first frame like the chunk VAD
+        self._frame_index = 0
+        self._noise_floor: Optional[float] = None
+        self.in_speech = False
+        self._run = 0  # Consecutive frames contradicting the current state
+        self._speech_started_at = 0
+        self._last_speech_frame = 0
+
+    def _t_ms(self, frame_index: int) -> float:
+        return frame_index * self.frame_ms
+
+    def feed(self, samples: np.ndarray) -> List[VadEvent]:
+        """Processes int16 samples at `sample_rate`. Returns the events they completed (usually none)."""
+        if len(samples) == 0:
+            return []
+        audio = samples.astype(np.float32)
+        audio *= np.float32(1.0 / np.iinfo(np.int16).max)
+        buffer = np.concatenate((self._pending, audio))
+        n_frames = 0 if len(buffer) < self.frame_length else 1 + (len(buffer) - self.frame_length) // self.hop_length
+        if n_frames == 0:
+            self._pending = buffer
+            return []
+
+        frames = np.lib.stride_tricks.sliding_window_view(buffer, self.frame_length)[::self.hop_length][:n_frames]
+        frame_dbfs, band_db, flatness, band_ratio = vad_frame_features(frames, self.sample_rate)
+        self._pending = buffer[n_frames * self.hop_length:]
+
+        events: List[VadEvent] = []
+        for i in range(n_frames):
+            events.extend(self._step(frame_dbfs[i], band_db[i], flatness[i], band_ratio[i]))
+        return events
+
+    def _step(self, frame_dbfs: float, band_db: float, flatness: float, band_ratio: float) -> List[VadEvent]:
+        index = self._frame_index
+        self._frame_index += 1
+        if self._noise_floor is None:
+            self._noise_floor = band_db
+        is_speech = (frame_dbfs > self.energy_floor_dbfs
+                     and band_db > self._noise_floor + self.snr_margin_db
+                     and flatness < self.max_flatness
+                     and band_ratio > self.min_speech_band_ratio)
+        if band_db < self._noise_floor:
+            self._noise_floor += NOISE_FLOOR_FALL * (band_db - self._noise_floor)
+        else:
+            self._noise_floor = min(band_db, self._noise_floor + self._rise_per_frame)
+
+        if is_speech:
+            self._last_speech_frame = index
+        if is_speech != self.in_speech:
+            self._run += 1
+        else:
+            self._run = 0
+
+        if not self.in_speech and self._run >= self.onset_frames:
+            self.in_speech, self._run = True, 0
+            self._speech_started_at = index - self.onset_frames + 1
+            return [VadEvent(type=EVENT_SPEECH_START, t_ms=self._t_ms(self._speech_started_at))]
+        if self.in_speech and self._run >= self.hangover_frames:
+            self.in_speech, self._run = False, 0
+            return [self._speech_end_event()]
+        return []
+
+    def _speech_end_event(self) -> VadEvent:
+        end = self._last_speech_frame + 1
+        return VadEvent(type=EVENT_SPEECH_END, t_ms=self._t_ms(end),
+                        speech_ms=self._t_ms(end - self._speech_started_at))
+
+    def flush(self) -> List[VadEvent]:
+        """Ends the stream: closes an utterance that is still open."""
+        if self.in_speech:
+            self.in_speech, self._run = False, 0
+            return [self._speech_end_event()]
+        return []
+
+    @property
+    def stream_ms(self) -> float:
+        return self._t_ms(self._frame_index)
@@ -2,6 +2,7 @@ import os
 import json
 import logging
 import sys
+import asyncio
 import httpx # <--- Import httpx
 from contextlib import asynccontextmanager # <--- Import asynccontextmanager
 from fastapi import FastAPI, Request, status, Depends
@@ -14,6 +15,15 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+from app.core.config import settings
+from app.core.model_registry import ModelRegistry, STATUS_DISABLED
+from app.api.container import ServiceContainer
+from app.core.executors import (
+    configure_executors, shutdown_executors, executor_stats, run_blocking, POOL_BLOCKING_IO
+)
+from app.core.metrics import metrics
+from app.core.admission import AdmissionControlMiddleware
+
 # --- Configure Logging ---
 logging.basicConfig(
     level=logging.DEBUG,  # Change to DEBUG to see more details
@@ -38,10 +48,40 @@ async def lifespan(app: FastAPI):
     app.state.http_client = http_client # Store client in app state
     logger.info("Shared httpx.AsyncClient created and stored in app.state.")
 
+    # Named executor pools (voice_io, blocking_io, vision, dsp) replace the shared default pool
+    configure_executors(settings)
+
+    # Vision models are loaded once per process and warmed up in the background.
+    # The /ready probe reports "models warm" only once this has finished.
+    model_registry = ModelRegistry(settings)
+    app.state.model_registry = model_registry
+    model_load_task = None
+    if model_registry.status != STATUS_DISABLED:
+        model_load_task = asyncio.create_task(model_registry.load_async())
+        logger.info("Model registry warm-up scheduled in the background.")
+
+    # Clients and services are built once here and shared by every request (see api/container.py)
+    container = ServiceContainer(settings, model_registry=model_registry)
+    app.state.container = container
+
+    # Heavy libraries (DSP, Maps legacy, OpenAI, ...) are imported lazily (see core/lazy_imports.py).
+    # Warm them up in the background so the first requests do not pay for the imports.
+    warmup_task = None
+    if settings.STARTUP_BACKGROUND_WARMUP:
+        warmup_task = asyncio.create_task(run_blocking(POOL_BLOCKING_IO, container.warm_up))
+        logger.info("Background warm-up of lazily imported subsystems scheduled.")
+
     yield # Application runs here
 
     # Code to run on shutdown
     logger.info("Application shutting down - closing resources...")
+    for task in (model_load_task, warmup_task):
+        if task is not None and not task.done():
+            await task # Loading runs in a worker thread and cannot be interrupted; let it finish
+    model_registry.close()
+    logger.info("Model registry closed.")
+    container.close()
+    shutdown_executors()
     await app.state.http_client.aclose()
     logger.info("Shared httpx.AsyncClient closed.")
     logger.info("Shutdown complete.")
@@ -61,6 +101,10 @@ app = FastAPI(
     lifespan=lifespan # <--- ADD LIFESPAN HERE
 )
 
+# --- Admission Control (per-route concurrency limits + bounded queues, 503 when full) ---
+# Added before CORS so that CORS stays the outermost middleware and 503s carry CORS headers.
+app.add_middleware(AdmissionControlMiddleware, settings=settings)
+
 # --- CORS Middleware ---
 origins = [
     "http://localhost",      # Allow localhost (common for dev)
@@ -164,10 +208,12 @@ try:
     from app.api.assistant import router as assistant_router
     from app.api.safety import router as safety_router
     from app.api.navigation import router as navigation_router
+    from app.api.streaming import router as streaming_router
 
     app.include_router(assistant_router)
     app.include_router(safety_router)
     app.include_router(navigation_router)
+    app.include_router(streaming_router)
     logger.info("API routers included successfully.")
 except ImportError as import_err:
      logger.critical(f"Failed to import API routers: {import_err}. Check module paths and dependencies.", exc_info=True)
@@ -219,11 +265,13 @@ async def root(request: Request):
     """Provides basic health status including Google Cloud and HTTP client state."""
     gcloud_status = "Configured successfully" if gcloud_setup_success else "Configuration failed"
     http_client_status = "Initialized" if hasattr(request.app.state, 'http_client') and request.app.state.http_client else "Not Initialized"
+    model_registry = getattr(request.app.state, 'model_registry', None)
     return {
         "message": "Voice-Driven Driver Assistant Backend is running!",
         "status": "OK",
         "google_cloud_status": gcloud_status,
         "shared_http_client_status": http_client_status, # Reflect lifespan state
+        "model_registry_status": model_registry.status if model_registry else "Not Initialized",
         "environment": {
             "cwd": os.getcwd(),
             "google_credentials_env_set": "GOOGLE_APPLICATION_CREDENTIALS" in os.environ,
@@ -231,6 +279,32 @@ async def root(request: Request):
         }
     }
 
+# --- Readiness Endpoint ---
+@app.get("/ready", tags=["Health Check"], summary="Readiness probe for the load balancer")
+async def readiness(request: Request):
+    """Returns 200 only once the vision models are loaded and warmed up (or the feature is disabled)."""
+    registry = getattr(request.app.state, "model_registry", None)
+    if registry is None:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "starting", "model_registry": None},
+        )
+    content = {
+        "status": "models warm" if registry.is_warm else registry.status,
+        "model_registry": registry.stats(),
+    }
+    if not registry.is_ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=content)
+    return content
+
+# --- Metrics Endpoint ---
+@app.get("/metrics", tags=["Health Check"], summary="In-process metrics for this worker")
+async def get_metrics(request: Request):
+    """Returns this worker's counters, gauges and latency histograms, plus executor pool, quality tier and audio buffer state."""
+    container = request.app.state.container
+    return {**metrics.snapshot(), "executors": executor_stats(), "quality": container.quality_controller.stats(),
+            "session_audio": container.session_audio_buffer.stats(), "noise_profiles": container.noise_profiles.stats()}
+
 # --- Run with Uvicorn (Example) ---
 # This part is usually run from the command line like: uvicorn main:app --reload
 # if __name__ == "__main__":
@@ -32,10 +32,16 @@ class ChatMessage(BaseModel):
     # Store original user input and final assistant output for history context
     content: str = Field(..., description="The text content of the message")
 
+class LanguageProfile(BaseModel):
+    """Languages a session's driver has spoken, used to narrow STT language detection."""
+    weights: Dict[str, float] = Field(default_factory=dict, description="Decayed count of detections per BCP-47 code")
+    observations: int = Field(0, description="Number of detections recorded")
+
 class ChatHistory(BaseModel):
     """Represents the conversation history for a session."""
     session_id: str = Field(..., description="Unique identifier for the conversation session")
     messages: List[ChatMessage] = Field(default_factory=list, description="List of messages in chronological order")
+    language_profile: LanguageProfile = Field(default_factory=LanguageProfile, description="Languages detected in this session")
 
 # --- Navigation Related ---
 
@@ -79,6 +85,79 @@ class OrderContext(BaseModel):
     passenger_pickup_place_id: Optional[str] = None # Add place_id if available
     passenger_phone_number: Optional[str] = None
 
+# --- Audio Processing ---
+class AudioProcessingOptions(BaseModel):
+    """Parameters of the CPU-bound DSP stage (int16 -> float32 -> noise reduction -> int16)."""
+    noise_reduction: bool = Field(True, description="Whether to run noise reduction at all.")
+    method: str = Field("tunable_nr", description="'tunable_nr' (spectral gating) or 'wiener'.")
+    stationary: bool = Field(False, description="Cheap stationary NR instead of non-stationary (used under load).")
+    prop_decrease: float = Field(0.9, description="NR strength (0.0-1.0).")
+    time_smooth_ms: float = Field(150.0, description="Temporal smoothing of the NR mask (ms).")
+    n_passes: int = Field(1, description="Number of noise reduction passes.")
+    snr_gating: bool = Field(False, description="Skip NR / scale its strength by the estimated input SNR.")
+    snr_bypass_db: float = Field(25.0, description="Estimated SNR at or above which NR is skipped.")
+    snr_full_strength_db: float = Field(5.0, description="Estimated SNR at or below which NR runs at full strength.")
+    min_prop_decrease: float = Field(0.5, description="NR strength just below the bypass threshold.")
+    shared_stft: bool = Field(True, description="One STFT for VAD, noise estimate and all passes (False = noisereduce per pass).")
+
+class AudioProcessingReport(BaseModel):
+    """What the DSP stage did with one upload (returned from the DSP worker)."""
+    num_samples: int
+    sample_rate: int
+    noise_reduction_applied: bool = False
+    dsp_seconds: float = Field(0.0, description="Time spent inside the DSP stage itself.")
+    executed_in: str = Field("inline", description="'process_pool', 'thread_pool' or 'inline'.")
+    noise_profile_used: bool = Field(False, description="Gated against the session's noise profile instead of an estimate from the clip.")
+    noise_observation: Optional[Any] = Field(None, description="(mean_db, var_db, noise_seconds) of the clip's non-speech frames, for NoiseProfileStore.update.")
+    input_snr_db: Optional[float] = Field(None, description="Estimated input SNR (None without SNR gating or for very short clips).")
+    nr_decision: Optional[str] = Field(None, description="'bypass', 'scaled' or 'full' (None when NR is disabled).")
+    nr_prop_decrease: Optional[float] = Field(None, description="NR strength actually used.")
+    nr_passes: Optional[int] = Field(None, description="NR passes actually used.")
+
+class SpeechActivityResult(BaseModel):
+    """Outcome of the local speech-activity detector (core/audio_enhancement.detect_speech_activity)."""
+    speech_detected: bool
+    speech_ratio: float = Field(0.0, description="Fraction of frames classified as speech.")
+    longest_speech_ms: float = 0.0
+    noise_floor_dbfs: float = Field(-120.0, description="10th percentile of frame energies.")
+    peak_dbfs: float = -120.0
+    band_noise_floor_db: Optional[float] = Field(None, description="10th percentile of the chunk's 300-3400 Hz band levels.")
+    detector: str = Field("local", description="'local' or 'stt' (local result verified with cloud STT).")
+    buffered_start_ms: Optional[float] = Field(None, description="Where the chunk was stored in the session audio buffer.")
+    buffered_end_ms: Optional[float] = None
+
+class SttStreamResult(BaseModel):
+    """One interim or final result from streaming recognition (GoogleSttClient.streaming_transcribe)."""
+    transcript: str
+    is_final: bool = False
+    language_code: Optional[str] = None
+    stability: float = Field(0.0, description="Interim results only: likelihood the hypothesis will not change.")
+    confidence: Optional[float] = None
+    input_closed_ms: Optional[float] = Field(None, description="Time since the audio input was closed (end of speech), if it was.")
+
+class StreamedUtterance(BaseModel):
+    """A finished utterance from /assistant/stream: its range in the session audio buffer and, if streaming STT ran, its transcript."""
+    start_ms: float
+    end_ms: float
+    transcript: Optional[str] = None
+    language_code: Optional[str] = None
+
+class VadEvent(BaseModel):
+    """Event pushed to the client on the /assistant/stream WebSocket (core/streaming_vad.py)."""
+    type: str = Field(..., description="'speech_start' or 'speech_end'.")
+    t_ms: float = Field(..., description="Stream time of the event: first speech frame / end of the last speech frame.")
+    speech_ms: Optional[float] = Field(None, description="speech_end only: length of the utterance.")
+    audio_ready: bool = Field(False, description="speech_end only: the utterance is stored for /assistant/interact.")
+
+# --- Quality Tiers (see core/quality_controller.py) ---
+class QualityProfile(BaseModel):
+    """Which optional pipeline stages one /interact request runs, decided by the quality controller."""
+    tier: int = 0
+    tier_name: str = "full"
+    skip_refinement: bool = False
+    noise_reduction_mode: str = Field("full", description="'full' or 'cheap'.")
+    tts_sample_rate_hertz: Optional[int] = Field(None, description="Lower TTS sample rate under load; None = API default.")
+
 # --- Safety Related ---
 class SleepinessReport(BaseModel):
     """Information related to sleepiness detection."""
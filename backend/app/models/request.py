@@ -11,6 +11,9 @@ class ProcessAudioRequest(BaseModel):
     """Internal representation of the data from the /interact endpoint form."""
     session_id: str
     audio_data: bytes # Raw audio bytes after reading UploadFile
+    audio_content_type: Optional[str] = None # Upload content type, e.g. 'audio/L16; rate=16000' for raw PCM16
+    transcript: Optional[str] = None # Already transcribed by streaming STT (/assistant/stream); skips batch STT
+    transcript_language: Optional[str] = None # BCP-47 language detected by streaming STT
     language_code_hint: Optional[str] = None # Optional hint from form
     current_location: Optional[Tuple[float, float]] = None # Parsed from form
     order_context: Optional[OrderContext] = None # Parsed from form
@@ -38,6 +41,7 @@ class DetectSpeechRequest(BaseModel):
     """Request body for the /assistant/detect-speech endpoint."""
     session_id: Optional[str] = None # Optional session tracking
     audio_data: str = Field(..., description="Base64 encoded string of the short audio chunk.")
+    content_type: Optional[str] = Field(None, description="Audio content type. 'audio/L16; rate=16000' (raw PCM16) skips decoding.")
 
 # --- Safety Endpoint Request ---
 class CrashDetectionRequest(BaseModel):
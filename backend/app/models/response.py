@@ -14,6 +14,7 @@ class AssistantResponse(BaseModel):
     detected_input_language: Optional[str] = Field(None, description="BCP-47 language code detected from the user's input audio")
     # Optional field to send structured data back to the frontend if needed
     action_result: Optional[Any] = Field(None, description="Structured result of the action performed (e.g., RouteInfo).")
+    quality_tier: int = Field(0, description="Quality tier the request was served at (0 = full quality; higher = optional stages degraded under load).")
 
     class Config:
         arbitrary_types_allowed = True
@@ -22,6 +23,9 @@ class AssistantResponse(BaseModel):
 class DetectSpeechResponse(BaseModel):
     """Response model for the /assistant/detect-speech endpoint."""
     speech_detected: bool = Field(..., description="True if speech was detected in the provided audio chunk, False otherwise.")
+    detector: str = Field("local", description="'local' (on-server VAD) or 'stt' (local result verified with cloud STT).")
+    buffered_start_ms: Optional[float] = Field(None, description="Start of this chunk in the session audio buffer (only when session_id was sent). Pass to /assistant/interact as audio_start_ms.")
+    buffered_end_ms: Optional[float] = Field(None, description="End of this chunk in the session audio buffer.")
 
 class SafetyResponse(BaseModel):
     """Generic response model for safety endpoints."""
@@ -0,0 +1,217 @@
+# backend/services/audio_stream_service.py
+import asyncio
+import logging
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.audio_decoding import StreamDecoder
+from ..core.audio_enhancement import StreamResampler
+from ..core.config import Settings
+from ..core.exception import InvalidRequestError
+from ..core.executors import run_blocking, POOL_DSP
+from ..core.metrics import metrics
+from ..core.session_audio_buffer import SessionAudioBuffer, BUFFER_SAMPLE_RATE
+from ..core.streaming_vad import StreamingVad, EVENT_SPEECH_START, EVENT_SPEECH_END
+from ..models.internal import VadEvent, SttStreamResult, StreamedUtterance
+from .transcription_service import TranscriptionService
+
+logger = logging.getLogger(__name__)
+
+TranscriptCallback = Callable[[SttStreamResult], Awaitable[None]]
+
+
+class AudioStream:
+    """One live WebSocket stream: decoder, incremental VAD, streaming STT state and where its audio sits in the session buffer."""
+
+    def __init__(self, session_id: str, decoder: StreamDecoder, vad: StreamingVad, origin_ms: float,
+                 on_transcript: Optional[TranscriptCallback] = None, language_code_hint: Optional[str] = None,
+                 candidate_languages: Optional[List[str]] = None):
+        self.session_id = session_id
+        self.decoder = decoder
+        self.vad = vad
+        self.resampler = StreamResampler(decoder.sample_rate, BUFFER_SAMPLE_RATE)
+        self.origin_ms = origin_ms  # Session-timeline position of stream time 0
+        self.segment_start_ms = origin_ms  # Session-timeline start of the utterance being received
+        self.on_transcript = on_transcript  # Set when the client asked for streaming transcription
+        self.language_code_hint = language_code_hint
+        self.candidate_languages = candidate_languages  # Session's likely languages (None = all supported)
+        self.stt_queue: Optional[asyncio.Queue] = None  # Audio for the running recognition (None = closes it)
+        self.stt_task: Optional[asyncio.Task] = None
+        self.lock = threading.Lock()
+        self.closed = False
+
+
+class AudioStreamService:
+    """
+    Server side of the /assistant/stream WebSocket.
+
+    Decodes the incoming frames to 16 kHz, runs StreamingVad on them and appends them to the
+    SessionAudioBuffer. When an utterance ends, its range on the session timeline is remembered,
+    so /assistant/interact can use it (use_streamed_audio) instead of the client re-uploading the
+    recording.
+
+    With streaming transcription on, a recognition call is opened at each speech_start (with
+    STT_STREAMING_PREROLL_MS of buffered audio before it), fed every following frame and closed at
+    speech_end, so the final transcript is ready moments after the driver stops talking and is
+    handed to /interact together with the audio.
+    """
+
+    def __init__(self, settings: Settings, audio_buffer: SessionAudioBuffer,
+                 transcription_service: Optional[TranscriptionService] = None):
+        self.settings = settings
+        self.audio_buffer = audio_buffer
+        self.transcription_service = transcription_service
+        self._streams: Dict[str, AudioStream] = {}
+        # session_id -> (utterance, recognition task still producing its transcript)
+        self._utterances: Dict[str, Tuple[StreamedUtterance, Optional[asyncio.Task]]] = {}
+        self._lock = threading.Lock()
+        logger.debug("AudioStreamService initialized.")
+
+    @property
+    def transcription_available(self) -> bool:
+        return self.transcription_service is not None
+
+    def open(self, session_id: str, encoding: str, sample_rate: int, channels: int = 1,
+             on_transcript: Optional[TranscriptCallback] = None, language_code_hint: Optional[str] = None,
+             candidate_languages: Optional[List[str]] = None) -> AudioStream:
+        """
+        Starts a stream for the session (replacing any previous one). Pass `on_transcript` to run
+        streaming transcription; it receives interim and final results, recognised among
+        `candidate_languages` if given. Raises InvalidRequestError.
+        """
+        if on_transcript is not None and not self.transcription_available:
+            raise InvalidRequestError("Streaming transcription is not available (TranscriptionService not initialized).")
+        decoder = StreamDecoder(encoding, sample_rate, channels)
+        s = self.settings
+        vad = StreamingVad(
+            BUFFER_SAMPLE_RATE,
+            energy_floor_dbfs=s.VAD_ENERGY_FLOOR_DBFS,
+            snr_margin_db=s.VAD_SNR_MARGIN_DB,
+            max_flatness=s.VAD_MAX_SPECTRAL_FLATNESS,
+            min_speech_band_ratio=s.VAD_MIN_SPEECH_BAND_RATIO,
+            onset_ms=s.VAD_MIN_SPEECH_MS,
+            hangover_ms=s.VAD_HANGOVER_MS,
+        )
+        stream = AudioStream(session_id, decoder, vad, origin_ms=self.audio_buffer.end_ms(session_id),
+                             on_transcript=on_transcript, language_code_hint=language_code_hint,
+                             candidate_languages=candidate_languages)
+        self.audio_buffer.pin(session_id)  # Not evicted while this stream writes to it (released in close)
+        with self._lock:
+            self._streams[session_id] = stream
+            metrics.set_gauge("audio_streams_active", len(self._streams))
+        logger.info(f"Audio stream opened for session {session_id} ({encoding}, {sample_rate} Hz, {channels} ch, "
+                    f"transcription: {on_transcript is not None}).")
+        return stream
+
+    def _process(self, stream: AudioStream, data: bytes) -> Tuple[List[VadEvent], np.ndarray]:
+        """Decode -> 16 kHz -> session buffer -> VAD. Blocking; returns the VAD events and the new 16 kHz samples."""
+        with stream.lock:
+            samples = stream.decoder.decode(data)
+            if len(samples) > 0:
+                samples = stream.resampler.process(samples)
+            if len(samples) == 0:
+                return [], samples
+            self.audio_buffer.append(stream.session_id, samples, BUFFER_SAMPLE_RATE)
+            return stream.vad.feed(samples), samples
+
+    def _handle_events(self, stream: AudioStream, events: List[VadEvent]) -> List[VadEvent]:
+        for event in events:
+            metrics.inc("audio_stream_events_total", type=event.type)
+            if event.type == EVENT_SPEECH_START and stream.on_transcript is not None:
+                self._start_transcription(stream, event)
+            elif event.type == EVENT_SPEECH_END:
+                self._store_utterance(stream, self._finish_transcription(stream))
+                event.audio_ready = True
+        return events
+
+    def _start_transcription(self, stream: AudioStream, event: VadEvent) -> None:
+        # Audio from just before the detected onset up to now is already buffered; later frames are queued by feed()
+        start_ms = max(stream.segment_start_ms, stream.origin_ms + event.t_ms - self.settings.STT_STREAMING_PREROLL_MS)
+        try:
+            preroll = self.audio_buffer.read(stream.session_id, start_ms)
+        except InvalidRequestError as e:
+            logger.warning(f"Cannot start streaming STT for session {stream.session_id}: {e.message}")
+            return
+        queue: asyncio.Queue = asyncio.Queue()
+        queue.put_nowait(preroll.tobytes())
+
+        async def audio_chunks():
+            while (chunk := await queue.get()) is not None:
+                yield chunk
+
+        stream.stt_queue = queue
+        stream.stt_task = asyncio.create_task(self.transcription_service.process_audio_stream(
+            audio_chunks(), BUFFER_SAMPLE_RATE, stream.language_code_hint, on_result=stream.on_transcript,
+            candidate_languages=stream.candidate_languages))
+        stream.stt_task.add_done_callback(self._log_transcription_failure)
+
+    def _finish_transcription(self, stream: AudioStream) -> Optional[asyncio.Task]:
+        """Closes the recognition input (end of speech). Returns the task that will produce the final transcript."""
+        task = stream.stt_task
+        if stream.stt_queue is not None:
+            stream.stt_queue.put_nowait(None)
+        stream.stt_queue, stream.stt_task = None, None
+        return task
+
+    @staticmethod
+    def _log_transcription_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Streaming transcription failed: {task.exception()}")
+
+    def _store_utterance(self, stream: AudioStream, stt_task: Optional[asyncio.Task]) -> None:
+        # Everything since the previous utterance; leading/trailing silence is trimmed before batch STT
+        end_ms = self.audio_buffer.end_ms(stream.session_id)
+        with self._lock:
+            for sid in [sid for sid in self._utterances if not self.audio_buffer.holds(sid)]:
+                del self._utterances[sid]  # Session audio expired from the buffer
+            self._utterances[stream.session_id] = (StreamedUtterance(start_ms=stream.segment_start_ms, end_ms=end_ms), stt_task)
+        logger.info(f"Streamed utterance for session {stream.session_id}: "
+                    f"{(end_ms - stream.segment_start_ms) / 1000:.2f}s of buffered audio.")
+        stream.segment_start_ms = end_ms
+
+    async def feed(self, stream: AudioStream, data: bytes) -> List[VadEvent]:
+        """Decodes one binary message and runs the VAD on it (in the 'dsp' pool). Returns new events."""
+        events, samples = await run_blocking(POOL_DSP, self._process, stream, data)
+        if stream.stt_queue is not None and len(samples) > 0:
+            stream.stt_queue.put_nowait(samples.tobytes())
+        return self._handle_events(stream, events)
+
+    def close(self, stream: AudioStream) -> List[VadEvent]:
+        """Ends the stream. An utterance still in progress is ended and stored."""
+        with stream.lock:
+            if stream.closed:
+                return []
+            stream.closed = True
+            events = stream.vad.flush()
+        events = self._handle_events(stream, events)
+        self.audio_buffer.unpin(stream.session_id)
+        with self._lock:
+            if self._streams.get(stream.session_id) is stream:
+                del self._streams[stream.session_id]
+            metrics.set_gauge("audio_streams_active", len(self._streams))
+        logger.info(f"Audio stream closed for session {stream.session_id} after {stream.vad.stream_ms / 1000:.1f}s.")
+        return events
+
+    async def take_utterance(self, session_id: str) -> Optional[StreamedUtterance]:
+        """
+        Removes and returns the session's last finished utterance. If streaming transcription ran,
+        waits (up to STT_STREAMING_FINAL_TIMEOUT_SEC) for its final transcript; on timeout or error
+        the utterance is returned without one and the caller transcribes the audio in batch mode.
+        """
+        with self._lock:
+            entry = self._utterances.pop(session_id, None)
+        if entry is None:
+            return None
+        utterance, stt_task = entry
+        if stt_task is not None:
+            try:
+                utterance.transcript, utterance.language_code = await asyncio.wait_for(
+                    asyncio.shield(stt_task), timeout=self.settings.STT_STREAMING_FINAL_TIMEOUT_SEC)
+            except asyncio.TimeoutError:
+                logger.warning(f"Streaming transcript for session {session_id} not final after "
+                               f"{self.settings.STT_STREAMING_FINAL_TIMEOUT_SEC}s; using batch STT.")
+            except Exception as e:  # TranscriptionError, InvalidRequestError or a transport error
+                logger.warning(f"Streaming transcription failed for session {session_id} ({e}); using batch STT.")
+        return utterance
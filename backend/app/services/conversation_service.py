@@ -1,10 +1,10 @@
 # backend/services/conversation_service.py
 import logging
 from datetime import datetime
-from typing import Dict, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any
 import asyncio
 
-from ..models.internal import ChatHistory, ChatMessage, NluIntent, NluResult, RouteInfo, OrderContext
+from ..models.internal import ChatHistory, ChatMessage, NluIntent, NluResult, RouteInfo, OrderContext, QualityProfile
 from ..models.request import ProcessAudioRequest
 from ..models.response import AssistantResponse
 from ..services.transcription_service import TranscriptionService
@@ -16,6 +16,11 @@ from ..services.safety_service import SafetyService # Import SafetyService
 # Potentially add a CommunicationService later for sending messages
 # from services.communication_service import CommunicationService
 from ..core.config import Settings
+from ..core.language_profile import likely_languages, record_language
+from ..core.quality_controller import (
+    QualityController, STAGE_STT, STAGE_REFINE, STAGE_TRANSLATE_IN, STAGE_NLU,
+    STAGE_DISPATCH, STAGE_TRANSLATE_OUT, STAGE_TTS
+)
 from ..core.exception import (
     AssistantBaseException, InvalidRequestError, TranscriptionError,
     NluError, TranslationError, SynthesisError, NavigationError, StateError,
@@ -40,7 +45,8 @@ class ConversationService:
         navigation_service: NavigationService,
         safety_service: SafetyService, # Add SafetyService
         # communication_service: CommunicationService, # Add later
-        settings: Settings
+        settings: Settings,
+        quality_controller: Optional[QualityController] = None # None = always full quality
     ):
         self.transcription_service = transcription_service
         self.translation_service = translation_service
@@ -50,6 +56,7 @@ class ConversationService:
         self.safety_service = safety_service # Store SafetyService
         # self.communication_service = communication_service
         self.settings = settings
+        self.quality_controller = quality_controller
         self.chat_histories = _chat_histories
         self.nlu_target_language = self.settings.NLU_PROCESSING_LANGUAGE
         logger.debug("ConversationService initialized with all dependent services.")
@@ -63,6 +70,18 @@ class ConversationService:
             self.chat_histories[session_id] = history
         return history
 
+    def language_candidates(self, session_id: str, language_code_hint: Optional[str] = None) -> Optional[List[str]]:
+        """Languages STT should detect for this session, from its language profile (None = all supported)."""
+        history = self.chat_histories.get(session_id)
+        if history is None:
+            return None
+        return likely_languages(history.language_profile, self.settings, language_code_hint)
+
+    def _record_stage(self, stage: str, seconds: float):
+        """Feeds a stage latency to the quality controller (if configured)."""
+        if self.quality_controller is not None:
+            self.quality_controller.record_stage(stage, seconds)
+
     def _update_history(self, session_id: str, user_message: str, assistant_message: str):
         """Adds user and assistant messages to the history, trimming if needed."""
         # This logic remains the same: stores the ORIGINAL user message and FINAL assistant response
@@ -299,21 +318,49 @@ class ConversationService:
         """
         Handles the full interaction flow: STT -> Refine -> Translate -> NLU -> Dispatch -> Translate Back -> TTS.
         """
-        session_id = request.session_id
         start_time = datetime.now()
-        logger.info(f"Processing interaction for session_id: {session_id}")
+        # Which optional stages run for this request (decided once, up front, by the quality controller)
+        quality = self.quality_controller.profile() if self.quality_controller else QualityProfile()
+        logger.info(f"Processing interaction for session_id: {request.session_id} (quality tier: {quality.tier_name})")
+        try:
+            return await self._run_interaction(request, quality, start_time)
+        finally:
+            # Every exit counts towards the rolling p95, including the empty-transcript reply,
+            # errors and timeouts (cancellation) - the slowest requests are the ones that matter
+            if self.quality_controller is not None:
+                self.quality_controller.record_request((datetime.now() - start_time).total_seconds(), quality.tier)
+
+    async def _run_interaction(self, request: ProcessAudioRequest, quality: QualityProfile,
+                               start_time: datetime) -> AssistantResponse:
+        """The pipeline of process_interaction (which records its latency on every exit path)."""
+        session_id = request.session_id
 
         # --- 1. Speech-to-Text (Now handles fallback internally) ---
         user_transcription_original = ""
         detected_language_bcp47 = None # This will now be populated even after fallback (if detection succeeds)
         try:
             stt_start = datetime.now()
-            # Call the updated service method
-            user_transcription_original, detected_language_bcp47 = await self.transcription_service.process_audio(
-                audio_data=request.audio_data,
-                language_code_hint=request.language_code_hint
-            )
+            if request.transcript:
+                # Transcribed by streaming STT while the driver was talking (/assistant/stream)
+                user_transcription_original = request.transcript
+                detected_language_bcp47 = request.transcript_language or request.language_code_hint
+                logger.info("Using the streamed transcript; skipping batch STT.")
+            else:
+                # Call the updated service method
+                user_transcription_original, detected_language_bcp47 = await self.transcription_service.process_audio(
+                    audio_data=request.audio_data,
+                    language_code_hint=request.language_code_hint,
+                    noise_reduction_mode=quality.noise_reduction_mode,
+                    content_type=request.audio_content_type,
+                    candidate_languages=self.language_candidates(session_id, request.language_code_hint),
+                    session_id=session_id
+                )
+            if user_transcription_original:
+                # Only detections count (not the hint), so the profile reflects what the driver speaks
+                detected = request.transcript_language if request.transcript else detected_language_bcp47
+                record_language(self._get_or_create_history(session_id).language_profile, detected, self.settings)
             stt_duration = (datetime.now() - stt_start).total_seconds()
+            self._record_stage(STAGE_STT, stt_duration)
             # Log includes the final determined language
             logger.info(f"STT complete ({stt_duration:.2f}s). Final Detected Lang: {detected_language_bcp47}. Original Text: '{user_transcription_original[:70]}...'")
 
@@ -327,14 +374,16 @@ class ConversationService:
                  # ... (rest of empty transcript handling) ...
                  tts_start = datetime.now()
                  no_input_audio = await self.synthesis_service.text_to_speech(
-                     text=no_input_text, language_code=tts_lang_for_error, return_base64=True
+                     text=no_input_text, language_code=tts_lang_for_error, return_base64=True,
+                     sample_rate_hertz=quality.tts_sample_rate_hertz
                  )
                  tts_duration = (datetime.now() - tts_start).total_seconds()
                  logger.info(f"Synthesized empty input response ({tts_duration:.2f}s)")
                  return AssistantResponse(
                      session_id=session_id, request_transcription="",
                      response_text=no_input_text, response_audio=no_input_audio,
-                     detected_input_language=detected_language_bcp47 # Return detected lang even if transcript empty
+                     detected_input_language=detected_language_bcp47, # Return detected lang even if transcript empty
+                     quality_tier=quality.tier
                  )
 
         except (TranscriptionError, InvalidRequestError) as e:
@@ -357,7 +406,9 @@ class ConversationService:
         # --- 2. Refine Transcription ---
         # The rest of the pipeline now uses the correct effective_language_bcp47
         text_for_translation = user_transcription_original
-        if self.settings.ENABLE_TRANSCRIPTION_REFINEMENT:
+        if self.settings.ENABLE_TRANSCRIPTION_REFINEMENT and quality.skip_refinement:
+            logger.info(f"Skipping transcription refinement (quality tier: {quality.tier_name}).")
+        elif self.settings.ENABLE_TRANSCRIPTION_REFINEMENT:
             refine_start = datetime.now()
             try:
                 refined_transcription = await self.nlu_service.refine_transcription(
@@ -366,6 +417,7 @@ class ConversationService:
                 )
                 # ... (rest of refinement logic) ...
                 refine_duration = (datetime.now() - refine_start).total_seconds()
+                self._record_stage(STAGE_REFINE, refine_duration)
                 if refined_transcription and refined_transcription != user_transcription_original:
                     logger.info(f"Transcription refined ({refine_duration:.2f}s). Using refined text for translation.")
                     logger.debug(
@@ -405,6 +457,7 @@ class ConversationService:
             logger.error(
                 f"Unexpected error during input translation ({translate_in_duration:.2f}s) for session {session_id}: {e}",
                 exc_info=True)
+        self._record_stage(STAGE_TRANSLATE_IN, translate_in_duration)
 
         # --- 4. NLU Processing ---
         # ... (logic remains the same) ...
@@ -424,6 +477,7 @@ class ConversationService:
             )
             # ... (rest of NLU logic) ...
             nlu_duration = (datetime.now() - nlu_start).total_seconds()
+            self._record_stage(STAGE_NLU, nlu_duration)
             logger.info(
                 f"NLU processing complete ({nlu_duration:.2f}s). Intent: {nlu_result.intent.value if nlu_result else 'N/A'}")
         except NluError as e:
@@ -443,6 +497,7 @@ class ConversationService:
                 )
                 # ... (rest of dispatch logic) ...
                 dispatch_duration = (datetime.now() - dispatch_start).total_seconds()
+                self._record_stage(STAGE_DISPATCH, dispatch_duration)
                 logger.info(
                     f"Intent handling ({nlu_result.intent.value}) complete ({dispatch_duration:.2f}s). Response (NLU Lang): '{response_text_nlu[:70]}...'. Action Result: {type(action_result).__name__}")
 
@@ -466,6 +521,7 @@ class ConversationService:
             )
             # ... (rest of translation back logic) ...
             translate_out_duration = (datetime.now() - translate_out_start).total_seconds()
+            self._record_stage(STAGE_TRANSLATE_OUT, translate_out_duration)
             if final_response_text != response_text_nlu:
                 logger.info(
                     f"Output translation to '{effective_language_bcp47}' complete ({translate_out_duration:.2f}s).")
@@ -486,10 +542,12 @@ class ConversationService:
             assistant_audio_response = await self.synthesis_service.text_to_speech(
                 text=final_response_text,
                 language_code=effective_language_bcp47,  # Uses correct language
-                return_base64=True
+                return_base64=True,
+                sample_rate_hertz=quality.tts_sample_rate_hertz
             )
             # ... (rest of TTS logic) ...
             tts_duration = (datetime.now() - tts_start).total_seconds()
+            self._record_stage(STAGE_TTS, tts_duration)
             logger.info(
                 f"Synthesis complete ({tts_duration:.2f}s). Audio length approx: {len(assistant_audio_response)}")
         except SynthesisError as e:
@@ -506,12 +564,13 @@ class ConversationService:
         # ... (logic remains the same, detected_input_language uses final determined language) ...
         total_duration = (datetime.now() - start_time).total_seconds()
         logger.info(
-            f"Successfully processed interaction for session_id: {session_id}. Total time: {total_duration:.2f}s")
+            f"Successfully processed interaction for session_id: {session_id}. Total time: {total_duration:.2f}s (quality tier: {quality.tier_name})")
         return AssistantResponse(
             session_id=session_id,
             request_transcription=user_transcription_original,
             response_text=final_response_text,
             response_audio=assistant_audio_response,
             detected_input_language=detected_language_bcp47,  # Return final detected language
-            action_result=action_result
+            action_result=action_result,
+            quality_tier=quality.tier
         )
\ No newline at end of file
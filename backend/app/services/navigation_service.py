@@ -1,5 +1,4 @@
 # backend/services/navigation_service.py
-import asyncio
 import functools
 import os
 import logging
@@ -10,6 +9,7 @@ import requests
 from ..core.clients.google_maps import GoogleMapsClient, COMPLEX_PLACE_TYPES
 from ..core.config import Settings
 from ..core.exception import NavigationError, InvalidRequestError, StateError
+from ..core.executors import run_blocking, POOL_BLOCKING_IO
 # Use the updated models
 from ..models.internal import RouteInfo, RouteWarning, OrderContext
 
@@ -316,7 +316,6 @@ class NavigationService:
         logger.info(f"Fetching river level data from {target_url} for state {state_code} using 'requests' library...")
 
         try:
-            loop = asyncio.get_running_loop()
             requests_get_with_args = functools.partial(
                 requests.get,
                 params=params,
@@ -326,9 +325,9 @@ class NavigationService:
             # Log the dangerous setting
             logger.warning("!!! Disabling SSL verification for 'requests' call to flood site (Hackathon Fix) !!!")
 
-            # Run the synchronous call in the default executor
-            response = await loop.run_in_executor(
-                None,
+            # Run the synchronous call in the blocking I/O executor pool
+            response = await run_blocking(
+                POOL_BLOCKING_IO,
                 requests_get_with_args, # The partial function
                 target_url # The positional URL argument
             )
@@ -3,17 +3,17 @@ import logging
 import json
 import time  # Add this import
 from typing import List, Dict, Any, Optional
-# Need pycountry for language names from codes
-try:
-    import pycountry
-except ImportError:
-    pycountry = None
-    logging.warning("pycountry not installed (`pip install pycountry`). Language name lookup will be basic.")
-
 from ..core.clients.gemini import GeminiClient
 from ..core.config import Settings
 from ..core.exception import NluError
 from ..models.internal import ChatMessage, ChatHistory, NluIntent, NluResult
+from ..core.lazy_imports import LazyModule, is_available, SUBSYSTEM_NLU
+
+# Need pycountry for language names from codes (its ISO databases are loaded on first lookup)
+PYCOUNTRY_AVAILABLE = is_available("pycountry")
+if not PYCOUNTRY_AVAILABLE:
+    logging.warning("pycountry not installed (`pip install pycountry`). Language name lookup will be basic.")
+pycountry = LazyModule("pycountry", SUBSYSTEM_NLU)
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +30,7 @@ def _get_language_name(bcp47_code: str) -> str:
     lang_code = bcp47_code.split('-')[0].lower()
     name = f"Unknown Language ({lang_code})" # Default fallback
 
-    if pycountry:
+    if PYCOUNTRY_AVAILABLE:
         try:
             lang_obj = pycountry.languages.get(alpha_2=lang_code)
             if lang_obj:
@@ -2,17 +2,22 @@ import logging
 from typing import Optional, Tuple, Dict, Any, List
 from datetime import datetime
 import asyncio
-import cv2
 import numpy as np
 import base64
-import mediapipe as mp
-from ultralytics import YOLO
-import io # For BytesIO if needed
+import binascii
+import functools
 
 from ..core.clients.twillio_client import TwilioClient # Placeholder client
 from ..core.config import Settings
+from ..core.model_registry import (
+    ModelRegistry, ModelHandle, FACE_MESH_MODEL, YAWN_MODEL, EYE_MODEL, STATUS_FAILED, STATUS_DISABLED
+)
 from ..core.exception import SafetyError, ConfigurationError, StateError, CommunicationError, InvalidRequestError
 from ..models.internal import CrashReport, SleepinessReport
+from ..core.lazy_imports import LazyModule, SUBSYSTEM_VISION
+from ..core.executors import run_blocking, POOL_VISION
+
+cv2 = LazyModule("cv2", SUBSYSTEM_VISION) # Imported on first use / by the startup warm-up
 
 logger = logging.getLogger(__name__)
 
@@ -32,40 +37,33 @@ FACEMESH_LANDMARK_IDS = {
 class SafetyService:
     """Handles safety features including drowsiness detection."""
 
-    def __init__(self, settings: Settings, twilio_client: Optional[TwilioClient] = None):
+    def __init__(
+        self,
+        settings: Settings,
+        twilio_client: Optional[TwilioClient] = None,
+        model_registry: Optional[ModelRegistry] = None
+    ):
         self.settings = settings
         self.twilio_client = twilio_client
-        self.drowsiness_enabled = settings.DROWSINESS_DETECTION_ENABLED
+        # Models are owned by the process-wide registry (loaded once in the app lifespan)
+        self.model_registry = model_registry
 
-        if self.drowsiness_enabled:
-            logger.info("Initializing Drowsiness Detection models...")
-            try:
-                # Initialize MediaPipe Face Mesh
-                self.face_mesh = mp.solutions.face_mesh.FaceMesh(
-                    static_image_mode=True, # Process images independently
-                    max_num_faces=1, # Assume driver is the only relevant face
-                    refine_landmarks=True, # Get more detailed landmarks (eyes, lips)
-                    min_detection_confidence=settings.DROWSINESS_MEDIAPIPE_MIN_DET_CONF,
-                    min_tracking_confidence=settings.DROWSINESS_MEDIAPIPE_MIN_TRACK_CONF
-                )
-
-                # Load YOLO models
-                self.yawn_model = YOLO(settings.YAWN_MODEL_PATH)
-                self.eye_model = YOLO(settings.EYE_MODEL_PATH)
-                # You might want to run a dummy prediction to fully initialize models/GPU here
-                # dummy_img = np.zeros((64, 64, 3), dtype=np.uint8)
-                # self.yawn_model.predict(dummy_img, verbose=False)
-                # self.eye_model.predict(dummy_img, verbose=False)
-                logger.info("MediaPipe FaceMesh and YOLO models loaded successfully.")
-            except Exception as e:
-                logger.error(f"FATAL: Failed to load drowsiness detection models: {e}", exc_info=True)
-                self.drowsiness_enabled = False # Disable feature if models fail
-                # Optionally raise ConfigurationError to prevent startup?
-        else:
-             logger.warning("Drowsiness detection is disabled in settings.")
+        if not settings.DROWSINESS_DETECTION_ENABLED:
+            logger.warning("Drowsiness detection is disabled in settings.")
+        elif model_registry is None:
+            logger.error("No model registry provided. Drowsiness detection will be unavailable.")
 
         logger.debug("SafetyService initialized.")
 
+    @property
+    def drowsiness_enabled(self) -> bool:
+        """Drowsiness detection is usable if enabled in settings and its models did not fail to load."""
+        return (
+            self.settings.DROWSINESS_DETECTION_ENABLED
+            and self.model_registry is not None
+            and self.model_registry.status not in (STATUS_FAILED, STATUS_DISABLED)
+        )
+
     async def _get_emergency_contacts(self, driver_id: str) -> List[str]:
         """
         Retrieves emergency contacts for a driver. Placeholder.
@@ -176,25 +174,27 @@ class SafetyService:
         return outcome
 
 
-    async def _run_prediction_async(self, model, roi):
-        """Helper to run synchronous YOLO predict in an executor."""
+    async def _run_prediction_async(self, model: ModelHandle, roi):
+        """Helper to run synchronous YOLO predict (via the shared model handle) in the vision pool."""
         if roi is None or roi.size == 0:
              return [] # Return empty results for empty ROI
-        loop = asyncio.get_running_loop()
         # Pass necessary args to predict. verbose=False reduces console spam.
-        results = await loop.run_in_executor(None, model.predict, roi, verbose=False)
+        results = await run_blocking(POOL_VISION, functools.partial(model, roi, verbose=False))
         return results
 
+    def _run_face_mesh(self, frame_bgr: np.ndarray):
+        """Synchronous BGR->RGB conversion + FaceMesh; run in the vision pool, never on the event loop."""
+        image_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+        image_rgb.flags.writeable = False # Performance hint
+        return self.model_registry.get(FACE_MESH_MODEL)(image_rgb)
+
     async def _process_single_frame(self, frame_bgr: np.ndarray, frame_idx: int) -> Dict[str, Any]:
         """Processes a single frame for face landmarks and ROI predictions."""
         frame_results = {"frame_idx": frame_idx, "face_found": False, "left_eye_state": None, "right_eye_state": None, "yawn_state": None}
 
         try:
             # 1. MediaPipe FaceMesh
-            image_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-            image_rgb.flags.writeable = False # Performance hint
-            mp_results = self.face_mesh.process(image_rgb)
-            image_rgb.flags.writeable = True
+            mp_results = await run_blocking(POOL_VISION, self._run_face_mesh, frame_bgr)
 
             if not mp_results.multi_face_landmarks:
                  # logger.debug(f"Frame {frame_idx}: No face landmarks detected.")
@@ -246,9 +246,11 @@ class SafetyService:
                  return frame_results # Cannot proceed without ROIs
 
             # 3. Run YOLO Predictions (Asynchronously)
-            yawn_pred_task = self._run_prediction_async(self.yawn_model, mouth_roi)
-            left_eye_pred_task = self._run_prediction_async(self.eye_model, left_eye_roi)
-            right_eye_pred_task = self._run_prediction_async(self.eye_model, right_eye_roi)
+            yawn_model = self.model_registry.get(YAWN_MODEL)
+            eye_model = self.model_registry.get(EYE_MODEL)
+            yawn_pred_task = self._run_prediction_async(yawn_model, mouth_roi)
+            left_eye_pred_task = self._run_prediction_async(eye_model, left_eye_roi)
+            right_eye_pred_task = self._run_prediction_async(eye_model, right_eye_roi)
 
             yawn_results, left_eye_results, right_eye_results = await asyncio.gather(
                 yawn_pred_task, left_eye_pred_task, right_eye_pred_task
@@ -289,6 +291,25 @@ class SafetyService:
         return frame_results
 
 
+    def _decode_frames(self, image_frames_base64: List[str]) -> List[np.ndarray]:
+        """Decodes base64 JPEG/PNG frames to BGR arrays, skipping frames that fail to decode."""
+        decoded_frames = []
+        for i, frame_b64 in enumerate(image_frames_base64):
+            try:
+                img_bytes = base64.b64decode(frame_b64)
+                img_array = np.frombuffer(img_bytes, dtype=np.uint8)
+                frame_bgr = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+                if frame_bgr is None:
+                     logger.warning(f"Failed to decode frame {i}. Skipping.")
+                     continue
+                decoded_frames.append(frame_bgr)
+            except (ValueError, TypeError, binascii.Error) as e:
+                 logger.warning(f"Error decoding base64 frame {i}: {e}. Skipping.")
+            except Exception as e:
+                 logger.error(f"Unexpected error decoding frame {i}: {e}", exc_info=True)
+        return decoded_frames
+
+
     async def analyze_driver_state(
         self,
         image_frames_base64: List[str],
@@ -309,6 +330,9 @@ class SafetyService:
             return None
         if not image_frames_base64:
              raise InvalidRequestError("No image frames provided for analysis.")
+        if not self.model_registry.is_warm:
+            # The readiness probe keeps traffic away from cold workers, but guard direct calls too
+            raise StateError(f"Drowsiness models are not ready yet (status: {self.model_registry.status}).")
 
         num_frames = len(image_frames_base64)
         logger.info(f"Analyzing driver state for a batch of {num_frames} frames.")
@@ -316,21 +340,8 @@ class SafetyService:
         # Estimate time per frame if batch duration isn't provided
         time_per_frame = batch_duration_sec / num_frames if batch_duration_sec and num_frames > 0 else self.settings.DROWSINESS_FRAME_INTERVAL_SEC
 
-        # Decode frames (can be done in parallel too, but might consume more memory)
-        decoded_frames = []
-        for i, frame_b64 in enumerate(image_frames_base64):
-            try:
-                img_bytes = base64.b64decode(frame_b64)
-                img_array = np.frombuffer(img_bytes, dtype=np.uint8)
-                frame_bgr = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-                if frame_bgr is None:
-                     logger.warning(f"Failed to decode frame {i}. Skipping.")
-                     continue
-                decoded_frames.append(frame_bgr)
-            except (ValueError, TypeError, binascii.Error) as e:
-                 logger.warning(f"Error decoding base64 frame {i}: {e}. Skipping.")
-            except Exception as e:
-                 logger.error(f"Unexpected error decoding frame {i}: {e}", exc_info=True)
+        # Decode frames in the vision pool (JPEG decoding is CPU-bound)
+        decoded_frames = await run_blocking(POOL_VISION, self._decode_frames, image_frames_base64)
 
         if not decoded_frames:
              logger.warning("No frames could be successfully decoded in the batch.")
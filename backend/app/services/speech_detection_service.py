@@ -0,0 +1,104 @@
+# backend/services/speech_detection_service.py
+import logging
+import time
+from typing import Optional
+
+import numpy as np
+
+from ..core.audio_decoding import decode_audio
+from ..core.audio_enhancement import detect_speech_activity, resample_pcm16, noise_observation, NR_HOP_LENGTH
+from ..core.clients.google_stt import STT_ENDPOINT_PROBE
+from ..core.config import Settings
+from ..core.executors import run_blocking, POOL_DSP
+from ..core.metrics import metrics
+from ..core.noise_profile_store import NoiseProfileStore
+from ..core.session_audio_buffer import SessionAudioBuffer, BUFFER_SAMPLE_RATE
+from ..models.internal import SpeechActivityResult
+from .transcription_service import TranscriptionService
+
+logger = logging.getLogger(__name__)
+
+DETECTOR_LOCAL = "local"
+DETECTOR_STT = "stt"  # Local detector said "speech" and cloud STT confirmed/denied it (verify mode)
+
+
+class SpeechDetectionService:
+    """
+    Answers /assistant/detect-speech with a local, CPU-only speech-activity detector
+    (core/audio_enhancement.detect_speech_activity) instead of a full transcription round trip.
+
+    With DETECT_SPEECH_VERIFY_WITH_STT enabled, chunks the detector classifies as speech are
+    confirmed with TranscriptionService (a non-empty transcript); "no speech" never hits the cloud.
+
+    Chunks that come with a session_id are kept (decoded, 16 kHz) in the SessionAudioBuffer, so
+    /assistant/interact can reference them instead of the client uploading the recording again.
+    Their speech-band noise floor comes from the session's NoiseProfileStore entry (if lower than
+    the chunk's own), and chunks without speech are folded into that profile.
+    """
+
+    def __init__(self, settings: Settings, transcription_service: Optional[TranscriptionService] = None,
+                 audio_buffer: Optional[SessionAudioBuffer] = None, noise_profiles: Optional[NoiseProfileStore] = None):
+        self.settings = settings
+        self.transcription_service = transcription_service
+        self.audio_buffer = audio_buffer
+        self.noise_profiles = noise_profiles
+        self.verify_with_stt = settings.DETECT_SPEECH_VERIFY_WITH_STT and transcription_service is not None
+        if settings.DETECT_SPEECH_VERIFY_WITH_STT and transcription_service is None:
+            logger.warning("DETECT_SPEECH_VERIFY_WITH_STT is enabled but TranscriptionService is unavailable. Using the local detector only.")
+        logger.debug(f"SpeechDetectionService initialized (verify with STT: {self.verify_with_stt}).")
+
+    def analyse(self, audio_bytes: bytes, content_type: Optional[str] = None,
+                session_id: Optional[str] = None) -> SpeechActivityResult:
+        """
+        Decodes the chunk, buffers it for the session (if given) and runs the local detector.
+        Blocking (CPU-bound); use detect() from async code.
+        """
+        samples, sample_rate, _ = decode_audio(audio_bytes, content_type, self.settings.FFMPEG_BINARY)
+        samples, sample_rate = resample_pcm16(samples, sample_rate, BUFFER_SAMPLE_RATE)
+        use_profile = bool(session_id and self.noise_profiles is not None and self.noise_profiles.enabled)
+        result = detect_speech_activity(
+            samples, sample_rate,
+            energy_floor_dbfs=self.settings.VAD_ENERGY_FLOOR_DBFS,
+            snr_margin_db=self.settings.VAD_SNR_MARGIN_DB,
+            max_flatness=self.settings.VAD_MAX_SPECTRAL_FLATNESS,
+            min_speech_band_ratio=self.settings.VAD_MIN_SPEECH_BAND_RATIO,
+            min_speech_ms=self.settings.VAD_MIN_SPEECH_MS,
+            band_noise_floor_db=self.noise_profiles.band_floor_db(session_id) if use_profile else None,
+        )
+        if use_profile and not result.speech_detected and result.peak_dbfs > self.settings.VAD_ENERGY_FLOOR_DBFS:
+            # The whole chunk is cabin noise (not a muted mic): update the session's noise spectrum and band floor
+            audio = samples.astype(np.float32)
+            audio *= np.float32(1.0 / np.iinfo(np.int16).max)
+            all_frames = np.ones(1 + len(audio) // NR_HOP_LENGTH, dtype=bool)
+            self.noise_profiles.update(session_id, sample_rate, noise_observation(audio, sample_rate, all_frames),
+                                       result.band_noise_floor_db)
+        if session_id and self.audio_buffer is not None:
+            result.buffered_start_ms, result.buffered_end_ms = self.audio_buffer.append(session_id, samples, sample_rate)
+        return result
+
+    async def detect(self, audio_bytes: bytes, content_type: Optional[str] = None,
+                     session_id: Optional[str] = None) -> SpeechActivityResult:
+        """
+        Returns the detector result; `detector` says whether cloud STT had the final word.
+        Raises InvalidRequestError for undecodable audio, TranscriptionError if verification fails.
+        """
+        start = time.perf_counter()
+        result = await run_blocking(POOL_DSP, self.analyse, audio_bytes, content_type, session_id)
+        local_seconds = time.perf_counter() - start
+        metrics.observe("detect_speech_seconds", local_seconds, detector=DETECTOR_LOCAL)
+        logger.info(f"[VAD] Local detector: speech={result.speech_detected} "
+                    f"(longest run {result.longest_speech_ms:.0f} ms, speech frames {result.speech_ratio:.0%}, "
+                    f"noise floor {result.noise_floor_dbfs:.1f} dBFS) in {local_seconds * 1000:.1f} ms")
+
+        if not result.speech_detected or not self.verify_with_stt:
+            metrics.inc("detect_speech_total", detector=DETECTOR_LOCAL, speech=str(result.speech_detected).lower())
+            return result
+
+        transcript, _ = await self.transcription_service.process_audio(
+            audio_data=audio_bytes, language_code_hint=None, noise_reduction_mode="cheap", content_type=content_type,
+            session_id=session_id, endpoint=STT_ENDPOINT_PROBE)
+        result.speech_detected = bool(transcript and transcript.strip())
+        result.detector = DETECTOR_STT
+        metrics.observe("detect_speech_seconds", time.perf_counter() - start, detector=DETECTOR_STT)
+        metrics.inc("detect_speech_total", detector=DETECTOR_STT, speech=str(result.speech_detected).lower())
+        return result
@@ -35,7 +35,8 @@ class SynthesisService:
         self,
         text: str,
         language_code: Optional[str], # BCP-47 code
-        return_base64: bool = True
+        return_base64: bool = True,
+        sample_rate_hertz: Optional[int] = None # Lower rate = smaller audio (used by the quality controller)
     ) -> bytes | str:
         """Synthesizes speech from text using language-specific voices."""
         logger.info("Starting text-to-speech synthesis.")
@@ -58,7 +59,8 @@ class SynthesisService:
                 language_code=effective_language_code,
                 voice_name=voice_name,
                 speaking_rate=self.settings.DEFAULT_TTS_SPEAKING_RATE,
-                audio_encoding=self.settings.TTS_AUDIO_ENCODING
+                audio_encoding=self.settings.TTS_AUDIO_ENCODING,
+                sample_rate_hertz=sample_rate_hertz
             )
 
             if not audio_bytes:
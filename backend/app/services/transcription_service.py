@@ -1,78 +1,37 @@
+import asyncio
 import logging
-import platform
-from typing import Tuple, Optional
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Tuple, Optional
 import base64
 import binascii
-import io
-import os
 import numpy as np
 
 from .translation_service import TranslationService
 from ..core.clients.openai_client import OpenAiClient
 
-# Make sure imports for pydub, noisereduce, speech are present
-
-try:
-    from pydub import AudioSegment
-    from pydub.exceptions import CouldntDecodeError
-    PYDUB_AVAILABLE = True
-
-    current_os = platform.system()
-
-    # Define the directory containing ffmpeg binaries
-    if current_os == "Windows":
-        # Define the directory containing FFmpeg binaries for Windows
-        ffmpeg_bin_dir = r'C:\Users\hongy\Downloads\ffmpeg-n6.1-latest-win64-gpl-6.1\bin'  
-        ffmpeg_executable = os.path.join(ffmpeg_bin_dir, 'ffmpeg.exe')
-        ffprobe_executable = os.path.join(ffmpeg_bin_dir, 'ffprobe.exe')
-    elif current_os == "Darwin":  # macOS
-        # Define the path to FFmpeg for macOS
-        ffmpeg_executable = "/opt/homebrew/bin/ffmpeg"  
-        ffprobe_executable = "/opt/homebrew/bin/ffprobe"
-    else:
-        logging.error(f"Unsupported operating system: {current_os}")
-        raise OSError(f"Unsupported operating system: {current_os}")
-
-
-    # Set converter path
-    if os.path.exists(ffmpeg_executable):
-        AudioSegment.converter = ffmpeg_executable
-        logging.info(f"Explicitly setting pydub converter path to: {AudioSegment.converter}")
-    else:
-        logging.error(f"FFmpeg executable not found at: {ffmpeg_executable}. pydub will likely fail.")
-    if os.path.exists(ffprobe_executable):
-         AudioSegment.ffprobe = ffprobe_executable
-         logging.info(f"Explicitly setting pydub ffprobe path to: {AudioSegment.ffprobe}")
-    else:
-         logging.error(f"ffprobe executable not found at: {ffprobe_executable}. pydub needs ffprobe.")
-    # --- End FFmpeg path configuration ---
-
-except ImportError:
-    AudioSegment = None
-    CouldntDecodeError = None
-    PYDUB_AVAILABLE = False
-    logging.error("pydub library not found. Please install it (`pip install pydub`). Audio loading/conversion will fail.")
-except Exception as e:
-    AudioSegment = None
-    CouldntDecodeError = None
-    PYDUB_AVAILABLE = False
-    logging.error(f"Error occurred during pydub/ffmpeg path configuration: {e}", exc_info=True)
-
+from ..core.executors import run_blocking, POOL_DSP
+from ..core.metrics import metrics
+from ..core.audio_decoding import decode_audio, encode_for_upload, UPLOAD_FILE_EXTENSIONS
+from ..core.dsp_pool import DspProcessPool, apply_nr_details
+from ..core.noise_profile_store import NoiseProfileStore
+from ..models.internal import AudioProcessingOptions, AudioProcessingReport, SttStreamResult
 from ..core.audio_enhancement import (
-    apply_tunable_noise_reduction,
+    process_pcm16_in_place,
+    resample_pcm16,
+    speech_bounds,
+    pause_split_points,
+    NR_N_FFT,
+    NR_METHOD_TUNABLE,
+    NR_METHOD_WIENER,
+    NR_METHOD_NONE,
     NOISEREDUCE_AVAILABLE, # Check availability from the new module
-    LIBROSA_AVAILABLE      # Also check if librosa is available, as it's needed by VAD
+    LIBROSA_AVAILABLE,     # Also check if librosa is available, as it's needed by VAD
+    SCIPY_AVAILABLE        # The shared-STFT stage only needs SciPy
 )
 
-try:
-    import noisereduce as nr
-except ImportError:
-    nr = None
-    logging.error("noisereduce library not found. Please install it (`pip install noisereduce`). Noise reduction will be skipped.")
-
 # Now import other things
 from google.cloud import speech
-from ..core.clients.google_stt import GoogleSttClient
+from ..core.clients.google_stt import GoogleSttClient, STT_ENDPOINT_INTERACT, STT_ENDPOINT_PROBE
 from ..core.config import Settings
 from ..core.exception import TranscriptionError, InvalidRequestError, ConfigurationError
 
@@ -81,25 +40,48 @@ logger = logging.getLogger(__name__)
 TARGET_ENCODING = speech.RecognitionConfig.AudioEncoding.LINEAR16
 TARGET_MIME_TYPE = "audio/wav"
 
+# Keys of settings.STT_SAMPLE_RATE_HERTZ
+STT_PROVIDER_GOOGLE = "google"
+STT_PROVIDER_WHISPER = "whisper"
+
+# Hedge reasons (label of stt_hedge_total)
+HEDGE_NO_HINT = "no_hint"  # No language hint: Whisper starts together with Google
+HEDGE_SLOW = "slow"  # Google slower than its STT_HEDGE_QUANTILE latency
+HEDGE_UNACCEPTABLE = "google_unacceptable"  # Google answered without transcript/language (the old fallback)
+
+# Whisper reports ISO 639-1; languages whose BCP-47 codes in SUPPORTED_LANGUAGES use another primary tag
+ISO_TO_BCP47_PREFIX = {"zh": "cmn", "tl": "fil"}
+
+# Transcription modes (label of the stt_time_to_final_seconds metric)
+STT_MODE_BATCH = "batch"
+STT_MODE_STREAMING = "streaming"
+
 class TranscriptionService:
     def __init__(
         self,
         stt_client: GoogleSttClient,
         openai_client: OpenAiClient,
         translation_service: TranslationService, # Add translation_service parameter
-        settings: Settings
+        settings: Settings,
+        dsp_pool: Optional[DspProcessPool] = None, # Shared DSP process pool; None = run DSP in the 'dsp' thread pool
+        noise_profiles: Optional[NoiseProfileStore] = None # Per-session cabin-noise profiles; None = estimate per clip
     ):
         self.stt_client = stt_client
         self.openai_client = openai_client
         self.translation_service = translation_service # Store the service
         self.settings = settings
-        # ... (pydub check) ...
-        if not PYDUB_AVAILABLE: logger.critical("pydub library is not available or failed to configure.")
-
-        # ... (NR check remains the same) ...
-        self.noise_reduction_enabled = (NOISEREDUCE_AVAILABLE and LIBROSA_AVAILABLE and self.settings.NOISE_REDUCTION_METHOD == 'tunable_nr')
-        if self.settings.NOISE_REDUCTION_METHOD != 'none' and not self.noise_reduction_enabled: logger.warning(f"Noise reduction method '{self.settings.NOISE_REDUCTION_METHOD}' requested, but prerequisites missing/unsupported. Disabling NR.")
-        elif self.noise_reduction_enabled: logger.info(f"Noise reduction enabled using method: {self.settings.NOISE_REDUCTION_METHOD}")
+        self.dsp_pool = dsp_pool
+        self.noise_profiles = noise_profiles
+
+        # NR method per quality mode ('full', and 'cheap' under load); unavailable methods become 'none'
+        self.noise_reduction_methods = {
+            "full": self._resolve_nr_method(self.settings.NOISE_REDUCTION_METHOD),
+            "cheap": self._resolve_nr_method(self.settings.NOISE_REDUCTION_CHEAP_METHOD),
+        }
+        self.noise_reduction_enabled = self.noise_reduction_methods["full"] != NR_METHOD_NONE
+        if self.noise_reduction_enabled or self.noise_reduction_methods["cheap"] != NR_METHOD_NONE:
+            logger.info(f"Noise reduction enabled using method: {self.noise_reduction_methods['full']} "
+                        f"(under load: {self.noise_reduction_methods['cheap']})")
         else: logger.info("Noise reduction is disabled.")
 
         self.openai_fallback_possible = self.openai_client and self.openai_client.enabled
@@ -126,192 +108,425 @@ class TranscriptionService:
             logger.error(f"Unexpected audio data type received: {type(audio_data)}")
             raise InvalidRequestError("Audio data must be bytes or a base64 encoded string.")
 
-    def _process_and_convert_audio(self, raw_audio_bytes: bytes) -> Tuple[Optional[AudioSegment], int]:
+    def _decode_to_samples(self, raw_audio_bytes: bytes, content_type: Optional[str] = None) -> Tuple[np.ndarray, int]:
+        """Decodes the upload to mono int16 samples in-process. Returns (samples, sample rate)."""
         if not raw_audio_bytes:
             logger.warning("Cannot process empty audio data.")
             raise InvalidRequestError("Cannot process empty audio data.")
-        if not PYDUB_AVAILABLE or AudioSegment is None:
-            logger.error("Cannot process audio: pydub is not available.")
-            raise InvalidRequestError("Audio processing library (pydub) is not configured correctly.")
-
         try:
-            logger.info("Loading audio using pydub...")
-            audio = AudioSegment.from_file(io.BytesIO(raw_audio_bytes))
-            logger.info(
-                f"pydub loaded audio. Original - Channels: {audio.channels}, Rate: {audio.frame_rate} Hz, Sample Width: {audio.sample_width}, Duration: {len(audio) / 1000.0:.2f}s")
-
-            if audio.channels > 1:
-                logger.debug("Converting to mono...")
-                audio = audio.set_channels(1)
-
-            sample_rate = audio.frame_rate
-            # Ensure sample width is 2 for int16 compatibility later
-            if audio.sample_width != 2:
-                logger.warning(f"Original sample width is {audio.sample_width}. Setting to 2 (16-bit) for processing.")
-                audio = audio.set_sample_width(2)
-
-            dtype_map = {1: np.int8, 2: np.int16, 4: np.int32}
-            # Always expect int16 now due to set_sample_width(2)
-            expected_dtype = np.int16
-            logger.debug(f"Extracting audio samples as NumPy array with dtype: {expected_dtype}")
-            samples = np.array(audio.get_array_of_samples()).astype(expected_dtype)
-
-            # --- Apply Noise Reduction ---
-            if np.issubdtype(samples.dtype, np.integer):
-                max_val = np.iinfo(samples.dtype).max
-                samples_float = samples.astype(np.float32) / max_val
-            else:  # Should be int16, but handle float case just in case
-                samples_float = samples.astype(np.float32)
-
-            reduced_samples_float = samples_float  # Start with original float samples
-
-            if self.noise_reduction_enabled and self.settings.NOISE_REDUCTION_METHOD == 'tunable_nr':
-                logger.info("Applying tunable noise reduction via audio_enhancement module...")
-                try:
-                    reduced_samples_float = apply_tunable_noise_reduction(
-                        audio_data=samples_float,  # Pass float32 data
-                        sr=sample_rate,
-                        prop_decrease=self.settings.NR_PROP_DECREASE,
-                        time_smooth_ms=self.settings.NR_TIME_SMOOTH_MS,
-                        n_passes=self.settings.NR_PASSES
+            samples, sample_rate, decoder = decode_audio(raw_audio_bytes, content_type, self.settings.FFMPEG_BINARY)
+        except InvalidRequestError:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error during audio decoding: {e}", exc_info=True)
+            raise InvalidRequestError(f"An unexpected error occurred while decoding the audio file: {e}", original_exception=e)
+        logger.info(f"Decoded audio with {decoder}. Rate: {sample_rate} Hz, Duration: {len(samples) / sample_rate:.2f}s")
+
+        # Normalise to the STT rate before noise reduction: less STFT work and a smaller STT upload
+        target_rate = self._stt_sample_rate(STT_PROVIDER_GOOGLE)
+        if target_rate and target_rate != sample_rate:
+            samples, sample_rate = resample_pcm16(samples, sample_rate, target_rate)
+            logger.debug(f"Resampled audio to {sample_rate} Hz.")
+        return samples, sample_rate
+
+    def _stt_sample_rate(self, provider: str) -> int:
+        """Configured sample rate for an STT provider (0 = keep the current rate)."""
+        return int(self.settings.STT_SAMPLE_RATE_HERTZ.get(provider, 0) or 0)
+
+    def _resolve_nr_method(self, method: str) -> str:
+        """The NR method to run for a configured one: NR_METHOD_NONE if unknown or its libraries are missing."""
+        if method == NR_METHOD_TUNABLE:
+            available = SCIPY_AVAILABLE if self.settings.NR_SHARED_STFT else (NOISEREDUCE_AVAILABLE and LIBROSA_AVAILABLE)
+        elif method == NR_METHOD_WIENER:
+            available = SCIPY_AVAILABLE
+        else:
+            available = False
+        if method != NR_METHOD_NONE and not available:
+            logger.warning(f"Noise reduction method '{method}' requested, but prerequisites missing/unsupported. Disabling NR.")
+        return method if available else NR_METHOD_NONE
+
+    def _audio_processing_options(self, noise_reduction_mode: str = "full") -> AudioProcessingOptions:
+        """Builds the DSP options. 'cheap' mode (under load) uses NOISE_REDUCTION_CHEAP_METHOD (tunable: one stationary pass)."""
+        cheap = noise_reduction_mode == "cheap"
+        method = self.noise_reduction_methods["cheap" if cheap else "full"]
+        return AudioProcessingOptions(
+            noise_reduction=method != NR_METHOD_NONE,
+            method=method if method != NR_METHOD_NONE else NR_METHOD_TUNABLE,
+            stationary=cheap,
+            prop_decrease=self.settings.NR_PROP_DECREASE,
+            time_smooth_ms=self.settings.NR_TIME_SMOOTH_MS,
+            n_passes=1 if cheap else self.settings.NR_PASSES,
+            shared_stft=self.settings.NR_SHARED_STFT,
+            snr_gating=self.settings.NR_SNR_GATING_ENABLED,
+            snr_bypass_db=self.settings.NR_SNR_BYPASS_DB,
+            snr_full_strength_db=self.settings.NR_SNR_FULL_STRENGTH_DB,
+            min_prop_decrease=self.settings.NR_MIN_PROP_DECREASE,
+        )
+
+    async def _process_and_convert_audio(
+        self, raw_audio_bytes: bytes, noise_reduction_mode: str = "full", content_type: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Decodes and denoises the audio. Returns mono int16 samples and their sample rate.
+        Decoding runs in the 'dsp' thread pool; the CPU-bound DSP stage runs in the DSP process
+        pool, so neither blocks the event loop.
+        With a session_id, noise reduction uses the session's cabin-noise profile (once there is
+        one) and the clip's non-speech frames are folded into it.
+        """
+        samples, sample_rate = await run_blocking(POOL_DSP, self._decode_to_samples, raw_audio_bytes, content_type)
+        # The decoded buffer is processed in place from here on; raw PCM16 uploads are a read-only
+        # view of the request bytes and are the only case that needs a copy.
+        samples = np.require(samples, dtype=np.int16, requirements=["C", "W"])
+
+        options = self._audio_processing_options(noise_reduction_mode)
+        observe_noise = bool(session_id and (options.shared_stft or options.method == NR_METHOD_WIENER) and self.noise_profiles is not None and self.noise_profiles.enabled)
+        noise_profile = self.noise_profiles.profile(session_id, sample_rate, NR_N_FFT) if observe_noise else None
+        if options.noise_reduction:
+            logger.info(f"Applying {options.method} noise reduction ({noise_reduction_mode}, "
+                        f"noise profile: {'session' if noise_profile is not None else 'clip'}) via the DSP pool...")
+        if self.dsp_pool is not None:
+            report = await self.dsp_pool.process(samples, sample_rate, options, noise_profile, observe_noise)
+        else:
+            noise_out = {} if observe_noise else None
+            details = {}
+            applied = await run_blocking(POOL_DSP, process_pcm16_in_place, samples, sample_rate,
+                                         noise_profile=noise_profile, noise_out=noise_out, details=details,
+                                         **options.model_dump())
+            report = AudioProcessingReport(num_samples=len(samples), sample_rate=sample_rate,
+                                           noise_reduction_applied=applied, executed_in="thread_pool",
+                                           noise_profile_used=applied and noise_profile is not None,
+                                           noise_observation=noise_out.get("observation") if noise_out else None)
+            apply_nr_details(report, details)
+        snr_text = f"{report.input_snr_db:.1f} dB" if report.input_snr_db is not None else "n/a"
+        logger.info(f"DSP stage done in {report.dsp_seconds:.3f}s ({report.executed_in}), NR applied: {report.noise_reduction_applied} "
+                    f"(decision: {report.nr_decision}, input SNR: {snr_text}, prop_decrease: {report.nr_prop_decrease}, passes: {report.nr_passes}).")
+        if report.nr_decision:
+            metrics.inc("nr_decision_total", decision=report.nr_decision, method=options.method)
+        if report.input_snr_db is not None:
+            metrics.observe("nr_input_snr_db", report.input_snr_db)
+        if report.noise_reduction_applied and observe_noise:
+            metrics.inc("nr_noise_profile_total", source="session" if report.noise_profile_used else "clip")
+        if observe_noise and report.noise_observation is not None:
+            # Also clips the SNR gate let skip NR, so the profile does not only learn from noisy audio
+            self.noise_profiles.update(session_id, sample_rate, report.noise_observation)
+
+        if self.settings.STT_TRIM_SILENCE:
+            samples = await self._trim_silence(samples, sample_rate)
+        return samples, sample_rate
+
+    async def _trim_silence(self, samples: np.ndarray, sample_rate: int) -> np.ndarray:
+        """Cuts leading/trailing non-speech (VAD on the denoised audio). Returns a view, not a copy."""
+        start, end = await run_blocking(
+            POOL_DSP, speech_bounds, samples, sample_rate,
+            self.settings.STT_TRIM_PADDING_MS, self.settings.STT_TRIM_THRESHOLD_DB)
+        original_sec = len(samples) / sample_rate
+        trimmed_sec = (end - start) / sample_rate
+        metrics.observe("stt_audio_seconds", original_sec, stage="original")
+        metrics.observe("stt_audio_seconds", trimmed_sec, stage="trimmed")
+        metrics.inc("stt_audio_seconds_trimmed_total", original_sec - trimmed_sec)
+        if end - start < len(samples):
+            logger.info(f"Trimmed silence: {original_sec:.2f}s -> {trimmed_sec:.2f}s (kept samples {start}-{end}).")
+        return samples[start:end]
+
+    def _hedge_delay(self, language_code_hint: Optional[str]) -> Optional[float]:
+        """Seconds to give Google STT before Whisper is started as well (None = only after Google fails)."""
+        if not self.openai_fallback_possible:
+            return None
+        if not self.settings.STT_HEDGING_ENABLED:
+            return None  # Sequential fallback: Whisper only if Google's answer is unacceptable
+        if not language_code_hint and self.settings.STT_HEDGE_WITHOUT_HINT:
+            return 0.0
+        observed = metrics.percentile("stt_provider_seconds", self.settings.STT_HEDGE_QUANTILE * 100.0, provider=STT_PROVIDER_GOOGLE)
+        if observed is None:
+            return self.settings.STT_HEDGE_DEFAULT_DELAY_SEC
+        return min(max(observed, self.settings.STT_HEDGE_MIN_DELAY_SEC), self.settings.STT_HEDGE_MAX_DELAY_SEC)
+
+    def _narrowed_result_acceptable(self, transcript: str, language: Optional[str], confidence: Optional[float]) -> bool:
+        """Whether a result recognised with a narrowed language list can be used without retrying all languages."""
+        return bool(transcript and language and confidence is not None
+                    and confidence >= self.settings.STT_LANGUAGE_NARROW_MIN_CONFIDENCE)
+
+    async def _google_stt(self, samples: np.ndarray, sample_rate: int, language_code_hint: Optional[str],
+                          candidate_languages: Optional[List[str]] = None,
+                          endpoint: str = STT_ENDPOINT_INTERACT) -> Tuple[str, Optional[str]]:
+        """
+        Google STT on the processed samples. With `candidate_languages` (the session's language
+        profile) only those are detected; a low-confidence result is retried with all supported
+        languages. Failures are logged and returned as ("", None). Probe latencies are not recorded
+        in stt_provider_seconds, which sets the hedge delay of /interact requests.
+        """
+        start = time.perf_counter()
+        try:
+            google_stt_bytes = memoryview(samples).cast("B") # LINEAR16 view of the samples, no copy
+            logger.debug(f"Attempting Google STT - Size: {google_stt_bytes.nbytes}, Rate: {sample_rate} Hz, "
+                         f"Languages: {candidate_languages or 'all supported'}")
+            metrics.observe("stt_request_bytes", google_stt_bytes.nbytes, provider=STT_PROVIDER_GOOGLE)
+            transcript, language, confidence = await self.stt_client.transcribe_with_confidence(
+                audio_data=google_stt_bytes,
+                sample_rate_hertz=sample_rate,
+                input_encoding=TARGET_ENCODING,
+                language_code_hint=language_code_hint,
+                candidate_languages=candidate_languages,
+                endpoint=endpoint
+            )
+            if candidate_languages:
+                if self._narrowed_result_acceptable(transcript, language, confidence):
+                    metrics.inc("stt_language_search_total", scope="narrowed")
+                else:
+                    logger.info(f"Low-confidence result with narrowed languages {candidate_languages} "
+                                f"(Lang: {language}, Confidence: {confidence}); retrying with all supported languages.")
+                    metrics.inc("stt_language_search_total", scope="widened")
+                    transcript, language, confidence = await self.stt_client.transcribe_with_confidence(
+                        audio_data=google_stt_bytes,
+                        sample_rate_hertz=sample_rate,
+                        input_encoding=TARGET_ENCODING,
+                        language_code_hint=language_code_hint
                     )
-                    logger.info("Tunable noise reduction applied successfully.")
-                except Exception as e:
-                    logger.error(f"Error during tunable noise reduction call: {e}", exc_info=True)
-                    logger.warning("Falling back to audio without noise reduction due to error.")
-
-            # --- Convert float samples back to int16 NumPy array ---
-            target_dtype = np.int16
-            max_val_out = np.iinfo(target_dtype).max
-            final_samples_int16 = (np.clip(reduced_samples_float * max_val_out, -max_val_out, max_val_out)).astype(
-                target_dtype)
-            logger.debug(f"Converted processed float samples back to {target_dtype}.")
-
-            # --- Create a *new* AudioSegment from the processed samples ---
-            # Ensure parameters match the processed data
-            processed_audio_segment = AudioSegment(
-                data=final_samples_int16.tobytes(),
-                sample_width=2,  # Must be 2 for int16
-                frame_rate=sample_rate,
-                channels=1  # Mono
+            else:
+                metrics.inc("stt_language_search_total", scope="full")
+            if endpoint != STT_ENDPOINT_PROBE:
+                metrics.observe("stt_provider_seconds", time.perf_counter() - start, provider=STT_PROVIDER_GOOGLE)
+            logger.info(f"Google STT result - Detected Lang: {language}, Confidence: {confidence}, Transcript: '{transcript[:50]}...'")
+            return (transcript or "").strip(), language
+        except TranscriptionError as google_err:
+            logger.error(f"Google STT transcription failed: {google_err}")
+        except Exception as google_ex:
+            logger.error(f"Unexpected error during Google STT call: {google_ex}", exc_info=True)
+        return "", None
+
+    def _bcp47_for_iso(self, iso_code: Optional[str], language_code_hint: Optional[str]) -> Optional[str]:
+        """Maps Whisper's ISO 639-1 language to the hint or a SUPPORTED_LANGUAGES entry with that language."""
+        if not iso_code:
+            return None
+        if language_code_hint and language_code_hint.split("-")[0].lower() == iso_code:
+            return language_code_hint
+        prefix = ISO_TO_BCP47_PREFIX.get(iso_code, iso_code)
+        candidates = [self.settings.DEFAULT_LANGUAGE_CODE] + list(self.settings.SUPPORTED_LANGUAGES or [])
+        return next((lang for lang in candidates if lang.split("-")[0].lower() == prefix), None)
+
+    async def _whisper_stt(self, samples: np.ndarray, sample_rate: int, language_code_hint: Optional[str]) -> Tuple[str, Optional[str]]:
+        """Whisper on the processed samples, with the language resolved. Failures are logged and returned as ("", None)."""
+        start = time.perf_counter()
+        try:
+            # Same reduced buffer as Google STT (resampled again only if Whisper's configured rate differs)
+            whisper_samples, whisper_rate = samples, sample_rate
+            whisper_target_rate = self._stt_sample_rate(STT_PROVIDER_WHISPER)
+            if whisper_target_rate and whisper_target_rate != sample_rate:
+                whisper_samples, whisper_rate = await run_blocking(
+                    POOL_DSP, resample_pcm16, samples, sample_rate, whisper_target_rate)
+            # Encode the samples once, in-process, in the configured upload format (FLAC by default)
+            encode_start = time.perf_counter()
+            upload_bytes, upload_format = await run_blocking(
+                POOL_DSP, encode_for_upload, whisper_samples, whisper_rate,
+                self.settings.WHISPER_UPLOAD_FORMAT, self.settings.WHISPER_OPUS_BITRATE)
+            metrics.observe("whisper_upload_encode_seconds", time.perf_counter() - encode_start, format=upload_format)
+            metrics.observe("stt_request_bytes", len(upload_bytes), provider=STT_PROVIDER_WHISPER)
+            logger.debug(f"Sending {upload_format} bytes to OpenAI Whisper ({len(upload_bytes)} bytes)")
+            openai_transcript, whisper_iso = await self.openai_client.transcribe_with_language(
+                audio_data=upload_bytes,
+                filename=f"audio.{UPLOAD_FILE_EXTENSIONS[upload_format]}",
+                language_code_hint=language_code_hint # Pass original hint
             )
-            logger.info(
-                f"Audio processing complete. Reconstructed AudioSegment - Rate: {sample_rate} Hz, Channels: 1, SampleWidth: 2")
-
-            # **** RETURN the AudioSegment object and sample rate ****
-            return processed_audio_segment, sample_rate
-
-        except CouldntDecodeError as e:
-            logger.error(f"pydub (ffmpeg) could not decode audio file: {e}", exc_info=True)
-            raise InvalidRequestError(
-                f"Failed to decode audio file. Ensure it's a supported format and ffmpeg is installed/configured. Error: {e}")
-        except Exception as e:
-            logger.error(f"Unexpected error during audio processing/conversion: {e}", exc_info=True)
-            raise InvalidRequestError(f"An unexpected error occurred while processing the audio file: {e}")
+            metrics.observe("stt_provider_seconds", time.perf_counter() - start, provider=STT_PROVIDER_WHISPER)
+            if not openai_transcript:
+                logger.warning("OpenAI Whisper returned an empty transcript.")
+                return "", None
+            transcript = openai_transcript.strip()
+            logger.info(f"OpenAI Whisper result - Lang: {whisper_iso}, Transcript: '{transcript[:50]}...'")
+
+            # Language: the hint, else what Whisper detected; a Translate detection call only if neither maps
+            if language_code_hint:
+                return transcript, language_code_hint
+            language = self._bcp47_for_iso(whisper_iso, language_code_hint)
+            if language is None:
+                logger.info("Whisper language not in SUPPORTED_LANGUAGES, attempting detection on the transcript...")
+                language = await self.translation_service.detect_language_of_text(transcript)
+                if not language:
+                    logger.warning("Could not detect language of fallback transcript. Language will remain None.")
+            return transcript, language
+        except asyncio.CancelledError:
+            raise
+        except ConfigurationError as conf_err: logger.error(f"OpenAI Client config error during fallback: {conf_err}")
+        except TranscriptionError as openai_err: logger.error(f"OpenAI Whisper fallback API call failed: {openai_err}")
+        except Exception as fallback_err: logger.error(f"Unexpected error during OpenAI fallback: {fallback_err}", exc_info=True)
+        return "", None
+
+    async def _recognize_hedged(
+        self, samples: np.ndarray, sample_rate: int, language_code_hint: Optional[str],
+        candidate_languages: Optional[List[str]] = None
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Runs Google STT and, depending on the hedging policy, Whisper concurrently; returns the first
+        acceptable result (Google: transcript and language, Whisper: transcript) and cancels the other.
 
-    async def process_audio(self, audio_data: bytes | str, language_code_hint: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        Whisper is started right away when there is no language hint (STT_HEDGE_WITHOUT_HINT), after
+        Google's STT_HEDGE_QUANTILE latency otherwise, and in any case as soon as Google answers
+        without an acceptable result (the previous sequential fallback).
+        """
+        start = time.perf_counter()
+        google = asyncio.create_task(self._google_stt(samples, sample_rate, language_code_hint, candidate_languages))
+        whisper: Optional[asyncio.Task] = None
+        whisper_started = None
+        google_result: Optional[Tuple[str, Optional[str]]] = None
+        google_seconds = None
+        hedge_reason = None
+
+        def start_whisper(reason: str) -> None:
+            nonlocal whisper, whisper_started, hedge_reason
+            if whisper is None and self.openai_fallback_possible:
+                whisper_started, hedge_reason = time.perf_counter(), reason
+                whisper = asyncio.create_task(self._whisper_stt(samples, sample_rate, language_code_hint))
+                metrics.inc("stt_hedge_total", reason=reason)
+                logger.info(f"Starting Whisper alongside Google STT (reason: {reason}).")
+
+        winner, result = None, ("", None)
+        try:
+            # The hedge delay is inside the try so the finally also cancels Google STT when this
+            # call is cancelled (or times out) while waiting
+            delay = self._hedge_delay(language_code_hint)
+            if delay is not None and delay <= 0:
+                start_whisper(HEDGE_NO_HINT)
+            elif delay is not None:
+                await asyncio.wait({google}, timeout=delay)
+                if not google.done():
+                    start_whisper(HEDGE_SLOW)
+
+            pending = {t for t in (google, whisper) if t is not None}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if google in done:
+                    google_result, google_seconds = google.result(), time.perf_counter() - start
+                    if google_result[0] and google_result[1]:
+                        winner, result = STT_PROVIDER_GOOGLE, google_result
+                        break
+                    logger.warning(f"Google STT failed detection/transcription (Lang: {google_result[1]}, Empty Transcript: {not google_result[0]}).")
+                    start_whisper(HEDGE_UNACCEPTABLE)
+                    if whisper is not None and not whisper.done():
+                        pending.add(whisper)
+                if whisper is not None and whisper in done:
+                    whisper_result = whisper.result()
+                    if whisper_result[0]:
+                        winner, result = STT_PROVIDER_WHISPER, whisper_result
+                        break
+        finally:
+            for task in (google, whisper):
+                if task is not None and not task.done():
+                    task.cancel()  # The loser (or everything, if this call itself was cancelled)
+
+        total = time.perf_counter() - start
+        metrics.inc("stt_provider_wins_total", provider=winner or "none")
+        if winner == STT_PROVIDER_WHISPER and hedge_reason in (HEDGE_NO_HINT, HEDGE_SLOW):
+            # Sequential fallback would have waited for Google (at least until now, exactly if it finished)
+            # and only then started Whisper; estimate it with this Whisper call's duration.
+            sequential = (google_seconds if google_seconds is not None else total) + (time.perf_counter() - whisper_started)
+            metrics.observe("stt_hedge_latency_saved_seconds", max(0.0, sequential - total))
+        if winner == STT_PROVIDER_GOOGLE and whisper is not None:
+            metrics.inc("stt_hedge_wasted_total")  # Whisper call paid for but not used
+        if winner is None:
+            # Nothing acceptable: keep Google's partial answer (e.g. language without transcript), as before
+            result = google_result or ("", None)
+            logger.warning("Neither Google STT nor Whisper produced an acceptable transcript.")
+        logger.info(f"STT winner: {winner or 'none'} in {total:.2f}s (hedge: {hedge_reason or 'none'}).")
+        return result
+
+    async def _recognize_segmented(
+        self, samples: np.ndarray, sample_rate: int, language_code_hint: Optional[str],
+        candidate_languages: Optional[List[str]] = None
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Long recordings: splits the audio at pauses into segments of at most STT_SEGMENT_MAX_SEC,
+        recognises up to STT_SEGMENT_FANOUT of them at a time (each one hedged like a short clip)
+        and joins the transcripts in order. The recording's language is the one detected for most
+        of the audio (by segment duration); disagreeing segments are logged and counted.
+        """
+        bounds = await run_blocking(
+            POOL_DSP, pause_split_points, samples, sample_rate,
+            self.settings.STT_SEGMENT_MAX_SEC, self.settings.STT_SEGMENT_MIN_SEC, self.settings.STT_TRIM_THRESHOLD_DB)
+        semaphore = asyncio.Semaphore(max(1, self.settings.STT_SEGMENT_FANOUT))
+        logger.info(f"Recognising {len(samples) / sample_rate:.1f}s of audio as {len(bounds)} segments "
+                    f"(fan-out {self.settings.STT_SEGMENT_FANOUT}).")
+
+        async def recognize_segment(index: int, start: int, end: int) -> Tuple[str, Optional[str]]:
+            async with semaphore:
+                segment_start = time.perf_counter()
+                result = await self._recognize_hedged(samples[start:end], sample_rate, language_code_hint, candidate_languages)
+                seconds = time.perf_counter() - segment_start
+            metrics.observe("stt_segment_seconds", seconds)
+            logger.info(f"Segment {index + 1}/{len(bounds)} ({start / sample_rate:.1f}-{end / sample_rate:.1f}s): "
+                        f"{seconds:.2f}s, Lang: {result[1]}, Transcript: '{result[0][:30]}...'")
+            return result
+
+        results = await asyncio.gather(*(recognize_segment(i, start, end) for i, (start, end) in enumerate(bounds)))
+        metrics.observe("stt_segments_per_recording", len(bounds))
+
+        # Language reconciliation: duration-weighted vote over the segments that produced text
+        votes: Dict[str, int] = {}
+        spelling: Dict[str, str] = {}
+        for (start, end), (text, language) in zip(bounds, results):
+            if text and language:
+                votes[language.lower()] = votes.get(language.lower(), 0) + (end - start)
+                spelling.setdefault(language.lower(), language)
+        language = spelling[max(votes, key=votes.get)] if votes else None
+        mismatched = [i + 1 for i, (text, lang) in enumerate(results) if text and lang and language and lang.lower() != language.lower()]
+        if mismatched:
+            metrics.inc("stt_segment_language_mismatch_total", len(mismatched))
+            logger.warning(f"Segments {mismatched} were detected in another language than the recording ({language}).")
+
+        transcript = " ".join(text for text, _ in results if text)
+        return transcript, language
+
+    async def process_audio(
+        self,
+        audio_data: bytes | str,
+        language_code_hint: Optional[str] = None,
+        noise_reduction_mode: str = "full", # 'full' or 'cheap' (set by the quality controller under load)
+        content_type: Optional[str] = None, # Upload content type; 'audio/L16; rate=...' skips decoding
+        candidate_languages: Optional[List[str]] = None, # Session's likely languages (None = all supported)
+        session_id: Optional[str] = None, # Uses / updates the session's cabin-noise profile
+        endpoint: str = STT_ENDPOINT_INTERACT # 'probe': speech check for /detect-speech (Google only, no hedging)
+    ) -> Tuple[str, Optional[str]]:
         """
         Processes raw audio data and transcribes it using Google STT,
         with a fallback to OpenAI Whisper and subsequent language detection if needed.
+        Batch mode: the whole clip must have been received; see process_audio_stream for streaming.
+        A 'probe' only asks whether there are words: one Google STT call on the probe route, without
+        Whisper hedging or segmentation.
         """
         logger.info("Starting audio processing and transcription pipeline.")
+        pipeline_start = time.perf_counter()
         transcript = ""
         detected_language_bcp47 = None # Final language to return
-        processed_audio_segment: Optional[AudioSegment] = None
+        processed_samples = None # Mono int16 NumPy samples
         detected_sample_rate = None
 
         try:
-            # 1. Decode and Process Audio -> Get AudioSegment
+            # 1. Decode and Process Audio -> Get int16 samples
             decoded_audio_bytes = self._decode_audio(audio_data)
             if not decoded_audio_bytes: return "", None
-            processed_audio_segment, detected_sample_rate = self._process_and_convert_audio(decoded_audio_bytes)
-            if not processed_audio_segment or not detected_sample_rate: raise TranscriptionError("Failed to prepare audio for transcription.")
-
-            # 2. Attempt Google STT
-            google_transcript = ""
-            google_detected_language = None
-            try:
-                google_stt_bytes = processed_audio_segment.raw_data
-                logger.debug(f"Attempting Google STT - Size: {len(google_stt_bytes)}, Rate: {detected_sample_rate} Hz")
-                google_transcript, google_detected_language = await self.stt_client.transcribe(
-                    audio_data=google_stt_bytes,
-                    sample_rate_hertz=detected_sample_rate,
-                    input_encoding=TARGET_ENCODING,
-                    language_code_hint=language_code_hint
-                )
-                logger.info(f"Google STT result - Detected Lang: {google_detected_language}, Transcript: '{google_transcript[:50]}...'")
-            except TranscriptionError as google_err:
-                logger.error(f"Google STT transcription failed: {google_err}")
-            except Exception as google_ex:
-                logger.error(f"Unexpected error during Google STT call: {google_ex}", exc_info=True)
-
-            # 3. Determine if Fallback Needed
-            # Fallback if Google failed OR Google succeeded but didn't detect language OR Google transcript is empty
-            needs_fallback = (google_detected_language is None) or (not google_transcript)
-
-            if needs_fallback:
-                logger.warning(f"Google STT failed detection/transcription (Lang: {google_detected_language}, Empty Transcript: {not google_transcript}). Attempting OpenAI Whisper fallback.")
-
-                if self.openai_fallback_possible:
-                    openai_transcript = None
-                    try:
-                        # Export to WAV for OpenAI
-                        wav_exporter = processed_audio_segment.export(format="wav")
-                        openai_wav_bytes = wav_exporter.read()
-                        wav_exporter.close()
-
-                        if not openai_wav_bytes:
-                             logger.error("Failed to export processed audio to WAV bytes for OpenAI.")
-                        else:
-                             dummy_filename = "audio.wav"
-                             logger.debug(f"Sending WAV bytes to OpenAI Whisper ({len(openai_wav_bytes)} bytes)")
-                             openai_transcript = await self.openai_client.transcribe(
-                                 audio_data=openai_wav_bytes,
-                                 filename=dummy_filename,
-                                 language_code_hint=language_code_hint # Pass original hint
-                             )
-
-                             if openai_transcript:
-                                 logger.info(f"OpenAI Whisper fallback successful. Transcript: '{openai_transcript[:50]}...'")
-                                 transcript = openai_transcript.strip() # Use Whisper transcript
-
-                                 # **** Attempt to determine language of Whisper transcript ****
-                                 if language_code_hint:
-                                     logger.info(f"Using provided language hint '{language_code_hint}' for fallback transcript.")
-                                     detected_language_bcp47 = language_code_hint
-                                 else:
-                                     logger.info("No language hint provided, attempting detection on fallback transcript...")
-                                     detected_language_bcp47 = await self.translation_service.detect_language_of_text(transcript)
-                                     if not detected_language_bcp47:
-                                         logger.warning("Could not detect language of fallback transcript. Language will remain None.")
-                                         # Keep detected_language_bcp47 as None
-                                 # **** End language determination ****
-
-                             else:
-                                 logger.warning("OpenAI Whisper fallback also returned empty transcript. Falling back to Google's (empty) result.")
-                                 transcript = google_transcript.strip() if google_transcript else "" # Use empty google transcript
-                                 detected_language_bcp47 = google_detected_language # Will be None
-
-                    except ConfigurationError as conf_err: logger.error(f"OpenAI Client config error during fallback: {conf_err}")
-                    except TranscriptionError as openai_err: logger.error(f"OpenAI Whisper fallback API call failed: {openai_err}")
-                    except Exception as fallback_err: logger.error(f"Unexpected error during OpenAI fallback: {fallback_err}", exc_info=True)
-
-                    # If any error occurred during fallback, ensure we use Google's (failed) results
-                    if detected_language_bcp47 is None and transcript == "": # Check if fallback didn't successfully set results
-                        transcript = google_transcript.strip() if google_transcript else ""
-                        detected_language_bcp47 = google_detected_language
-
-                else: # Fallback not possible
-                    logger.warning("OpenAI fallback skipped: Client not configured or enabled.")
-                    transcript = google_transcript.strip() if google_transcript else ""
-                    detected_language_bcp47 = google_detected_language
-
-            else: # Google STT was successful and detected language
-                transcript = google_transcript.strip() if google_transcript else ""
-                detected_language_bcp47 = google_detected_language
+            processed_samples, detected_sample_rate = await self._process_and_convert_audio(
+                decoded_audio_bytes, noise_reduction_mode, content_type, session_id)
+            if processed_samples is None or not detected_sample_rate: raise TranscriptionError("Failed to prepare audio for transcription.")
+
+            # 2./3. Google STT, raced against Whisper when it is slow or there is no language hint
+            # (long recordings: per segment, several segments concurrently)
+            if endpoint == STT_ENDPOINT_PROBE:
+                transcript, detected_language_bcp47 = await self._google_stt(
+                    processed_samples, detected_sample_rate, language_code_hint, candidate_languages, endpoint=endpoint)
+                logger.info(f"STT probe result - Transcript: '{transcript[:50]}...'")
+                return transcript, detected_language_bcp47
+            if (self.settings.STT_SEGMENTATION_ENABLED
+                    and len(processed_samples) > self.settings.STT_SEGMENT_MAX_SEC * detected_sample_rate):
+                transcript, detected_language_bcp47 = await self._recognize_segmented(
+                    processed_samples, detected_sample_rate, language_code_hint, candidate_languages)
+            else:
+                transcript, detected_language_bcp47 = await self._recognize_hedged(
+                    processed_samples, detected_sample_rate, language_code_hint, candidate_languages)
 
             # 4. Return Final Result
             logger.info(f"Final transcription result - Detected Lang: {detected_language_bcp47}, Transcript: '{transcript[:50]}...'")
+            # In batch mode the driver stopped talking before this call, so the whole call is the wait
+            metrics.observe("stt_time_to_final_seconds", time.perf_counter() - pipeline_start, mode=STT_MODE_BATCH)
             return transcript, detected_language_bcp47
 
         except InvalidRequestError as e:
@@ -319,4 +534,72 @@ class TranscriptionService:
             raise e
         except Exception as e:
              logger.error(f"Unexpected error during transcription pipeline setup: {e}", exc_info=True)
-             raise TranscriptionError(f"An unexpected error occurred during transcription pipeline setup: {e}", original_exception=e)
\ No newline at end of file
+             raise TranscriptionError(f"An unexpected error occurred during transcription pipeline setup: {e}", original_exception=e)
+
+    async def stream_transcripts(
+        self,
+        audio_chunks: AsyncIterator[bytes],
+        sample_rate_hertz: int,
+        language_code_hint: Optional[str] = None,
+        candidate_languages: Optional[List[str]] = None
+    ) -> AsyncIterator[SttStreamResult]:
+        """
+        Streaming mode: transcribes mono LINEAR16 chunks while they arrive (WebSocket frames, a chunked
+        upload) and yields interim and final results. The audio is expected at the STT rate already,
+        and noise reduction / silence trimming are not applied (both need the whole utterance).
+        Raises TranscriptionError / InvalidRequestError like process_audio; there is no Whisper
+        fallback here because the audio is not retained.
+        """
+        last_final: Optional[SttStreamResult] = None
+        async for result in self.stt_client.streaming_transcribe(
+            audio_chunks, sample_rate_hertz, TARGET_ENCODING, language_code_hint,
+            interim_results=self.settings.STT_STREAMING_INTERIM_RESULTS,
+            candidate_languages=candidate_languages
+        ):
+            if result.is_final:
+                last_final = result
+            yield result
+        if last_final is not None and last_final.input_closed_ms is not None:
+            # Time from the end of the audio (end of speech) to the last final transcript
+            metrics.observe("stt_time_to_final_seconds", last_final.input_closed_ms / 1000.0, mode=STT_MODE_STREAMING)
+            logger.info(f"Streaming STT final transcript {last_final.input_closed_ms:.0f} ms after end of audio.")
+
+    async def process_audio_stream(
+        self,
+        audio_chunks: AsyncIterator[bytes],
+        sample_rate_hertz: int,
+        language_code_hint: Optional[str] = None,
+        on_result: Optional[Callable[[SttStreamResult], Awaitable[None]]] = None,
+        candidate_languages: Optional[List[str]] = None
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Streaming counterpart of process_audio: same return value (transcript, detected language),
+        but recognition runs while the audio is still arriving. `on_result` receives every interim
+        and final result as it comes in (e.g. to push live captions to the client).
+        A stream cannot be re-run with more languages, so a low-confidence result of a narrowed
+        `candidate_languages` call is discarded ("", None) and the caller falls back to batch STT.
+        """
+        finals = []
+        detected_language_bcp47 = None
+        confidences = []
+        async for result in self.stream_transcripts(audio_chunks, sample_rate_hertz, language_code_hint, candidate_languages):
+            if on_result is not None:
+                await on_result(result)
+            if result.is_final:
+                if result.transcript.strip():
+                    finals.append(result.transcript.strip())
+                    confidences.append(result.confidence)
+                detected_language_bcp47 = detected_language_bcp47 or result.language_code
+        transcript = " ".join(finals)
+        if transcript and not detected_language_bcp47:
+            detected_language_bcp47 = language_code_hint
+        if candidate_languages:
+            confidence = min((c for c in confidences if c is not None), default=None)
+            if not self._narrowed_result_acceptable(transcript, detected_language_bcp47, confidence):
+                logger.info(f"Low-confidence streaming result with narrowed languages {candidate_languages} "
+                            f"(Confidence: {confidence}); leaving it to batch STT.")
+                metrics.inc("stt_language_search_total", scope="widened")
+                return "", None
+            metrics.inc("stt_language_search_total", scope="narrowed")
+        logger.info(f"Streaming transcription result - Detected Lang: {detected_language_bcp47}, Transcript: '{transcript[:50]}...'")
+        return transcript, detected_language_bcp47
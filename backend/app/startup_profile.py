@@ -0,0 +1,115 @@
+# backend/startup_profile.py
+"""
+Startup profiler: `python -m app.startup_profile` (run from backend/).
+
+Prints
+  * the slowest modules imported by `import app.main` (cumulative, from `python -X importtime`),
+  * which heavy third-party packages were imported eagerly (they should all be lazy),
+  * per-client / per-service construction time from the ServiceContainer,
+  * optionally (--warm-up) how long the background warm-up of each lazy subsystem takes.
+
+Exit code is 1 with --strict when a heavy package is imported eagerly or `import app.main`
+takes longer than --max-import-ms, so it can be used as a CI check for startup regressions.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# Packages that must not be imported by `import app.main`; they are loaded through core/lazy_imports.py
+HEAVY_MODULES = [
+    "torch", "ultralytics", "mediapipe", "cv2",  # vision
+    "librosa", "noisereduce", "soundfile", "av",  # DSP
+    "googlemaps",  # Maps legacy client
+    "openai",  # Whisper fallback
+    "pycountry",  # NLU language names
+]
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def _profile_imports(target: str) -> Tuple[List[Tuple[str, int, int]], float]:
+    """Imports `target` in a fresh interpreter with -X importtime. Returns ([(module, self_us, cumulative_us)], wall seconds)."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, cwd=os.getcwd(),
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:], file=sys.stderr)
+        raise SystemExit(f"`import {target}` failed (exit code {proc.returncode}).")
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return rows, wall
+
+
+def _print_table(title: str, rows: List[Tuple[str, float]], unit: str = "ms") -> None:
+    print(f"\n{title}")
+    print("-" * len(title))
+    if not rows:
+        print("  (none)")
+    for name, value in rows:
+        print(f"  {value:10.1f} {unit}  {name}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Profile backend import and client initialisation time.")
+    parser.add_argument("--target", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=25, help="Number of slowest modules to list")
+    parser.add_argument("--warm-up", action="store_true", help="Also time the background warm-up of lazy subsystems")
+    parser.add_argument("--max-import-ms", type=float, default=None, help="Fail (--strict) if the import takes longer")
+    parser.add_argument("--strict", action="store_true", help="Exit non-zero on eager heavy imports or a slow import")
+    args = parser.parse_args()
+
+    # 1. Import profile in a clean interpreter, so nothing is cached from this process
+    rows, wall = _profile_imports(args.target)
+    by_cumulative = sorted(rows, key=lambda r: r[2], reverse=True)
+    total_us = next((cum for name, _, cum in rows if name == args.target), 0)
+    _print_table(f"Slowest imports under `import {args.target}` (cumulative)",
+                 [(name, cum / 1000.0) for name, _, cum in by_cumulative[:args.top]])
+
+    imported = {name for name, _, _ in rows}
+    eager_heavy = [m for m in HEAVY_MODULES if m in imported]
+    _print_table("Heavy packages imported eagerly (should be empty)",
+                 [(m, next(cum for name, _, cum in rows if name == m) / 1000.0) for m in eager_heavy])
+
+    # 2. Client / service construction (in this process; same code path as the lifespan)
+    from app.core.config import settings
+    from app.core.model_registry import ModelRegistry
+    from app.api.container import ServiceContainer
+
+    container = ServiceContainer(settings, model_registry=ModelRegistry(settings))
+    _print_table("Client / service init time",
+                 sorted(((n, t * 1000.0) for n, t in container.init_times.items()), key=lambda r: r[1], reverse=True))
+
+    # 3. Optional: what the background warm-up pays for
+    if args.warm_up:
+        from app.core import lazy_imports
+        warmup_times: Dict[str, float] = container.warm_up()
+        _print_table("Background warm-up time (subsystem / client)",
+                     sorted(((n, t * 1000.0) for n, t in warmup_times.items()), key=lambda r: r[1], reverse=True))
+        _print_table("Lazily imported modules (first import)",
+                     [(f"{name} [{info['subsystem']}]", info["seconds"] * 1000.0)
+                      for name, info in lazy_imports.import_times().items()])
+
+    print(f"\n`import {args.target}`: {total_us / 1000.0:.1f} ms (interpreter wall time {wall * 1000.0:.1f} ms)")
+
+    failed = False
+    if eager_heavy:
+        print(f"REGRESSION: heavy packages imported at startup: {', '.join(eager_heavy)}")
+        failed = True
+    if args.max_import_ms is not None and total_us / 1000.0 > args.max_import_ms:
+        print(f"REGRESSION: import took {total_us / 1000.0:.1f} ms (limit {args.max_import_ms:.1f} ms)")
+        failed = True
+    return 1 if (failed and args.strict) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# backend/benchmarks/bench_audio_memory.py
+"""
+Benchmark: peak Python/NumPy allocations (tracemalloc) per /assistant/interact upload, from the
+upload bytes to the STT request payload.
+
+Two pipelines are measured on 16-bit WAV uploads of 5 s / 30 s / 60 s:
+
+  legacy   - the copy chain of the pydub-based path, reproduced with NumPy:
+             array.array samples -> np.array -> astype(int16) -> float32 -> NR working copy ->
+             clipped float -> int16 -> tobytes() -> AudioSegment.raw_data copy -> request bytes
+  current  - decode_audio() straight into an int16 array -> one float32 working buffer with in-place
+             conversions (process_pcm16_in_place) -> memoryview -> request bytes
+
+Noise reduction itself (noisereduce's STFTs) is left out by default so the numbers show the
+buffer handling only; pass --noise-reduction to include it in both pipelines.
+
+Usage (from backend/):
+    python -m benchmarks.bench_audio_memory
+    python -m benchmarks.bench_audio_memory --durations 5 30 60 --sample-rate 44100 --noise-reduction
+"""
+import argparse
+import array
+import io
+import tracemalloc
+import wave
+
+import numpy as np
+
+from app.core.audio_decoding import decode_audio
+from app.core.audio_enhancement import apply_tunable_noise_reduction, process_pcm16_in_place
+
+from .bench_dsp_offload import synthetic_wav
+
+MAX_VAL = np.iinfo(np.int16).max
+
+
+def legacy_pipeline(upload: bytes, noise_reduction: bool) -> bytes:
+    with wave.open(io.BytesIO(upload), "rb") as wav:
+        sr = wav.getframerate()
+        raw = wav.readframes(wav.getnframes())  # pydub keeps the decoded PCM as bytes
+    samples = np.array(array.array("h", raw)).astype(np.int16)  # get_array_of_samples() -> np.array -> astype
+    samples_float = samples.astype(np.float32) / MAX_VAL
+    processed = samples_float.copy()  # NR working copy
+    if noise_reduction:
+        processed = apply_tunable_noise_reduction(processed, sr)
+    processed_int16 = np.clip(processed * MAX_VAL, -MAX_VAL, MAX_VAL).astype(np.int16)
+    segment_data = processed_int16.tobytes()  # AudioSegment(data=...)
+    raw_data = bytes(bytearray(segment_data))  # AudioSegment.raw_data
+    return bytes(raw_data)  # RecognitionAudio(content=...)
+
+
+def current_pipeline(upload: bytes, noise_reduction: bool) -> bytes:
+    samples, sr, _ = decode_audio(upload)
+    samples = np.require(samples, dtype=np.int16, requirements=["C", "W"])
+    if noise_reduction:
+        process_pcm16_in_place(samples, sr)
+    else:
+        # Same buffer handling as process_pcm16_in_place, minus the noisereduce call
+        work = np.empty(len(samples), dtype=np.float32)
+        np.multiply(samples, np.float32(1.0 / MAX_VAL), out=work, casting="unsafe")
+        np.multiply(work, MAX_VAL, out=work)
+        np.clip(work, -MAX_VAL, MAX_VAL, out=work)
+        np.copyto(samples, work, casting="unsafe")
+    view = memoryview(samples).cast("B")
+    return view.tobytes()  # The one copy at the protobuf boundary (see GoogleSttClient.transcribe)
+
+
+def measure(pipeline, upload: bytes, noise_reduction: bool) -> int:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    payload = pipeline(upload, noise_reduction)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del payload
+    return peak - baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=float, nargs="+", default=[5.0, 30.0, 60.0], help="Upload lengths in seconds")
+    parser.add_argument("--sample-rate", type=int, default=44100)
+    parser.add_argument("--noise-reduction", action="store_true", help="Include noisereduce in both pipelines")
+    args = parser.parse_args()
+
+    # Import/initialise the decoders once so their one-off allocations are not counted
+    current_pipeline(synthetic_wav(1.0, args.sample_rate), args.noise_reduction)
+
+    print(f"{'duration s':>10} {'input MB':>9} {'legacy MB':>10} {'x input':>8} {'current MB':>11} {'x input':>8}")
+    for seconds in args.durations:
+        upload = synthetic_wav(seconds, args.sample_rate)
+        legacy = measure(legacy_pipeline, upload, args.noise_reduction)
+        current = measure(current_pipeline, upload, args.noise_reduction)
+        mb = 1024 * 1024
+        print(f"{seconds:>10.0f} {len(upload) / mb:>9.2f} {legacy / mb:>10.2f} {legacy / len(upload):>8.1f} "
+              f"{current / mb:>11.2f} {current / len(upload):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
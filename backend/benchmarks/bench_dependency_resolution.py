@@ -0,0 +1,126 @@
+# backend/benchmarks/bench_dependency_resolution.py
+"""
+Micro-benchmark: dependency-resolution overhead per /assistant/interact call.
+
+Compares the old per-request wiring (every Depends() built a fresh TranslationService,
+NluService, SynthesisService, NavigationService, SafetyService, TranscriptionService and
+ConversationService) with the application-scoped ServiceContainer. Both variants are
+mounted on a bare FastAPI app whose handler returns immediately, so the difference
+between the two timings is the dependency-resolution cost.
+
+Needs the same credentials/.env as the app (the real clients are constructed once).
+
+Usage (from backend/):
+    python -m benchmarks.bench_dependency_resolution --requests 500
+    python -m benchmarks.bench_dependency_resolution --legacy-load-models  # pre-registry behaviour
+"""
+import argparse
+import statistics
+import time
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.container import ServiceContainer
+from app.api.dependencies import get_conversation_service
+from app.core.config import settings
+from app.core.model_registry import ModelRegistry
+from app.services.conversation_service import ConversationService
+from app.services.navigation_service import NavigationService
+from app.services.nlu_service import NluService
+from app.services.safety_service import SafetyService
+from app.services.synthesis_service import SynthesisService
+from app.services.transcription_service import TranscriptionService
+from app.services.translation_service import TranslationService
+
+
+def build_app(container: ServiceContainer, registry: ModelRegistry, legacy_load_models: bool) -> FastAPI:
+    app = FastAPI()
+    app.state.container = container
+    app.state.model_registry = registry
+
+    # --- Old wiring: a new service graph per request ---
+    def legacy_translation() -> TranslationService:
+        return TranslationService(translate_client=container.translate_client, settings=settings)
+
+    def legacy_transcription(translation: TranslationService = Depends(legacy_translation)) -> TranscriptionService:
+        return TranscriptionService(stt_client=container.stt_client, openai_client=container.openai_client,
+                                    translation_service=translation, settings=settings)
+
+    def legacy_safety() -> SafetyService:
+        per_request_registry = registry
+        if legacy_load_models:
+            # Before the model registry, every SafetyService deserialised its own models
+            per_request_registry = ModelRegistry(settings)
+            per_request_registry.load()
+        return SafetyService(settings=settings, twilio_client=container.twilio_client, model_registry=per_request_registry)
+
+    def legacy_conversation(
+        transcription: TranscriptionService = Depends(legacy_transcription),
+        translation: TranslationService = Depends(legacy_translation),
+        safety: SafetyService = Depends(legacy_safety),
+    ) -> ConversationService:
+        return ConversationService(
+            transcription_service=transcription,
+            translation_service=translation,
+            nlu_service=NluService(gemini_client=container.gemini_client, settings=settings),
+            synthesis_service=SynthesisService(tts_client=container.tts_client, settings=settings),
+            navigation_service=NavigationService(maps_client=container.maps_client, settings=settings),
+            safety_service=safety,
+            settings=settings,
+        )
+
+    @app.get("/legacy")
+    async def legacy(service: ConversationService = Depends(legacy_conversation)):
+        return {}
+
+    @app.get("/container")
+    async def shared(service: ConversationService = Depends(get_conversation_service)):
+        return {}
+
+    return app
+
+
+def measure(client: TestClient, path: str, n: int) -> list:
+    for _ in range(min(20, n)):  # Warm-up
+        client.get(path)
+    timings = []
+    for _ in range(n):
+        start = time.perf_counter()
+        response = client.get(path)
+        timings.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return timings
+
+
+def report(label: str, timings: list) -> None:
+    ms = sorted(t * 1000 for t in timings)
+    p95 = ms[int(0.95 * (len(ms) - 1))]
+    print(f"{label:<12} mean {statistics.mean(ms):8.3f} ms   p50 {statistics.median(ms):8.3f} ms   p95 {p95:8.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--legacy-load-models", action="store_true",
+                        help="Load the YOLO/FaceMesh models per request in the legacy path (slow; use few requests).")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(settings)
+    container = ServiceContainer(settings, model_registry=registry)
+    if container.conversation_service is None:
+        raise SystemExit("ConversationService could not be built - check credentials/.env.")
+
+    client = TestClient(build_app(container, registry, args.legacy_load_models))
+    legacy = measure(client, "/legacy", args.requests)
+    shared = measure(client, "/container", args.requests)
+
+    print(f"Dependency resolution per request ({args.requests} requests):")
+    report("per-request", legacy)
+    report("container", shared)
+    saved = (statistics.mean(legacy) - statistics.mean(shared)) * 1000
+    print(f"Overhead removed per /assistant/interact call: {saved:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
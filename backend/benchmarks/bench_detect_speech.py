@@ -0,0 +1,171 @@
+# backend/benchmarks/bench_detect_speech.py
+"""
+Benchmark: accuracy and latency of the local speech-activity detector behind /assistant/detect-speech.
+
+Each clip runs through the same path as the endpoint (SpeechDetectionService.analyse: decode ->
+16 kHz -> detect_speech_activity), and the table reports accuracy per condition plus overall
+precision/recall and per-clip latency.
+
+Clips:
+  --clips-dir DIR   Recorded clips (any format decode_audio reads). The label comes from the parent
+                    directory or the file name prefix: 'speech' or 'noise' (e.g. DIR/speech/a.m4a,
+                    DIR/noise_highway_01.wav).
+  (default)         A synthetic in-cabin set: engine harmonics, road rumble, wind/AC hiss,
+                    indicator ticks and a mix, alone and with a voiced speech-like signal at
+                    several SNRs.
+
+Usage (from backend/):
+    python -m benchmarks.bench_detect_speech
+    python -m benchmarks.bench_detect_speech --clips-dir ~/cabin_clips --seconds 3
+"""
+import argparse
+import os
+import statistics
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.core.audio_decoding import encode_wav_pcm16
+from app.core.config import settings
+from app.services.speech_detection_service import SpeechDetectionService
+
+SR = 16000
+
+
+# --- Synthetic in-cabin audio ---
+
+def engine_noise(n: int, rng) -> np.ndarray:
+    t = np.arange(n) / SR
+    rpm_hz = rng.uniform(25, 45)  # Firing frequency at ~1500-2700 rpm
+    wobble = 1 + 0.02 * np.sin(2 * np.pi * rng.uniform(0.1, 0.5) * t)
+    return sum(np.sin(2 * np.pi * k * rpm_hz * wobble * t + rng.uniform(0, 6.3)) / k for k in range(1, 7))
+
+
+def road_noise(n: int, rng) -> np.ndarray:
+    brown = np.cumsum(rng.normal(0, 1, n))
+    brown -= np.convolve(brown, np.ones(400) / 400, mode="same")  # Remove the DC drift
+    return brown / (np.std(brown) + 1e-9)
+
+
+def wind_noise(n: int, rng) -> np.ndarray:
+    white = rng.normal(0, 1, n)
+    gust = 1 + 0.5 * np.sin(2 * np.pi * rng.uniform(0.2, 1.0) * np.arange(n) / SR)
+    return white * gust
+
+
+def indicator_clicks(n: int, rng) -> np.ndarray:
+    """Turn-signal relay ticks (~1.5 Hz) over road rumble: loud, broadband, but short."""
+    clicks = np.zeros(n)
+    tick = np.hanning(int(0.015 * SR)) * np.sin(2 * np.pi * 2500 * np.arange(int(0.015 * SR)) / SR)
+    for start in range(int(rng.uniform(0, 0.3) * SR), n - len(tick), int(SR / 1.5)):
+        clicks[start:start + len(tick)] += tick * 20
+    return clicks + road_noise(n, rng)
+
+
+def cabin_noise(n: int, rng, kind: str) -> np.ndarray:
+    parts = {"engine": [engine_noise], "road": [road_noise], "wind": [wind_noise],
+             "indicator": [indicator_clicks], "cabin": [engine_noise, road_noise, wind_noise]}[kind]
+    noise = sum(x / np.std(x) for x in (p(n, rng) for p in parts))
+    return noise / np.std(noise)
+
+
+def voiced_speech(n: int, rng) -> np.ndarray:
+    """Syllable-rate bursts of a harmonic source shaped by two formants (not intelligible, but speech-like)."""
+    t = np.arange(n) / SR
+    f0 = rng.uniform(100, 220) * (1 + 0.1 * np.sin(2 * np.pi * 0.7 * t))
+    phase = 2 * np.pi * np.cumsum(f0) / SR
+    f1, f2 = rng.uniform(450, 800), rng.uniform(1100, 2200)
+    voice = np.zeros(n)
+    for k in range(1, 30):
+        fk = k * f0.mean()
+        if fk > 4000:
+            break
+        gain = np.exp(-((fk - f1) / 250) ** 2) + 0.6 * np.exp(-((fk - f2) / 350) ** 2) + 0.05
+        voice += gain * np.sin(k * phase)
+    envelope = np.zeros(n)
+    pos = int(rng.uniform(0.2, 0.6) * SR)
+    while pos < n - SR // 10:
+        syllable = int(rng.uniform(0.12, 0.3) * SR)
+        envelope[pos:pos + syllable] = np.hanning(len(envelope[pos:pos + syllable]))
+        pos += syllable + int(rng.uniform(0.03, 0.25) * SR)
+    return voice * envelope / (np.std(voice * envelope) + 1e-9)
+
+
+def synthetic_clips(seconds: float, per_condition: int, seed: int = 0) -> List[Tuple[str, bool, bytes]]:
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SR)
+    clips = []
+    for kind in ("engine", "road", "wind", "indicator", "cabin"):
+        for _ in range(per_condition):
+            level_db = rng.uniform(-45, -20)  # Cabin noise level (dBFS)
+            noise = cabin_noise(n, rng, kind) * 10 ** (level_db / 20)
+            clips.append((f"noise:{kind}", False, noise))
+            for snr_db in (0, 5, 10, 20):
+                speech = voiced_speech(n, rng)
+                # SNR measured over the active speech frames, as a listener would perceive it
+                active_rms = np.sqrt(np.mean(speech[np.abs(speech) > 0.1] ** 2))
+                mix = noise + speech / active_rms * 10 ** ((level_db + snr_db) / 20)
+                clips.append((f"speech:{kind}@{snr_db}dB", True, mix))
+    out = []
+    for name, label, audio in clips:
+        pcm = (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+        out.append((name, label, encode_wav_pcm16(pcm, SR)))
+    return out
+
+
+def recorded_clips(directory: str) -> List[Tuple[str, bool, bytes]]:
+    clips = []
+    for root, _, files in os.walk(os.path.expanduser(directory)):
+        for name in sorted(files):
+            parent = os.path.basename(root).lower()
+            lower = name.lower()
+            if parent == "speech" or lower.startswith("speech"):
+                label = True
+            elif parent == "noise" or lower.startswith("noise"):
+                label = False
+            else:
+                continue
+            with open(os.path.join(root, name), "rb") as f:
+                clips.append((f"{'speech' if label else 'noise'}:{parent}", label, f.read()))
+    return clips
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips-dir", default=None, help="Directory of labelled recordings")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Synthetic clip length (the frontend sends ~3 s chunks)")
+    parser.add_argument("--per-condition", type=int, default=10, help="Synthetic clips per noise type and SNR")
+    args = parser.parse_args()
+
+    clips = recorded_clips(args.clips_dir) if args.clips_dir else synthetic_clips(args.seconds, args.per_condition)
+    if not clips:
+        raise SystemExit("No labelled clips found.")
+    service = SpeechDetectionService(settings)
+    service.analyse(clips[0][2])  # Warm up imports
+
+    per_condition: Dict[str, List[bool]] = defaultdict(list)
+    latencies, tp, fp, fn, tn = [], 0, 0, 0, 0
+    for name, label, data in clips:
+        start = time.perf_counter()
+        result = service.analyse(data)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        per_condition[name].append(result.speech_detected == label)
+        tp += label and result.speech_detected
+        fn += label and not result.speech_detected
+        fp += (not label) and result.speech_detected
+        tn += (not label) and not result.speech_detected
+
+    print(f"{'condition':<24} {'clips':>6} {'accuracy':>9}")
+    for name, outcomes in per_condition.items():
+        print(f"{name:<24} {len(outcomes):>6} {100.0 * sum(outcomes) / len(outcomes):>8.1f}%")
+    latencies.sort()
+    print(f"\nOverall accuracy {100.0 * (tp + tn) / len(clips):.1f}%  precision {100.0 * tp / max(1, tp + fp):.1f}%  "
+          f"recall {100.0 * tp / max(1, tp + fn):.1f}%  ({len(clips)} clips)")
+    print(f"Latency per clip: p50 {statistics.median(latencies):.2f} ms, "
+          f"p99 {latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# backend/benchmarks/bench_dsp_offload.py
+"""
+Benchmark: event-loop lag and throughput of the audio DSP stage under N concurrent uploads.
+
+Runs the DSP stage of /assistant/interact (int16 -> float32 -> tunable noise reduction -> int16)
+for N concurrent uploads in three modes:
+
+  inline   - on the event loop thread (the behaviour before the DSP process pool)
+  thread   - in the 'dsp' thread pool (DSP_PROCESS_WORKERS = 0)
+  process  - in the DSP process pool with shared-memory transfer
+
+While the uploads run, a ticker coroutine sleeps 10 ms in a loop and records how late it wakes
+up; that lateness is the event-loop lag every other request in the worker would see.
+
+The Google STT/Gemini/TTS calls of a real /interact request are network-bound and unaffected by
+this change, so they are left out; only the stage that moved is exercised.
+
+Usage (from backend/):
+    python -m benchmarks.bench_dsp_offload --uploads 8 --seconds 10
+    python -m benchmarks.bench_dsp_offload --wav some_recording.wav --workers 4
+"""
+import argparse
+import asyncio
+import io
+import statistics
+import time
+import wave
+from typing import List, Tuple
+
+import numpy as np
+
+from app.core.audio_enhancement import process_pcm16_in_place
+from app.core.config import settings
+from app.core.dsp_pool import DspProcessPool
+from app.core.executors import run_blocking, POOL_DSP
+from app.models.internal import AudioProcessingOptions
+
+TICK_SEC = 0.01
+
+
+def synthetic_upload(seconds: float, sr: int, seed: int = 0) -> np.ndarray:
+    """Speech-like bursts (harmonic tone, 2.5 Hz syllable rate) over broadband road noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    envelope = (np.sin(2 * np.pi * 2.5 * t) > 0.3).astype(np.float32)
+    voice = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((180, 360, 540, 720)))
+    noise = rng.normal(0, 0.25, len(t))
+    return (np.clip(0.5 * envelope * voice + noise, -1, 1) * 20000).astype(np.int16)
+
+
+def synthetic_wav(seconds: float, sr: int) -> bytes:
+    """synthetic_upload() as a 16-bit mono WAV file (what a client would upload)."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sr)
+        wav.writeframes(synthetic_upload(seconds, sr).tobytes())
+    return buffer.getvalue()
+
+
+def load_wav(path: str) -> Tuple[np.ndarray, int]:
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise SystemExit("Only 16-bit PCM WAV files are supported by this benchmark.")
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        if wav.getnchannels() > 1:
+            samples = samples.reshape(-1, wav.getnchannels())[:, 0]
+        return samples.copy(), wav.getframerate()
+
+
+async def _ticker(stop: asyncio.Event, lags: List[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + TICK_SEC
+        await asyncio.sleep(TICK_SEC)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def run_mode(mode: str, samples: np.ndarray, sr: int, uploads: int, pool: DspProcessPool) -> dict:
+    options = AudioProcessingOptions(
+        prop_decrease=settings.NR_PROP_DECREASE, time_smooth_ms=settings.NR_TIME_SMOOTH_MS, n_passes=settings.NR_PASSES)
+
+    async def one_upload():
+        if mode == "inline":
+            await asyncio.sleep(0)  # Yield once, as the old handler did before its DSP call
+            process_pcm16_in_place(samples.copy(), sr, **options.model_dump())
+        elif mode == "thread":
+            await run_blocking(POOL_DSP, process_pcm16_in_place, samples.copy(), sr, **options.model_dump())
+        else:
+            await pool.process(samples.copy(), sr, options)
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(stop, lags))
+    await asyncio.sleep(5 * TICK_SEC)
+    start = time.perf_counter()
+    await asyncio.gather(*(one_upload() for _ in range(uploads)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+
+    lags_ms = sorted(lag * 1000.0 for lag in lags) or [0.0]
+    return {
+        "mode": mode,
+        "elapsed_sec": elapsed,
+        "uploads_per_sec": uploads / elapsed,
+        "lag_p50_ms": statistics.median(lags_ms),
+        "lag_p99_ms": lags_ms[min(len(lags_ms) - 1, int(0.99 * len(lags_ms)))],
+        "lag_max_ms": lags_ms[-1],
+    }
+
+
+async def main_async(args) -> None:
+    if args.wav:
+        samples, sr = load_wav(args.wav)
+    else:
+        sr = args.sample_rate
+        samples = synthetic_upload(args.seconds, sr)
+    print(f"Upload: {len(samples) / sr:.1f}s @ {sr} Hz, {args.uploads} concurrent uploads, {args.workers} DSP processes")
+
+    pool_settings = settings.model_copy(update={"DSP_PROCESS_WORKERS": args.workers})
+    pool = DspProcessPool(pool_settings)
+    await asyncio.get_running_loop().run_in_executor(None, pool.warm_up)
+    # Warm the in-process DSP imports too, so 'inline'/'thread' do not pay for librosa's import
+    process_pcm16_in_place(samples[: sr].copy(), sr)
+
+    print(f"{'mode':<8} {'elapsed s':>10} {'uploads/s':>10} {'lag p50 ms':>11} {'lag p99 ms':>11} {'lag max ms':>11}")
+    try:
+        for mode in args.modes:
+            r = await run_mode(mode, samples, sr, args.uploads, pool)
+            print(f"{r['mode']:<8} {r['elapsed_sec']:>10.2f} {r['uploads_per_sec']:>10.2f} "
+                  f"{r['lag_p50_ms']:>11.1f} {r['lag_p99_ms']:>11.1f} {r['lag_max_ms']:>11.1f}")
+    finally:
+        pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=8, help="Concurrent uploads")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Length of the synthetic upload")
+    parser.add_argument("--sample-rate", type=int, default=44100, help="Sample rate of the synthetic upload")
+    parser.add_argument("--wav", default=None, help="Use a 16-bit PCM WAV file instead of synthetic audio")
+    parser.add_argument("--workers", type=int, default=max(1, settings.DSP_PROCESS_WORKERS), help="DSP worker processes")
+    parser.add_argument("--modes", nargs="+", default=["inline", "thread", "process"], choices=["inline", "thread", "process"])
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
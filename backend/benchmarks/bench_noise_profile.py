@@ -0,0 +1,110 @@
+# backend/benchmarks/bench_noise_profile.py
+"""
+Benchmark: noise-profile estimation for the stationary gate, concatenated noise clip vs strided
+spectral statistics, on mostly-silent clips of 1 s to 60 s (16 kHz, speech in the middle 20%, at least 1 s).
+
+  legacy   - the previous estimator: every non-speech frame index is sliced (n_fft=2048, hop=512,
+             so each noise sample is copied ~4 times) and concatenated into a noise clip, whose
+             STFT noisereduce then computes to get the per-frequency mean/std
+  current  - noise_spectrum_stats(): the non-speech frames are strided views of the signal and
+             only their spectra are computed, in fixed-size batches (at most NOISE_STATS_MAX_FRAMES,
+             spread over the clip; noisereduce truncates the legacy clip to its first ~290 frames)
+
+Both use the same VAD mask. The table reports the median time and the peak allocations
+(tracemalloc) of the estimate alone, and of the whole stationary NR call (--full) for each.
+
+Usage (from backend/):
+    python -m benchmarks.bench_noise_profile
+    python -m benchmarks.bench_noise_profile --durations 1 5 30 60 --repeats 5 --full
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.core.audio_enhancement import (
+    simple_vad, noise_spectrum_stats, spectral_gate_stationary, _amp_to_db, nr, signal
+)
+
+from .bench_detect_speech import cabin_noise, voiced_speech
+
+SR = 16000
+N_FFT = 2048
+HOP = 512
+NR_CHUNK_SIZE = 600000  # noisereduce clips y_noise to its chunk size (clip_noise_stationary)
+
+
+def mostly_silent_clip(seconds: float, rng) -> np.ndarray:
+    n = int(SR * seconds)
+    audio = cabin_noise(n, rng, "cabin") * 0.0005  # ~45 dB below the speech: simple_vad marks it as noise
+    speech_len = min(n, max(n // 5, SR))  # voiced_speech needs ~1 s for a few syllables
+    speech = voiced_speech(speech_len, rng)
+    start = (n - speech_len) // 2
+    audio[start:start + speech_len] += speech / (np.std(speech) + 1e-9) * 0.1
+    return audio.astype(np.float32)
+
+
+def legacy_noise_clip(audio: np.ndarray, noise_frames: np.ndarray) -> np.ndarray:
+    segments = [audio[idx * HOP: min(idx * HOP + N_FFT, len(audio))] for idx in np.flatnonzero(noise_frames)]
+    return np.concatenate([s for s in segments if len(s) > 0])
+
+
+def legacy_stats(audio: np.ndarray, noise_frames: np.ndarray):
+    clip = legacy_noise_clip(audio, noise_frames)[:NR_CHUNK_SIZE]
+    _, _, spectrum = signal.stft(clip, nfft=N_FFT, noverlap=N_FFT - HOP, nperseg=N_FFT, padded=False)
+    noise_db = _amp_to_db(np.abs(spectrum), axis=1)
+    return noise_db.mean(axis=1), noise_db.std(axis=1)
+
+
+def legacy_full(audio: np.ndarray, noise_frames: np.ndarray) -> np.ndarray:
+    return nr.reduce_noise(y=audio, sr=SR, y_noise=legacy_noise_clip(audio, noise_frames), prop_decrease=0.9,
+                           n_fft=N_FFT, hop_length=HOP, stationary=True, time_mask_smooth_ms=150.0)
+
+
+def current_full(audio: np.ndarray, noise_frames: np.ndarray) -> np.ndarray:
+    stats = noise_spectrum_stats(audio, noise_frames, N_FFT, HOP)
+    return spectral_gate_stationary(audio, SR, stats, prop_decrease=0.9, time_smooth_ms=150.0, n_fft=N_FFT, hop_length=HOP)
+
+
+def measure(fn, repeats: int, *args) -> tuple:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times) * 1000.0, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=float, nargs="+", default=[1, 5, 15, 30, 60])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--full", action="store_true", help="Also time the whole stationary NR call")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    cases = [("stats", legacy_stats, noise_spectrum_stats)]
+    if args.full:
+        cases.append(("stationary NR", legacy_full, current_full))
+    print(f"{SR} Hz, n_fft={N_FFT}, hop={HOP}, median of {args.repeats} runs")
+    print(f"{'sec':>5} {'noise frames':>12} {'stage':<14} {'legacy ms':>10} {'legacy MB':>10} "
+          f"{'current ms':>11} {'current MB':>11} {'speed-up':>9}")
+    for seconds in args.durations:
+        audio = mostly_silent_clip(seconds, rng)
+        noise_frames = ~simple_vad(audio, SR, frame_length=N_FFT, hop_length=HOP)
+        for stage, legacy, current in cases:
+            current_args = (audio, noise_frames) if current is not noise_spectrum_stats else (audio, noise_frames, N_FFT, HOP)
+            legacy_ms, legacy_mb = measure(legacy, args.repeats, audio, noise_frames)
+            current_ms, current_mb = measure(current, args.repeats, *current_args)
+            print(f"{seconds:>5.0f} {int(noise_frames.sum()):>12} {stage:<14} {legacy_ms:>10.1f} {legacy_mb:>10.1f} "
+                  f"{current_ms:>11.1f} {current_mb:>11.1f} {legacy_ms / current_ms:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# backend/benchmarks/bench_nr_methods.py
+"""
+Benchmark: noise-reduction methods - runtime, output SNR and (with --live) STT word error rate on
+a synthetic noisy-speech corpus.
+
+Clean speech is mixed with synthetic cabin noise (engine + road + wind, see bench_detect_speech)
+at each --snrs level and run through the DSP stage (process_pcm16_in_place, as the app does) with:
+
+  none          - no noise reduction (baseline)
+  tunable_nr    - NOISE_REDUCTION_METHOD='tunable_nr': non-stationary gating, shared STFT
+  tunable_cheap - the cheap quality tier of 'tunable_nr': one stationary pass
+  noisereduce   - 'tunable_nr' with NR_SHARED_STFT=False (noisereduce per pass)
+  wiener        - NOISE_REDUCTION_METHOD='wiener': decision-directed Wiener filter
+
+Clean speech is, in order of preference: recordings from --corpus (each <name>.wav/.m4a/... with
+its transcript in <name>.txt), sentences synthesised with Google TTS (--live), or speech-like
+voiced bursts (bench_detect_speech.voiced_speech; no words, so no WER). With --live every
+processed clip is also transcribed with Google STT (GoogleSttClient.transcribe, en-US hint) and
+the word error rate against the reference text is reported; this needs the app's Google
+credentials/.env.
+
+Usage (from backend/):
+    python -m benchmarks.bench_nr_methods
+    python -m benchmarks.bench_nr_methods --live --snrs 0 5 10 20
+    python -m benchmarks.bench_nr_methods --corpus ~/clips/commands --live --methods none tunable_nr wiener
+"""
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.audio_decoding import decode_audio
+from app.core.audio_enhancement import (
+    process_pcm16_in_place, resample_pcm16, NR_METHOD_TUNABLE, NR_METHOD_WIENER
+)
+from app.core.config import settings
+
+from .bench_detect_speech import cabin_noise, voiced_speech
+
+SR = 16000
+LANGUAGE = "en-US"
+
+METHODS: Dict[str, dict] = {
+    "none": dict(noise_reduction=False),
+    "tunable_nr": dict(method=NR_METHOD_TUNABLE),
+    "tunable_cheap": dict(method=NR_METHOD_TUNABLE, stationary=True, n_passes=1),
+    "noisereduce": dict(method=NR_METHOD_TUNABLE, shared_stft=False),
+    "wiener": dict(method=NR_METHOD_WIENER),
+}
+
+SENTENCES = [
+    "Navigate to the nearest petrol station",
+    "I am stuck in traffic and will be ten minutes late",
+    "Call the passenger and tell them I have arrived",
+    "Is there a faster route to the airport",
+    "Please find parking near the shopping mall",
+    "The passenger wants to stop at the pharmacy first",
+    "How long until I reach Kuala Lumpur Sentral",
+    "Turn off the air conditioning and open the window",
+]
+
+
+# --- Corpus ---
+
+def to_samples(data: bytes) -> np.ndarray:
+    samples, sr, _ = decode_audio(data)
+    return resample_pcm16(samples, sr, SR)[0].astype(np.float32) / 32767.0
+
+
+def load_corpus(directory: str) -> List[Tuple[str, np.ndarray, Optional[str]]]:
+    clips = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() == ".txt":
+            continue
+        with open(os.path.join(directory, name), "rb") as f:
+            audio = to_samples(f.read())
+        text_path = os.path.join(directory, stem + ".txt")
+        reference = open(text_path, encoding="utf-8").read().strip() if os.path.exists(text_path) else None
+        clips.append((stem, audio, reference))
+    return clips
+
+
+async def synthesise_corpus() -> List[Tuple[str, np.ndarray, Optional[str]]]:
+    from app.core.clients.google_tts import GoogleTtsClient
+    tts = GoogleTtsClient(settings)
+    clips = []
+    for i, sentence in enumerate(SENTENCES):
+        data = await tts.synthesize(sentence, LANGUAGE, audio_encoding="LINEAR16", sample_rate_hertz=SR)
+        clips.append((f"tts-{i + 1}", to_samples(data), sentence))
+    return clips
+
+
+def synthetic_corpus(count: int, rng) -> List[Tuple[str, np.ndarray, Optional[str]]]:
+    return [(f"voiced-{i + 1}", (voiced_speech(int(SR * rng.uniform(2.0, 4.0)), rng) * 0.1).astype(np.float32), None)
+            for i in range(count)]
+
+
+def add_noise(clean: np.ndarray, snr_db: float, rng) -> np.ndarray:
+    """Clean speech (with 0.5 s of noise before and after) in cabin noise at `snr_db`."""
+    pad = SR // 2
+    padded = np.concatenate([np.zeros(pad, np.float32), clean, np.zeros(pad, np.float32)])
+    noise = cabin_noise(len(padded), rng, "cabin")
+    noise *= np.sqrt(np.mean(clean ** 2) / 10.0 ** (snr_db / 10.0)) / (np.std(noise) + 1e-12)
+    return padded, (padded + noise).astype(np.float32)
+
+
+# --- Metrics ---
+
+def words(text: str) -> List[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    ref, hyp = words(reference), words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    distance = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        previous, distance[0] = distance[0], i
+        for j, h in enumerate(hyp, 1):
+            previous, distance[j] = distance[j], min(distance[j] + 1, distance[j - 1] + 1, previous + (r != h))
+    return distance[-1] / len(ref)
+
+
+def snr_db(clean: np.ndarray, processed: np.ndarray) -> float:
+    return 10.0 * np.log10(np.sum(clean ** 2) / (np.sum((processed - clean) ** 2) + 1e-12))
+
+
+def run_method(noisy: np.ndarray, options: dict) -> Tuple[np.ndarray, float]:
+    """process_pcm16_in_place on an int16 copy of `noisy`. Returns (int16 output, seconds)."""
+    samples = np.clip(noisy * 32767.0, -32767, 32767).astype(np.int16)
+    start = time.perf_counter()
+    process_pcm16_in_place(samples, SR, prop_decrease=settings.NR_PROP_DECREASE,
+                           time_smooth_ms=settings.NR_TIME_SMOOTH_MS, **options)
+    return samples, time.perf_counter() - start
+
+
+async def main_async(args) -> None:
+    rng = np.random.default_rng(args.seed)
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    elif args.live:
+        corpus = await synthesise_corpus()
+    else:
+        corpus = synthetic_corpus(args.clips, rng)
+    stt = None
+    if args.live:
+        from google.cloud import speech
+        from app.core.clients.google_stt import GoogleSttClient
+        stt, encoding = GoogleSttClient(settings), speech.RecognitionConfig.AudioEncoding.LINEAR16
+
+    # Warm-up (lazy imports, FFT plans) so the first method is not charged for it
+    for name in args.methods:
+        run_method(add_noise(corpus[0][1], 10.0, rng)[1], METHODS[name])
+
+    print(f"{len(corpus)} clips, {SR} Hz, SNRs {args.snrs} dB, {'live STT' if stt else 'offline (no WER)'}")
+    print(f"{'SNR':>4} {'method':<14} {'ms / s audio':>12} {'out SNR dB':>11} {'WER':>7}")
+    for snr in args.snrs:
+        mixes = [(name, *add_noise(clean, snr, rng), reference) for name, clean, reference in corpus]
+        for method in args.methods:
+            times, snrs, errors = [], [], []
+            for _, clean, noisy, reference in mixes:
+                processed, seconds = run_method(noisy, METHODS[method])
+                times.append(seconds * 1000.0 / (len(noisy) / SR))
+                snrs.append(snr_db(clean, processed.astype(np.float32) / 32767.0))
+                if stt is not None and reference:
+                    transcript, _ = await stt.transcribe(audio_data=memoryview(processed).cast("B"), sample_rate_hertz=SR,
+                                                         input_encoding=encoding, language_code_hint=LANGUAGE)
+                    errors.append(word_error_rate(reference, transcript or ""))
+            wer = f"{statistics.mean(errors):>6.1%}" if errors else f"{'-':>6}"
+            print(f"{snr:>4.0f} {method:<14} {statistics.median(times):>12.2f} {statistics.mean(snrs):>11.2f} {wer:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=None, help="Directory of clean recordings with <name>.txt transcripts")
+    parser.add_argument("--live", action="store_true", help="Synthesise the corpus with Google TTS and report STT WER")
+    parser.add_argument("--snrs", type=float, nargs="+", default=[0.0, 5.0, 10.0, 20.0])
+    parser.add_argument("--methods", nargs="+", default=list(METHODS), choices=list(METHODS))
+    parser.add_argument("--clips", type=int, default=8, help="Synthetic clips when neither --corpus nor --live is given")
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# backend/benchmarks/bench_shared_stft.py
+"""
+Benchmark: tunable noise reduction, noisereduce per pass vs the shared-STFT analysis stage, at
+16 kHz and 48 kHz.
+
+  legacy   - apply_tunable_noise_reduction(shared_stft=False): simple_vad (librosa RMS) for the
+             stationary noise profile, then one noisereduce call per pass, each with its own STFT
+             (of the zero-padded signal) and inverse STFT
+  current  - apply_tunable_noise_reduction(shared_stft=True), i.e. denoise_shared_stft(): one STFT,
+             VAD mask / noise spectrum / gate of every pass derived from it, one inverse STFT
+
+The clips are synthetic cabin noise with voiced speech in the middle (see bench_detect_speech).
+The table reports the median time per call, the speed-up, and the correlation between the two
+outputs. The gates are the same algorithm; the non-stationary ones differ in the first/last
+seconds, where noisereduce tracks the noise floor over its 30000 samples of zero padding and so
+gates less there (elsewhere the outputs correlate at ~0.998).
+
+Usage (from backend/):
+    python -m benchmarks.bench_shared_stft
+    python -m benchmarks.bench_shared_stft --rates 16000 48000 --seconds 3 10 30 --passes 1 2 --repeats 5
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from app.core.audio_enhancement import apply_tunable_noise_reduction, resample_pcm16
+
+from .bench_detect_speech import SR as SPEECH_SR, cabin_noise, voiced_speech
+
+
+def noisy_utterance(seconds: float, sr: int, rng) -> np.ndarray:
+    """Cabin noise with speech in the middle half, float32 at `sr` (speech synthesised at 16 kHz)."""
+    speech = voiced_speech(int(SPEECH_SR * seconds / 2), rng)
+    speech = (speech / (np.max(np.abs(speech)) + 1e-9) * 0.5 * 32767).astype(np.int16)
+    speech = resample_pcm16(speech, SPEECH_SR, sr)[0].astype(np.float32) / 32767
+    n = int(sr * seconds)
+    audio = cabin_noise(n, rng, "cabin")
+    audio = audio / (np.std(audio) + 1e-9) * 0.03
+    start = (n - len(speech)) // 2
+    audio[start:start + len(speech)] += speech[: n - start]
+    return audio.astype(np.float32)
+
+
+def timed(repeats: int, audio: np.ndarray, sr: int, **options) -> tuple:
+    apply_tunable_noise_reduction(audio, sr, **options)  # Warm-up (lazy imports, FFT plans)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = apply_tunable_noise_reduction(audio, sr, **options)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000.0, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", type=int, nargs="+", default=[16000, 48000])
+    parser.add_argument("--seconds", type=float, nargs="+", default=[3.0, 10.0, 30.0])
+    parser.add_argument("--passes", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--prop-decrease", type=float, default=0.9)
+    parser.add_argument("--time-smooth-ms", type=float, default=150.0)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"n_fft=2048, hop=512, prop_decrease={args.prop_decrease}, median of {args.repeats} runs")
+    print(f"{'rate':>6} {'sec':>5} {'gate':<14} {'passes':>6} {'legacy ms':>10} {'current ms':>11} {'speed-up':>9} {'corr':>7}")
+    for sr in args.rates:
+        for seconds in args.seconds:
+            audio = noisy_utterance(seconds, sr, rng)
+            for stationary in (False, True):
+                for n_passes in args.passes:
+                    options = dict(prop_decrease=args.prop_decrease, time_smooth_ms=args.time_smooth_ms,
+                                   n_passes=n_passes, stationary=stationary)
+                    legacy_ms, legacy_out = timed(args.repeats, audio, sr, shared_stft=False, **options)
+                    current_ms, current_out = timed(args.repeats, audio, sr, shared_stft=True, **options)
+                    corr = np.corrcoef(legacy_out, current_out)[0, 1]
+                    gate = "stationary" if stationary else "non-stationary"
+                    print(f"{sr:>6} {seconds:>5.0f} {gate:<14} {n_passes:>6} {legacy_ms:>10.1f} {current_ms:>11.1f} "
+                          f"{legacy_ms / current_ms:>8.1f}x {corr:>7.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# backend/benchmarks/bench_stt_models.py
+"""
+Benchmark: Google STT recognize latency per model on a fixed clip set (live API).
+
+Every clip is sent to each --models entry with GoogleSttClient.transcribe_with_confidence(model=...),
+i.e. the same RecognitionConfig the app builds, only the model differs. The table reports the
+median / max round-trip per clip and model, and marks (*) the model STT_MODEL_ROUTES would pick
+for the clip on /assistant/interact, so the routing thresholds can be checked against real numbers.
+
+Needs the same Google credentials/.env as the app. The default clip set is synthetic speech-like
+audio (timing only); pass real recordings with --audio for meaningful transcripts/confidences.
+
+Usage (from backend/):
+    python -m benchmarks.bench_stt_models --repeats 5
+    python -m benchmarks.bench_stt_models --audio ~/clips/*.m4a --models latest_short latest_long
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from app.core.audio_decoding import decode_audio
+from app.core.audio_enhancement import resample_pcm16
+from app.core.config import settings
+
+from .bench_dsp_offload import synthetic_wav
+
+SR = 16000
+
+
+def load_clips(args) -> list:
+    """(name, 16 kHz int16 samples) for each --audio file, or synthetic clips of --seconds."""
+    if args.audio:
+        sources = []
+        for path in args.audio:
+            with open(path, "rb") as f:
+                sources.append((os.path.basename(path), f.read()))
+    else:
+        sources = [(f"synthetic {seconds:g}s", synthetic_wav(seconds, SR)) for seconds in args.seconds]
+    clips = []
+    for name, data in sources:
+        samples, sr, _ = decode_audio(data)
+        samples, _ = resample_pcm16(samples, sr, SR)
+        clips.append((name, samples))
+    return clips
+
+
+async def main_async(args) -> None:
+    from google.cloud import speech
+    from app.core.clients.google_stt import GoogleSttClient, STT_ENDPOINT_INTERACT
+    client = GoogleSttClient(settings)
+    encoding = speech.RecognitionConfig.AudioEncoding.LINEAR16
+
+    clips = load_clips(args)
+    print(f"{len(clips)} clips at {SR} Hz, models: {', '.join(args.models)}, median of {args.repeats} runs "
+          f"(* = model chosen by STT_MODEL_ROUTES)")
+    print(f"{'clip':<24} {'sec':>5} {'model':<22} {'p50 ms':>8} {'max ms':>8} {'conf':>5}  transcript")
+    for name, samples in clips:
+        seconds = len(samples) / SR
+        routed, _ = client.select_model(STT_ENDPOINT_INTERACT, seconds)
+        for model in args.models:
+            times, transcript, confidence = [], "", None
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                try:
+                    transcript, _, confidence = await client.transcribe_with_confidence(
+                        audio_data=memoryview(samples).cast("B"), sample_rate_hertz=SR,
+                        input_encoding=encoding, model=model)
+                except Exception as e:  # e.g. model not available for the configured languages
+                    transcript = f"error: {e}"
+                    break
+                times.append((time.perf_counter() - start) * 1000.0)
+            label = f"{model}{' *' if model == routed else ''}"
+            conf = f"{confidence:>5.2f}" if confidence is not None else f"{'-':>5}"
+            if times:
+                print(f"{name[:24]:<24} {seconds:>5.1f} {label:<22} {statistics.median(times):>8.0f} {max(times):>8.0f} {conf}  {transcript[:40]!r}")
+            else:
+                print(f"{name[:24]:<24} {seconds:>5.1f} {label:<22} {'-':>8} {'-':>8} {conf}  {transcript[:60]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--audio", nargs="+", default=None, help="Recordings to use as the clip set (any format decode_audio reads)")
+    parser.add_argument("--seconds", type=float, nargs="+", default=[1.5, 3.0, 6.0, 15.0],
+                        help="Synthetic clip lengths when --audio is not given")
+    parser.add_argument("--models", nargs="+", default=["latest_short", "latest_long", "command_and_search", "default"])
+    parser.add_argument("--repeats", type=int, default=3)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
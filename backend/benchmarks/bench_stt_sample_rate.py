@@ -0,0 +1,95 @@
+# backend/benchmarks/bench_stt_sample_rate.py
+"""
+Benchmark: end-to-end STT stage latency and bytes sent, native upload rate vs 16 kHz normalisation.
+
+For each upload rate (default 44.1 kHz and 48 kHz) a synthetic speech-like WAV upload runs through
+the transcription pipeline's local stages:
+
+  decode (libsndfile) -> [resample to --target-rate] -> noise reduction -> STT payload
+
+and the table reports the local processing time, the LINEAR16 bytes that would be sent to Google
+STT and the WAV bytes that would be sent to Whisper.
+
+With --live, the payload is also sent to Google STT (GoogleSttClient.transcribe) and the API
+round-trip is included; this needs the same Google credentials/.env as the app.
+
+Usage (from backend/):
+    python -m benchmarks.bench_stt_sample_rate --seconds 10
+    python -m benchmarks.bench_stt_sample_rate --rates 48000 --repeats 5 --live
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import numpy as np
+
+from app.core.audio_decoding import decode_audio, encode_wav_pcm16
+from app.core.audio_enhancement import process_pcm16_in_place, resample_pcm16
+from app.core.config import settings
+
+from .bench_dsp_offload import synthetic_wav
+
+
+def local_stages(upload: bytes, target_rate: int):
+    samples, sr, _ = decode_audio(upload)
+    samples, sr = resample_pcm16(samples, sr, target_rate)
+    samples = np.require(samples, dtype=np.int16, requirements=["C", "W"])
+    process_pcm16_in_place(samples, sr, prop_decrease=settings.NR_PROP_DECREASE,
+                           time_smooth_ms=settings.NR_TIME_SMOOTH_MS, n_passes=settings.NR_PASSES)
+    return samples, sr
+
+
+async def run_case(upload: bytes, target_rate: int, repeats: int, stt_client) -> dict:
+    local_times, stt_times = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        samples, sr = local_stages(upload, target_rate)
+        local_times.append(time.perf_counter() - start)
+        if stt_client is not None:
+            from google.cloud import speech
+            start = time.perf_counter()
+            await stt_client.transcribe(audio_data=memoryview(samples).cast("B"), sample_rate_hertz=sr,
+                                        input_encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16)
+            stt_times.append(time.perf_counter() - start)
+    return {
+        "rate": sr,
+        "local_ms": statistics.median(local_times) * 1000.0,
+        "stt_ms": statistics.median(stt_times) * 1000.0 if stt_times else None,
+        "google_bytes": samples.nbytes,
+        "whisper_bytes": len(encode_wav_pcm16(samples, sr)),
+    }
+
+
+async def main_async(args) -> None:
+    stt_client = None
+    if args.live:
+        from app.core.clients.google_stt import GoogleSttClient
+        stt_client = GoogleSttClient(settings)
+
+    local_stages(synthetic_wav(1.0, 16000), 16000)  # Warm up the DSP imports
+    print(f"Upload: {args.seconds:.0f}s synthetic speech, median of {args.repeats} runs"
+          f"{' (live Google STT)' if args.live else ''}")
+    print(f"{'upload Hz':>9} {'sent Hz':>8} {'local ms':>9} {'STT ms':>8} {'total ms':>9} {'Google KB':>10} {'Whisper KB':>11}")
+    for rate in args.rates:
+        upload = synthetic_wav(args.seconds, rate)
+        for target in (0, args.target_rate):
+            r = await run_case(upload, target, args.repeats, stt_client)
+            stt = f"{r['stt_ms']:>8.0f}" if r["stt_ms"] is not None else f"{'-':>8}"
+            total = r["local_ms"] + (r["stt_ms"] or 0.0)
+            print(f"{rate:>9} {r['rate']:>8} {r['local_ms']:>9.0f} {stt} {total:>9.0f} "
+                  f"{r['google_bytes'] / 1024:>10.0f} {r['whisper_bytes'] / 1024:>11.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10.0, help="Upload length")
+    parser.add_argument("--rates", type=int, nargs="+", default=[44100, 48000], help="Upload sample rates")
+    parser.add_argument("--target-rate", type=int, default=settings.STT_SAMPLE_RATE_HERTZ.get("google", 16000) or 16000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--live", action="store_true", help="Also send the payload to Google STT")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
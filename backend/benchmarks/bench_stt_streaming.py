@@ -0,0 +1,105 @@
+# backend/benchmarks/bench_stt_streaming.py
+"""
+Benchmark: time-to-final-transcript, batch recognize vs streaming_recognize (live Google STT).
+
+Both modes get the same 16 kHz LINEAR16 audio and the clock starts when the driver stops talking,
+i.e. when the last sample is available:
+
+  batch      the whole clip is sent with GoogleSttClient.transcribe after it ends
+             (what /assistant/interact does with an uploaded recording),
+  streaming  the clip is sent in --chunk-ms frames at real-time pace while it "is spoken"
+             (GoogleSttClient.streaming_transcribe, as on /assistant/stream), and the time from
+             the last frame to the last final result is reported.
+
+Needs the same Google credentials/.env as the app. Use a real recording for meaningful
+transcripts; the synthetic default only exercises the timing.
+
+Usage (from backend/):
+    python -m benchmarks.bench_stt_streaming --audio ~/clips/command.m4a --repeats 5
+    python -m benchmarks.bench_stt_streaming --seconds 4 --no-realtime
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import numpy as np
+
+from app.core.audio_decoding import decode_audio
+from app.core.audio_enhancement import resample_pcm16
+from app.core.config import settings
+
+from .bench_dsp_offload import synthetic_wav
+
+SR = 16000
+
+
+async def run_batch(client, samples: np.ndarray, encoding) -> tuple:
+    start = time.perf_counter()
+    transcript, language = await client.transcribe(audio_data=memoryview(samples).cast("B"),
+                                                   sample_rate_hertz=SR, input_encoding=encoding)
+    return (time.perf_counter() - start) * 1000.0, transcript, language
+
+
+async def run_streaming(client, samples: np.ndarray, encoding, chunk_ms: float, realtime: bool) -> tuple:
+    chunk = int(SR * chunk_ms / 1000.0)
+
+    async def frames():
+        for offset in range(0, len(samples), chunk):
+            if realtime:
+                await asyncio.sleep(chunk_ms / 1000.0)
+            yield samples[offset:offset + chunk].tobytes()
+
+    finals, language, time_to_final = [], None, None
+    async for result in client.streaming_transcribe(frames(), SR, encoding, interim_results=True):
+        if result.is_final:
+            finals.append(result.transcript.strip())
+            language = language or result.language_code
+            time_to_final = result.input_closed_ms
+    return time_to_final, " ".join(f for f in finals if f), language
+
+
+async def main_async(args) -> None:
+    from google.cloud import speech
+    from app.core.clients.google_stt import GoogleSttClient
+    client = GoogleSttClient(settings)
+    encoding = speech.RecognitionConfig.AudioEncoding.LINEAR16
+
+    if args.audio:
+        with open(args.audio, "rb") as f:
+            samples, sr, _ = decode_audio(f.read())
+    else:
+        samples, sr, _ = decode_audio(synthetic_wav(args.seconds, SR))
+    samples, _ = resample_pcm16(samples, sr, SR)
+    print(f"Audio: {len(samples) / SR:.1f}s at {SR} Hz, {args.repeats} runs, "
+          f"streaming frames of {args.chunk_ms:.0f} ms{' at real-time pace' if args.realtime else ''}")
+
+    rows = {"batch": [], "streaming": []}
+    transcripts = {}
+    for _ in range(args.repeats):
+        ms, transcripts["batch"], _ = await run_batch(client, samples, encoding)
+        rows["batch"].append(ms)
+        ms, transcripts["streaming"], _ = await run_streaming(client, samples, encoding, args.chunk_ms, args.realtime)
+        if ms is not None:
+            rows["streaming"].append(ms)
+
+    print(f"{'mode':<10} {'p50 ms':>8} {'max ms':>8}  transcript")
+    for mode, times in rows.items():
+        if not times:
+            print(f"{mode:<10} {'-':>8} {'-':>8}  (no final result)")
+            continue
+        print(f"{mode:<10} {statistics.median(times):>8.0f} {max(times):>8.0f}  {transcripts[mode][:60]!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--audio", default=None, help="Recording to transcribe (any format decode_audio reads)")
+    parser.add_argument("--seconds", type=float, default=4.0, help="Synthetic clip length when --audio is not given")
+    parser.add_argument("--chunk-ms", type=float, default=100.0, help="Streaming frame length")
+    parser.add_argument("--no-realtime", dest="realtime", action="store_false", help="Send frames as fast as possible")
+    parser.add_argument("--repeats", type=int, default=3)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
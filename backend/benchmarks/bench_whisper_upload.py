@@ -0,0 +1,89 @@
+# backend/benchmarks/bench_whisper_upload.py
+"""
+Benchmark: Whisper fallback upload size and latency per upload format (WAV / FLAC / Opus).
+
+For each clip length the processed 16 kHz samples are encoded with encode_for_upload (what
+TranscriptionService does before calling Whisper) and the table reports the encode time, the upload
+size, the transfer time at --uplink-mbps and their sum. Formats that are not available here
+(Opus needs PyAV, FLAC needs soundfile) are reported as the format actually used.
+
+With --live the file is also sent to Whisper (OpenAiClient.transcribe_with_language) and the API
+round-trip replaces the estimated transfer time; this needs OPENAI_API_KEY.
+
+Usage (from backend/):
+    python -m benchmarks.bench_whisper_upload --seconds 3 10 30
+    python -m benchmarks.bench_whisper_upload --audio ~/clips/message.m4a --live --repeats 3
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.audio_decoding import (
+    decode_audio, encode_for_upload, UPLOAD_FILE_EXTENSIONS,
+    UPLOAD_FORMAT_WAV, UPLOAD_FORMAT_FLAC, UPLOAD_FORMAT_OPUS
+)
+from app.core.audio_enhancement import resample_pcm16
+from app.core.config import settings
+
+from .bench_dsp_offload import synthetic_wav
+
+SR = 16000
+
+
+async def run_format(samples, upload_format: str, args, client) -> dict:
+    encode_times, api_times = [], []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        data, used = encode_for_upload(samples, SR, upload_format, args.opus_bitrate)
+        encode_times.append(time.perf_counter() - start)
+        if client is not None:
+            start = time.perf_counter()
+            await client.transcribe_with_language(audio_data=data, filename=f"audio.{UPLOAD_FILE_EXTENSIONS[used]}")
+            api_times.append(time.perf_counter() - start)
+    encode_ms = statistics.median(encode_times) * 1000.0
+    transfer_ms = (statistics.median(api_times) * 1000.0 if api_times
+                   else len(data) * 8 / (args.uplink_mbps * 1e6) * 1000.0)
+    return {"used": used, "bytes": len(data), "encode_ms": encode_ms, "transfer_ms": transfer_ms}
+
+
+async def main_async(args) -> None:
+    client = None
+    if args.live:
+        from app.core.clients.openai_client import OpenAiClient
+        client = OpenAiClient(settings)
+
+    if args.audio:
+        with open(args.audio, "rb") as f:
+            samples, sr, _ = decode_audio(f.read())
+        clips = [resample_pcm16(samples, sr, SR)[0]]
+    else:
+        clips = [decode_audio(synthetic_wav(seconds, SR))[0] for seconds in args.seconds]
+
+    second_column = "API ms" if args.live else f"@{args.uplink_mbps:g}Mb/s"
+    print(f"16 kHz mono, median of {args.repeats} runs{' (live Whisper)' if args.live else ''}")
+    print(f"{'sec':>5} {'format':<7} {'used':<5} {'KB':>8} {'vs WAV':>7} {'encode ms':>10} {second_column:>11} {'total ms':>9}")
+    for samples in clips:
+        wav_bytes = None
+        for upload_format in args.formats:
+            r = await run_format(samples, upload_format, args, client)
+            wav_bytes = wav_bytes or (r["bytes"] if r["used"] == UPLOAD_FORMAT_WAV else None)
+            ratio = f"{r['bytes'] / wav_bytes:>6.0%}" if wav_bytes else f"{'-':>6}"
+            print(f"{len(samples) / SR:>5.1f} {upload_format:<7} {r['used']:<5} {r['bytes'] / 1024:>8.1f} {ratio:>7} "
+                  f"{r['encode_ms']:>10.1f} {r['transfer_ms']:>11.0f} {r['encode_ms'] + r['transfer_ms']:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--audio", default=None, help="Recording to use instead of synthetic clips")
+    parser.add_argument("--seconds", type=float, nargs="+", default=[3.0, 10.0, 30.0], help="Synthetic clip lengths")
+    parser.add_argument("--formats", nargs="+", default=[UPLOAD_FORMAT_WAV, UPLOAD_FORMAT_FLAC, UPLOAD_FORMAT_OPUS])
+    parser.add_argument("--opus-bitrate", type=int, default=settings.WHISPER_OPUS_BITRATE)
+    parser.add_argument("--uplink-mbps", type=float, default=20.0, help="Uplink used to estimate transfer time without --live")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--live", action="store_true", help="Send each file to Whisper")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()